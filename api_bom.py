@@ -0,0 +1,48 @@
+from flask import Blueprint, request, jsonify
+import requests
+import supabase_client as db
+import portas_codec
+from lista_materiais import motor
+
+bom_bp = Blueprint("bom_bp", __name__)
+
+# =====================
+# LISTA DE MATERIAIS DO ORÇAMENTO
+# =====================
+
+@bom_bp.route("/api/orcamento/<orcamento_uuid>/bom", methods=["POST"])
+def bom_orcamento(orcamento_uuid):
+    """
+    Custo do orçamento inteiro numa chamada: as portas salvas do orçamento
+    e, opcionalmente, itens extras ainda não salvos (ex.: cristaleira):
+    {
+        "itens": [{"tipo": "cristaleira", "dados": {...}, "quantidade": 1}]
+    }
+    """
+    data = request.get_json(silent=True) or {}
+    extras = data.get("itens", [])
+    if not isinstance(extras, list):
+        return jsonify({"success": False, "error": "itens deve ser uma lista"}), 400
+    try:
+        portas = db.select("portas", {
+            "select": "id,tipo,dados_json,dados_legado:dados,quantidade",
+            "orcamento_uuid": f"eq.{orcamento_uuid}"
+        })
+        itens = [{
+            "id": p.get("id"),
+            "tipo": p.get("tipo"),
+            "dados": portas_codec.decode(p.get("dados_json"), p.get("dados_legado")),
+            "quantidade": p.get("quantidade") or 1
+        } for p in portas] + extras
+
+        bom = motor.explodir(itens)
+        for item in bom["itens"]:
+            if itens[item["indice"]].get("id") is not None:
+                item["porta_id"] = itens[item["indice"]]["id"]
+        return jsonify({"success": True, **bom})
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    except requests.HTTPError as http_err:
+        return jsonify({"success": False, "error": f"{http_err.response.status_code} {http_err.response.text}"}), http_err.response.status_code
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
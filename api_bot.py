@@ -1,9 +1,16 @@
 from flask import Blueprint, request, jsonify
+import os
 import re
-import requests
+from catalog_index import indice
+from precificacao import calcular_preco_porta
+from paralelo import em_paralelo, ATRASADO
+from desenho_portas import desenhos, TIPOS
 
 bot_bp = Blueprint("bot_bp", __name__)
 
+# Tempo máximo para achar perfil e vidro; depois disso responde com o que tiver
+BOT_PRAZO_SEGUNDOS = float(os.getenv("BOT_PRAZO_SEGUNDOS", "2"))
+
 # =====================
 # HELPERS
 # =====================
@@ -29,25 +36,52 @@ def extrair_dimensoes(texto):
 
 
 def buscar_perfil_por_nome(nome):
-    from app import SUPABASE_URL, HEADERS
-    r = requests.get(
-        f"{SUPABASE_URL}/rest/v1/perfis?nome=ilike.*{nome}*&select=*",
-        headers=HEADERS
-    )
-    r.raise_for_status()
-    data = r.json()
-    return data[0] if data else None
+    return indice.perfil(nome)
 
 
 def buscar_vidro_por_nome(nome):
-    from app import SUPABASE_URL, HEADERS
-    r = requests.get(
-        f"{SUPABASE_URL}/rest/v1/vidros?tipo=ilike.*{nome}*&select=*",
-        headers=HEADERS
+    return indice.vidro(nome)
+
+
+# =====================
+# ETAPAS
+# =====================
+def resolver_itens(palavras, prazo=BOT_PRAZO_SEGUNDOS):
+    """
+    Perfil e vidro são independentes: resolve os dois ao mesmo tempo.
+    O que não ficar pronto dentro do prazo volta como ATRASADO.
+    """
+    return em_paralelo(
+        lambda: indice.resolver_perfil(palavras),
+        lambda: indice.resolver_vidro(palavras),
+        prazo=prazo
     )
-    r.raise_for_status()
-    data = r.json()
-    return data[0] if data else None
+
+
+def montar_resposta(largura, altura, perfil, vidro):
+    linhas = [f"📐 {largura/10:.0f}x{altura/10:.0f} cm"]
+    pendentes = []
+
+    if perfil is ATRASADO:
+        pendentes.append("perfil")
+        perfil = None
+    else:
+        linhas.append(f"🧱 Perfil: {perfil['nome']}")
+
+    if vidro is ATRASADO:
+        pendentes.append("vidro")
+        vidro = None
+    else:
+        linhas.append(f"🪟 Vidro: {vidro['tipo']}")
+
+    preco = calcular_preco_porta(largura_mm=largura, altura_mm=altura, perfil=perfil, vidro=vidro)
+
+    if not pendentes:
+        return "Orçamento estimado:\n" + "\n".join(linhas) + f"\n💰 Valor: R$ {preco:.2f}"
+
+    linhas.append(f"💰 Parcial (sem {' e '.join(pendentes)}): R$ {preco:.2f}")
+    linhas.append("⏳ O catálogo demorou a responder, envie de novo em instantes para o valor completo.")
+    return "Orçamento parcial:\n" + "\n".join(linhas)
 
 
 # =====================
@@ -60,6 +94,7 @@ def bot():
     {
         "mensagem": "porta 80x210 perfil 2215 vidro reflecta"
     }
+    Etapas: medidas -> perfil e vidro (em paralelo, com prazo) -> preço.
     """
 
     texto = request.json.get("mensagem", "").lower()
@@ -68,14 +103,8 @@ def bot():
     if not largura or not altura:
         return jsonify({"resposta": "Informe as medidas no formato 80x210."})
 
-    perfil = None
-    vidro = None
-
-    for palavra in texto.split():
-        if not perfil:
-            perfil = buscar_perfil_por_nome(palavra)
-        if not vidro:
-            vidro = buscar_vidro_por_nome(palavra)
+    # resolve as palavras contra o índice em memória (sem ir ao Supabase com o catálogo quente)
+    perfil, vidro = resolver_itens(texto.split())
 
     if not perfil:
         return jsonify({"resposta": "Não encontrei o perfil informado."})
@@ -83,22 +112,12 @@ def bot():
     if not vidro:
         return jsonify({"resposta": "Não encontrei o vidro informado."})
 
-    # chama o motor de cálculo
-    from api_portas import calcular_preco_porta
-
-    preco = calcular_preco_porta(
-        largura_mm=largura,
-        altura_mm=altura,
-        perfil=perfil,
-        vidro=vidro
-    )
+    # desenho da porta (tipo citado na mensagem, giro se nenhum)
+    tipo = next((t for t in TIPOS if t in texto), "giro")
+    # o link tem que abrir em qualquer instância: desenho novo vai ao banco fora da resposta
+    chave = desenhos.desenhar_para_link(tipo, {"largura": largura, "altura": altura})
 
     return jsonify({
-        "resposta": (
-            f"Orçamento estimado:\n"
-            f"📐 {largura/10:.0f}x{altura/10:.0f} cm\n"
-            f"🧱 Perfil: {perfil['nome']}\n"
-            f"🪟 Vidro: {vidro['tipo']}\n"
-            f"💰 Valor: R$ {preco:.2f}"
-        )
+        "resposta": montar_resposta(largura, altura, perfil, vidro),
+        "desenho": f"/api/desenhos/{chave}.svg"
     })
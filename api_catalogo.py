@@ -0,0 +1,96 @@
+from flask import Blueprint, request, Response, jsonify
+import requests
+import reprecificacao
+import catalogo_arquivos
+
+catalogo_bp = Blueprint("catalogo_bp", __name__)
+
+# =====================
+# REPRECIFICAÇÃO EM LOTE
+# =====================
+
+@catalogo_bp.route("/api/catalogo/reprecificar", methods=["POST"])
+def reprecificar():
+    """
+    Espera:
+    {
+        "tabela": "perfis" | "vidros" | "materiais",
+        "filtros": {"ids": [1, 2], "busca": "2215", "tipologia": "giro", "espessura": 4, "tipo_medida": "unidade"},
+        "ajuste": {"custo_percentual": 8, "margem": 40, "margem_delta": 2, "perda": 5, "perda_delta": 1},
+        "simular": false
+    }
+    Filtros e ajustes são opcionais (ao menos um ajuste).
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        resultado = reprecificacao.reprecificar(
+            data.get("tabela"),
+            data.get("filtros") or {},
+            data.get("ajuste") or {},
+            simular=bool(data.get("simular"))
+        )
+        return jsonify({"success": True, **resultado})
+    except (TypeError, ValueError) as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    except requests.HTTPError as http_err:
+        return jsonify({"success": False, "error": f"{http_err.response.status_code} {http_err.response.text}"}), http_err.response.status_code
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+# =====================
+# IMPORTAÇÃO / EXPORTAÇÃO (CSV, NDJSON)
+# =====================
+
+MIMETYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+def _formato(nome_arquivo=None):
+    formato = request.args.get("formato")
+    if formato:
+        return formato
+    if "ndjson" in (request.mimetype or "") or (nome_arquivo or "").endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    return "csv"
+
+
+@catalogo_bp.route("/api/catalogo/import", methods=["POST"])
+def importar():
+    """
+    POST /api/catalogo/import?tabela=perfis&formato=csv&simular=1
+    Corpo: o arquivo cru (Content-Type text/csv ou application/x-ndjson)
+    ou multipart com o campo "arquivo".
+    Colunas: as do cadastro da tabela (+ id opcional); preço é calculado aqui.
+    """
+    upload = request.files.get("arquivo") if request.mimetype == "multipart/form-data" else None
+    arquivo = upload.stream if upload else request.stream
+    try:
+        resultado = catalogo_arquivos.importar(
+            request.args.get("tabela"),
+            arquivo,
+            _formato(upload.filename if upload else None),
+            simular=request.args.get("simular") in ("1", "true")
+        )
+        status = 502 if "interrompido" in resultado else 200
+        return jsonify({"success": status == 200, **resultado}), status
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    except requests.HTTPError as http_err:
+        return jsonify({"success": False, "error": f"{http_err.response.status_code} {http_err.response.text}"}), http_err.response.status_code
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@catalogo_bp.route("/api/catalogo/export", methods=["GET"])
+def exportar():
+    """GET /api/catalogo/export?tabela=vidros&formato=csv|ndjson (resposta em pedaços)."""
+    tabela = request.args.get("tabela")
+    formato = request.args.get("formato", "csv")
+    if tabela not in catalogo_arquivos.COLUNAS or formato not in catalogo_arquivos.FORMATOS:
+        return jsonify({
+            "success": False,
+            "error": f"Use tabela={'|'.join(catalogo_arquivos.COLUNAS)} e formato={'|'.join(catalogo_arquivos.FORMATOS)}"
+        }), 400
+    resp = Response(catalogo_arquivos.exportar(tabela, formato), mimetype=MIMETYPES[formato])
+    resp.headers["Content-Disposition"] = f'attachment; filename="{tabela}.{formato}"'
+    resp.headers["X-Accel-Buffering"] = "no"
+    return resp
@@ -1,22 +1,7 @@
-import os
-import requests
 from flask import Blueprint, request, jsonify
-
-# =====================
-# CONFIG SUPABASE (AQUI MESMO)
-# =====================
-
-SUPABASE_URL = os.environ.get("SUPABASE_URL")
-SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
-
-if not SUPABASE_URL or not SUPABASE_KEY:
-    raise RuntimeError("SUPABASE_URL ou SUPABASE_KEY não configurados")
-
-HEADERS = {
-    "apikey": SUPABASE_KEY,
-    "Authorization": f"Bearer {SUPABASE_KEY}",
-    "Content-Type": "application/json"
-}
+import supabase_client as db
+from catalog_cache import catalogo, responder
+from precificacao import calcular_preco
 
 # =====================
 # BLUEPRINT
@@ -31,12 +16,7 @@ insumos_bp = Blueprint("insumos_bp", __name__)
 @insumos_bp.route("/api/materiais", methods=["GET"])
 def listar_materiais():
     try:
-        r = requests.get(
-            f"{SUPABASE_URL}/rest/v1/materiais?select=*&order=nome.asc",
-            headers=HEADERS
-        )
-        r.raise_for_status()
-        return jsonify(r.json())
+        return responder("materiais")
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -46,7 +26,8 @@ def criar_material():
     try:
         data = request.json or {}
 
-        preco = float(data.get("preco", 0))
+        # preço calculado aqui (mesma conta de perfis/vidros), não o enviado pelo cliente
+        preco = calcular_preco(float(data["custo"]), float(data["margem"]), float(data["perda"]))
 
         payload = {
             "nome": data["nome"],
@@ -57,12 +38,8 @@ def criar_material():
             "preco": round(preco, 2)
         }
 
-        r = requests.post(
-            f"{SUPABASE_URL}/rest/v1/materiais",
-            headers=HEADERS,
-            json=payload
-        )
-        r.raise_for_status()
+        db.insert("materiais", payload)
+        catalogo.invalidar("materiais")
 
         return jsonify({"status": "ok"})
     except Exception as e:
@@ -73,7 +50,7 @@ def criar_material():
 def editar_material(id):
     try:
         data = request.json or {}
-        preco = float(data.get("preco", 0))
+        preco = calcular_preco(float(data["custo"]), float(data["margem"]), float(data["perda"]))
 
         payload = {
             "nome": data["nome"],
@@ -84,12 +61,8 @@ def editar_material(id):
             "preco": round(preco, 2)
         }
 
-        r = requests.patch(
-            f"{SUPABASE_URL}/rest/v1/materiais?id=eq.{id}",
-            headers=HEADERS,
-            json=payload
-        )
-        r.raise_for_status()
+        db.update("materiais", {"id": f"eq.{id}"}, payload)
+        catalogo.invalidar("materiais")
 
         return jsonify({"status": "updated"})
     except Exception as e:
@@ -99,11 +72,8 @@ def editar_material(id):
 @insumos_bp.route("/api/materiais/<id>", methods=["DELETE"])
 def deletar_material(id):
     try:
-        r = requests.delete(
-            f"{SUPABASE_URL}/rest/v1/materiais?id=eq.{id}",
-            headers=HEADERS
-        )
-        r.raise_for_status()
+        db.delete("materiais", {"id": f"eq.{id}"})
+        catalogo.invalidar("materiais")
 
         return jsonify({"status": "deleted"})
     except Exception as e:
@@ -1,6 +1,6 @@
 # api_orc.py
 from flask import Blueprint, request, jsonify
-import requests
+import supabase_client as db
 
 orc_bp = Blueprint("orc_bp", __name__)
 
@@ -9,8 +9,6 @@ def finalizar_orcamento(orcamento_uuid):
     """
     Atualiza um orçamento existente com quantidade total e valor total
     """
-    from app import SUPABASE_URL, HEADERS  # pegue as variáveis do app principal
-
     data = request.json
     quantidade_total = data.get("quantidade_total")
     valor_total = data.get("valor_total")
@@ -20,15 +18,10 @@ def finalizar_orcamento(orcamento_uuid):
 
     try:
         # Atualiza o orçamento no Supabase
-        r = requests.patch(
-            f"{SUPABASE_URL}/rest/v1/orcamentos?id=eq.{orcamento_uuid}",
-            headers={**HEADERS, "Content-Type": "application/json"},
-            json={
-                "quantidade_total": quantidade_total,
-                "valor_total": valor_total
-            }
-        )
-        r.raise_for_status()
+        db.update("orcamentos", {"id": f"eq.{orcamento_uuid}"}, {
+            "quantidade_total": quantidade_total,
+            "valor_total": valor_total
+        })
         return jsonify({"success": True})
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
@@ -1,5 +1,7 @@
+from datetime import date, datetime
 from flask import Blueprint, request, jsonify
-import requests
+import supabase_client as db
+from producao_eventos import difusor
 
 orcamentos_bp = Blueprint("orcamentos_bp", __name__)
 
@@ -9,36 +11,21 @@ orcamentos_bp = Blueprint("orcamentos_bp", __name__)
 
 @orcamentos_bp.route("/api/orcamento", methods=["POST"])
 def criar_orcamento():
-    from app import SUPABASE_URL, HEADERS
     data = request.json
     cliente_nome = data.get("cliente_nome")
     if not cliente_nome:
         return jsonify({"success": False, "error": "Cliente não informado"}), 400
 
     try:
-        # Pegar último numero_pedido
-        r_last = requests.get(
-            f"{SUPABASE_URL}/rest/v1/orcamentos?select=numero_pedido&order=numero_pedido.desc&limit=1",
-            headers=HEADERS
-        )
-        r_last.raise_for_status()
-        last_pedido = r_last.json()
-        numero_pedido = (last_pedido[0]['numero_pedido'] + 1) if last_pedido else 1
-
+        # numero_pedido vem da sequence do banco (sql/003): uma ida ao Supabase, sem corrida
         payload = {
             "cliente_nome": cliente_nome,
-            "numero_pedido": numero_pedido,
             "quantidade_total": 0,
             "valor_total": 0
         }
 
-        r_post = requests.post(
-            f"{SUPABASE_URL}/rest/v1/orcamentos",
-            headers={**HEADERS, "Content-Type": "application/json", "Prefer": "return=representation"},
-            json=payload
-        )
-        r_post.raise_for_status()
-        new_orcamento = r_post.json()
+        new_orcamento = db.insert("orcamentos", payload, retornar=True)
+        numero_pedido = new_orcamento[0]["numero_pedido"]
 
         return jsonify({
             "success": True,
@@ -51,16 +38,117 @@ def criar_orcamento():
         return jsonify({"success": False, "error": str(e)}), 500
 
 
+LIMITE_PADRAO = 100
+LIMITE_MAXIMO = 500
+CAMPOS_LISTA = "id,numero_pedido,cliente_nome,data_criacao,quantidade_total,valor_total,situacao,updated_at"
+
+
+def _prefixo_ilike(texto):
+    """
+    Texto do usuário como prefixo literal do ilike: escapa os curingas do LIKE
+    (\\, %, _). O * vira curinga no PostgREST e não tem escape; vira _ (um caractere).
+    """
+    for c in ("\\", "%", "_"):
+        texto = texto.replace(c, "\\" + c)
+    return texto.replace("*", "_") + "*"
+
+
+FILTROS_DATA = (
+    ("data_inicio", date.fromisoformat, "uma data ISO (AAAA-MM-DD)"),
+    ("data_fim", date.fromisoformat, "uma data ISO (AAAA-MM-DD)"),
+    ("updated_since", datetime.fromisoformat, "um instante ISO"),
+)
+
+
+def _datas(args):
+    """Filtros de data já convertidos (nada cru no and=(...)); ValueError com o nome do parâmetro."""
+    filtros = {}
+    for nome, converter, formato in FILTROS_DATA:
+        if args.get(nome):
+            try:
+                filtros[nome] = converter(args[nome]).isoformat()
+            except ValueError:
+                raise ValueError(f"{nome} deve ser {formato}") from None
+    return filtros
+
+
 @orcamentos_bp.route("/api/orcamentos", methods=["GET"])
 def listar_orcamentos():
-    from app import SUPABASE_URL, HEADERS
+    """
+    Lista paginada por numero_pedido (keyset). Parâmetros opcionais:
+      limit          tamanho da página (padrão 100, máx 500)
+      cursor         numero_pedido do último item da página anterior
+      cliente        prefixo do nome do cliente (índice trigram, sql/007)
+      data_inicio    data_criacao >= (AAAA-MM-DD)
+      data_fim       data_criacao <= (AAAA-MM-DD)
+      situacao       situação exata
+      updated_since  só o que mudou depois desse instante (ISO)
+    Resposta traz next_cursor (null na última página).
+    """
+    try:
+        limite = int(request.args.get("limit", LIMITE_PADRAO))
+        cursor = request.args.get("cursor")
+        cursor = int(cursor) if cursor else None
+    except ValueError:
+        return jsonify({"success": False, "error": "limit/cursor devem ser inteiros"}), 400
+    if limite < 1:
+        return jsonify({"success": False, "error": "limit deve ser >= 1"}), 400
+    limite = min(limite, LIMITE_MAXIMO)
+    try:
+        filtros = _datas(request.args)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    params = {
+        "select": CAMPOS_LISTA,
+        "order": "numero_pedido.asc",
+        "limit": limite + 1
+    }
+    if cursor is not None:
+        params["numero_pedido"] = f"gt.{cursor}"
+    if request.args.get("cliente"):
+        params["cliente_nome"] = f"ilike.{_prefixo_ilike(request.args['cliente'])}"
+    datas = []
+    if "data_inicio" in filtros:
+        datas.append(f'data_criacao.gte."{filtros["data_inicio"]}"')
+    if "data_fim" in filtros:
+        datas.append(f'data_criacao.lte."{filtros["data_fim"]}"')
+    if datas:
+        params["and"] = f"({','.join(datas)})"
+    if request.args.get("situacao"):
+        params["situacao"] = f"eq.{request.args['situacao']}"
+    if "updated_since" in filtros:
+        params["updated_at"] = f"gt.{filtros['updated_since']}"
+
+    try:
+        orcamentos = db.select("orcamentos", params)
+        next_cursor = None
+        if len(orcamentos) > limite:
+            orcamentos = orcamentos[:limite]
+            next_cursor = orcamentos[-1]["numero_pedido"]
+        return jsonify({"success": True, "orcamentos": orcamentos, "next_cursor": next_cursor})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+SITUACOES = ("orcamento", "comprado", "em produção", "produzido", "entregue")
+
+
+@orcamentos_bp.route("/api/orcamento/<uuid>", methods=["PATCH"])
+def atualizar_situacao(uuid):
+    """Atualiza a situação do pedido (producao.html) e avisa os quadros conectados."""
+    data = request.json or {}
+    situacao = data.get("situacao")
+    if situacao not in SITUACOES:
+        return jsonify({"success": False, "error": f"Situação inválida. Use: {', '.join(SITUACOES)}"}), 400
+
     try:
-        r = requests.get(
-            f"{SUPABASE_URL}/rest/v1/orcamentos?select=id,numero_pedido,cliente_nome,data_criacao,quantidade_total,valor_total&order=numero_pedido.asc",
-            headers=HEADERS
-        )
-        r.raise_for_status()
-        return jsonify({"success": True, "orcamentos": r.json()})
+        rows = db.update("orcamentos", {"id": f"eq.{uuid}"}, {"situacao": situacao}, retornar=True)
+        if not rows:
+            return jsonify({"success": False, "error": "Orçamento não encontrado"}), 404
+        orcamento = {k: rows[0].get(k) for k in CAMPOS_LISTA.split(",")}
+        difusor.publicar(orcamento)
+        return jsonify({"success": True, "orcamento": orcamento})
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
@@ -70,7 +158,6 @@ def listar_orcamentos():
 # =====================
 @orcamentos_bp.route("/api/orcamento/<uuid>/finalizar", methods=["POST"])
 def finalizar_orcamento(uuid):
-    from app import SUPABASE_URL, HEADERS
     data = request.json
     portas = data.get("portas", [])
     if not portas:
@@ -85,12 +172,7 @@ def finalizar_orcamento(uuid):
             "quantidade_total": quantidade_total,
             "valor_total": valor_total
         }
-        r_patch = requests.patch(
-            f"{SUPABASE_URL}/rest/v1/orcamentos?id=eq.{uuid}",
-            headers={**HEADERS, "Content-Type": "application/json", "Prefer": "return=representation"},
-            json=payload
-        )
-        r_patch.raise_for_status()
+        db.update("orcamentos", {"id": f"eq.{uuid}"}, payload, retornar=True)
         return jsonify({"success": True, "quantidade_total": quantidade_total, "valor_total": valor_total})
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
@@ -1,78 +1,195 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, make_response
 import requests
+import json
+import uuid
+import hashlib
+import supabase_client as db
+import portas_codec
+from desenho_portas import desenhos
 
 portas_bp = Blueprint("portas_bp", __name__)
 
+# =====================
+# HELPERS
+# =====================
+
+# Colunas que o cliente pode pedir em ?fields=. O desenho vem como hash
+# (GET /api/desenhos/<hash>.svg); "svg" é o markup legado, só se pedido.
+CAMPOS_PORTA = ("id", "orcamento_uuid", "tipo", "dados", "quantidade", "preco", "hash", "desenho", "svg")
+CAMPOS_PADRAO = tuple(c for c in CAMPOS_PORTA if c != "svg")
+
+# "dados" na API = jsonb novo + text[] legado (ver portas_codec)
+COLUNAS = {"dados": "dados_json,dados_legado:dados"}
+
+
+def campos_solicitados(fields):
+    """Converte ?fields=a,b em select do PostgREST (ignora colunas desconhecidas)."""
+    if not fields:
+        campos = CAMPOS_PADRAO
+    elif fields.strip() == "*":
+        campos = CAMPOS_PORTA
+    else:
+        campos = [c.strip() for c in fields.split(",") if c.strip() in CAMPOS_PORTA]
+    if not campos:
+        raise ValueError(f"fields inválido. Use: {', '.join(CAMPOS_PORTA)}")
+    return ",".join(COLUNAS.get(c, c) for c in dict.fromkeys(campos))
+
+
+def hash_porta(row):
+    """Hash do conteúdo salvo da porta (detecta o que mudou entre dois salvamentos)."""
+    conteudo = {k: row.get(k) for k in ("tipo", "dados_json", "quantidade", "preco", "desenho")}
+    if row.get("svg"):
+        # svg do cliente só é guardado em porta sem desenho do servidor
+        conteudo["svg"] = row["svg"]
+    return hashlib.sha1(json.dumps(conteudo, sort_keys=True, default=str).encode()).hexdigest()
+
 # =====================
 # ROTAS PORTAS
 # =====================
 
-# GET todas as portas de um orçamento
+# GET todas as portas de um orçamento (?fields=id,tipo,... ; svg só se pedido)
 @portas_bp.route("/api/orcamento/<orcamento_uuid>/portas", methods=["GET"])
 def listar_portas(orcamento_uuid):
-    from app import SUPABASE_URL, HEADERS
     try:
-        r = requests.get(
-            f"{SUPABASE_URL}/rest/v1/portas?orcamento_uuid=eq.{orcamento_uuid}",
-            headers=HEADERS
-        )
-        r.raise_for_status()
-        portas = r.json()
-        # converte text[] de volta para dict
+        select = campos_solicitados(request.args.get("fields"))
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    try:
+        portas = db.select("portas", {"select": select, "orcamento_uuid": f"eq.{orcamento_uuid}"})
         for p in portas:
-            dados_array = p.get("dados", [])
-            dados = {}
-            if isinstance(dados_array, list):
-                for item in dados_array:
-                    if ":" not in item:
-                        continue
-                    key, value = item.split(":", 1)
-                    if key == "dobradicas_alturas":
-                        valores = [v.strip() for v in value.split(",") if v.strip()]
-                        dados[key] = valores
-                    else:
-                        dados[key] = value
-            p["dados"] = dados
-            p["quantidade"] = int(p.get("quantidade", 1))
+            if "dados_json" in p:
+                p["dados"] = portas_codec.decode(p.pop("dados_json"), p.pop("dados_legado", None))
+            if "quantidade" in p:
+                p["quantidade"] = int(p["quantidade"]) if p["quantidade"] is not None else 1
         return jsonify({"success": True, "portas": portas})
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
-# POST para criar portas
+def _resposta_svg(svg, etag, imutavel=False):
+    resp = make_response(svg)
+    resp.mimetype = "image/svg+xml"
+    resp.set_etag(etag)
+    if imutavel:
+        # conteúdo endereçado pela hash: nunca muda
+        resp.cache_control.public = True
+        resp.cache_control.max_age = 31536000
+        resp.cache_control.immutable = True
+    else:
+        resp.cache_control.no_cache = True
+    return resp.make_conditional(request)
+
+# GET desenho pela hash da especificação (o mesmo para todas as portas iguais)
+@portas_bp.route("/api/desenhos/<chave>.svg", methods=["GET"])
+def svg_desenho(chave):
+    try:
+        svg = desenhos.obter(chave)
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+    if svg is None:
+        return jsonify({"success": False, "error": "Desenho não encontrado"}), 404
+    return _resposta_svg(svg, chave, imutavel=True)
+
+# GET desenho de uma porta (renderizado no servidor; svg legado como reserva)
+@portas_bp.route("/api/orcamento/<orcamento_uuid>/portas/<porta_id>/svg", methods=["GET"])
+def svg_porta(orcamento_uuid, porta_id):
+    try:
+        rows = db.select("portas", {
+            "select": "tipo,dados_json,dados_legado:dados,svg",
+            "id": f"eq.{porta_id}",
+            "orcamento_uuid": f"eq.{orcamento_uuid}"
+        })
+        if not rows:
+            return jsonify({"success": False, "error": "Porta não encontrada"}), 404
+        row = rows[0]
+        chave, svg = desenhos.desenhar(row.get("tipo"), portas_codec.decode(row.get("dados_json"), row.get("dados_legado")))
+        if svg is not None:
+            return _resposta_svg(svg, chave)
+        if row.get("svg"):
+            return _resposta_svg(row["svg"], hashlib.sha1(row["svg"].encode()).hexdigest())
+        return jsonify({"success": False, "error": "Porta sem desenho"}), 404
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+# POST para salvar as portas do orçamento (incremental)
 @portas_bp.route("/api/orcamento/<orcamento_uuid>/portas", methods=["POST"])
 def criar_portas(orcamento_uuid):
-    from app import SUPABASE_URL, HEADERS
+    """
+    Recebe a lista completa de portas do orçamento.
+    Portas vindas do GET trazem "id": só as novas ou alteradas (hash diferente)
+    são gravadas, num único upsert; as que sumiram da lista são removidas.
+    Uma porta pode vir só como {"id": ..., "hash": ...} quando não mudou.
+    O desenho é feito aqui: a porta guarda só a hash, e a spec vai para a
+    tabela desenhos. O svg enviado pelo cliente só é guardado quando não dá
+    para desenhar no servidor (sem largura/altura válidas).
+    """
     data = request.json
     portas = data.get("portas", [])
     if not portas or not isinstance(portas, list):
         return jsonify({"success": False, "error": "Nenhuma porta enviada"}), 400
     try:
-        r_delete = requests.delete(
-            f"{SUPABASE_URL}/rest/v1/portas?orcamento_uuid=eq.{orcamento_uuid}",
-            headers=HEADERS
-        )
-        r_delete.raise_for_status()
+        existentes = {
+            str(p["id"]): p.get("hash")
+            for p in db.select("portas", {"select": "id,hash", "orcamento_uuid": f"eq.{orcamento_uuid}"})
+        }
+        # referência {id, hash} só vale para porta que já está no orçamento
+        desconhecidas = [
+            str(p.get("id")) for p in portas
+            if "tipo" not in p and "dados" not in p and str(p.get("id")) not in existentes
+        ]
+        if desconhecidas:
+            return jsonify({
+                "success": False,
+                "error": f"Portas não encontradas neste orçamento: {', '.join(desconhecidas)}"
+            }), 400
+
         payload = []
+        ids = []
+        desenhar = []
         for p in portas:
-            dados_obj = p.get("dados", {})
-            # converte dict para array de texto
-            dados_array = [f"{k}:{v}" for k,v in dados_obj.items()]
-            payload.append({
+            porta_id = str(p["id"]) if p.get("id") is not None and str(p["id"]) in existentes else None
+            if porta_id and "tipo" not in p and "dados" not in p:
+                # referência a porta sem alteração
+                ids.append(porta_id)
+                continue
+            desenho, _ = desenhos.desenhar(p.get("tipo"), p.get("dados", {}))
+            row = {
+                "id": porta_id or str(uuid.uuid4()),
                 "orcamento_uuid": p.get("orcamento_uuid", orcamento_uuid),
                 "tipo": p.get("tipo"),
-                "dados": dados_array,
+                "dados_json": portas_codec.encode(p.get("dados", {})),
+                "dados": None,
                 "quantidade": p.get("quantidade", 1),
                 "preco": p.get("preco"),
-                "svg": p.get("svg")
+                "desenho": desenho,
+                "svg": None if desenho else p.get("svg")
+            }
+            row["hash"] = hash_porta(row)
+            ids.append(row["id"])
+            if existentes.get(row["id"]) != row["hash"]:
+                payload.append(row)
+                desenhar.append((p.get("tipo"), p.get("dados", {})))
+
+        # a spec antes das portas: nenhuma porta aponta para desenho que não está no banco
+        desenhos.persistir(desenhar)
+        portas_salvas = db.upsert("portas", payload, on_conflict="id", retornar=True) if payload else []
+
+        mantidas = set(ids)
+        removidas = [i for i in existentes if i not in mantidas]
+        if removidas:
+            db.delete("portas", {
+                "orcamento_uuid": f"eq.{orcamento_uuid}",
+                "id": f"in.({','.join(removidas)})"
             })
-        r_post = requests.post(
-            f"{SUPABASE_URL}/rest/v1/portas",
-            headers={**HEADERS, "Content-Type": "application/json", "Prefer": "return=representation"},
-            json=payload
-        )
-        r_post.raise_for_status()
-        portas_salvas = r_post.json()
-        return jsonify({"success": True, "portas_salvas": portas_salvas})
+
+        return jsonify({
+            "success": True,
+            "ids": ids,
+            "portas_salvas": portas_salvas,
+            "removidas": removidas,
+            "inalteradas": len(ids) - len(payload)
+        })
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
     except requests.HTTPError as http_err:
         return jsonify({"success": False, "error": f"{http_err.response.status_code} {http_err.response.text}"}), http_err.response.status_code
     except Exception as e:
@@ -81,7 +198,6 @@ def criar_portas(orcamento_uuid):
 # POST para finalizar orçamento (atualiza quantidade_total e valor_total)
 @portas_bp.route("/api/orcamento/<orcamento_uuid>/finalizar", methods=["POST"])
 def finalizar_orcamento(orcamento_uuid):
-    from app import SUPABASE_URL, HEADERS
     data = request.json
     quantidade_total = data.get("quantidade_total", 0)
     valor_total = data.get("valor_total", 0)
@@ -90,12 +206,7 @@ def finalizar_orcamento(orcamento_uuid):
             "quantidade_total": quantidade_total,
             "valor_total": valor_total
         }
-        r_patch = requests.patch(
-            f"{SUPABASE_URL}/rest/v1/orcamentos?uuid=eq.{orcamento_uuid}",
-            headers={**HEADERS, "Content-Type": "application/json"},
-            json=payload
-        )
-        r_patch.raise_for_status()
+        db.update("orcamentos", {"uuid": f"eq.{orcamento_uuid}"}, payload)
         return jsonify({"success": True})
     except requests.HTTPError as http_err:
         return jsonify({"success": False, "error": f"{http_err.response.status_code} {http_err.response.text}"}), http_err.response.status_code
@@ -0,0 +1,47 @@
+from flask import Blueprint, request, jsonify
+from catalog_cache import catalogo
+from precificacao import calcular_lote
+from paralelo import em_paralelo
+
+precos_bp = Blueprint("precos_bp", __name__)
+
+# =====================
+# PREÇO EM LOTE
+# =====================
+
+@precos_bp.route("/api/precos/lote", methods=["POST"])
+def precos_lote():
+    """
+    Espera:
+    {
+        "portas": [
+            {"largura": 800, "altura": 2100, "perfil_id": 1, "vidro_id": 3, "quantidade": 2},
+            ...
+        ]
+    }
+    Medidas em mm.
+    """
+    data = request.json or {}
+    portas = data.get("portas", [])
+    if not portas or not isinstance(portas, list):
+        return jsonify({"success": False, "error": "Nenhuma porta enviada"}), 400
+
+    try:
+        perfis, vidros = em_paralelo(
+            lambda: catalogo.obter("perfis"),
+            lambda: catalogo.obter("vidros")
+        )
+        unitarios, totais, total, avisos = calcular_lote(portas, perfis.por_id, vidros.por_id)
+        return jsonify({
+            "success": True,
+            "portas": [
+                {"preco_unitario": u, "preco_total": t}
+                for u, t in zip(unitarios.tolist(), totais.tolist())
+            ],
+            "total": total,
+            "avisos": avisos
+        })
+    except (TypeError, ValueError) as e:
+        return jsonify({"success": False, "error": f"Dados inválidos: {e}"}), 400
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
@@ -0,0 +1,182 @@
+import re
+import math
+from flask import Blueprint, request, Response, stream_with_context, jsonify
+import requests
+import supabase_client as db
+import portas_codec
+import plano_corte
+import plano_vidros
+from catalog_cache import catalogo
+from producao_eventos import difusor
+
+producao_bp = Blueprint("producao_bp", __name__)
+
+# =====================
+# QUADRO DE PRODUÇÃO (SSE)
+# =====================
+
+@producao_bp.route("/api/producao/stream", methods=["GET"])
+def producao_stream():
+    """
+    Server-Sent Events com os orçamentos que mudaram (event: orcamento).
+    Precisa de worker com threads (gunicorn -k gthread): cada tela mantém a conexão aberta.
+    """
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    resp = Response(
+        stream_with_context(difusor.stream(last_event_id)),
+        mimetype="text/event-stream"
+    )
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.headers["X-Accel-Buffering"] = "no"
+    return resp
+
+# =====================
+# VALIDAÇÃO DOS PARÂMETROS
+# =====================
+
+# uuid ou id simples: vai dentro de in.(...) na consulta das portas
+ID_ORCAMENTO = re.compile(r"[0-9A-Za-z_-]+")
+
+
+def _orcamentos(data):
+    """Lista de ids de orçamento do corpo; ValueError se vazia ou com id inválido."""
+    orcamentos = data.get("orcamentos")
+    if not orcamentos or not isinstance(orcamentos, list):
+        raise ValueError("Informe a lista de orcamentos")
+    invalidos = [o for o in orcamentos if not isinstance(o, str) or not ID_ORCAMENTO.fullmatch(o)]
+    if invalidos:
+        raise ValueError(f"orcamentos inválidos: {invalidos[:5]}")
+    return orcamentos
+
+
+def _medida(valor, nome, zero=False):
+    """Número finito > 0 (>= 0 com zero=True); ValueError com o nome do campo."""
+    if isinstance(valor, bool) or not isinstance(valor, (int, float, str)):
+        raise ValueError(f"{nome} deve ser um número")
+    numero = float(valor)
+    if not math.isfinite(numero) or numero < 0 or (numero == 0 and not zero):
+        raise ValueError(f"{nome} deve ser {'>= 0' if zero else '> 0'}")
+    return numero
+
+
+def _booleano(valor, nome):
+    """true/false do JSON, ou 1/0 e "true"/"false" vindos de formulário."""
+    if isinstance(valor, bool):
+        return valor
+    if isinstance(valor, int) and valor in (0, 1):
+        return bool(valor)
+    if isinstance(valor, str) and valor.strip().lower() in ("true", "1", "false", "0"):
+        return valor.strip().lower() in ("true", "1")
+    raise ValueError(f"{nome} deve ser true ou false")
+
+
+def _chapas(chapas):
+    """{"<tipo>|<espessura>": {"largura", "altura"}} com medidas > 0 (as duas opcionais)."""
+    if not isinstance(chapas, dict):
+        raise ValueError("chapas_por_vidro deve ser {grupo: {largura, altura}}")
+    validas = {}
+    for grupo, chapa in chapas.items():
+        if not isinstance(chapa, dict):
+            raise ValueError(f"chapas_por_vidro[{grupo}] deve ser {{largura, altura}}")
+        validas[grupo] = {
+            campo: _medida(chapa[campo], f"chapas_por_vidro[{grupo}].{campo}")
+            for campo in ("largura", "altura") if campo in chapa
+        }
+    return validas
+
+# =====================
+# PLANO DE CORTE DOS PERFIS
+# =====================
+
+def portas_dos_orcamentos(orcamentos):
+    """Portas de vários orçamentos numa consulta, com dados decodificados."""
+    portas = db.select("portas", {
+        "select": "id,orcamento_uuid,tipo,dados_json,dados_legado:dados,quantidade",
+        "orcamento_uuid": f"in.({','.join(orcamentos)})"
+    })
+    for p in portas:
+        p["dados"] = portas_codec.decode(p.pop("dados_json"), p.pop("dados_legado", None))
+    return portas
+
+
+@producao_bp.route("/api/producao/plano-corte", methods=["POST"])
+def plano_de_corte():
+    """
+    Espera:
+    {
+        "orcamentos": ["<uuid>", ...],
+        "barra_mm": 6000, "kerf_mm": 4, "sobra_minima_mm": 300,
+        "otimizar_ms": 200,
+        "barras_por_perfil": {"<perfil_id>": 5000}
+    }
+    Tudo opcional menos orcamentos.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"success": False, "error": "Informe a lista de orcamentos"}), 400
+    try:
+        orcamentos = _orcamentos(data)
+        barras = data.get("barras_por_perfil") or {}
+        if not isinstance(barras, dict):
+            raise ValueError("barras_por_perfil deve ser {perfil_id: comprimento}")
+        parametros = {
+            "barra_mm": _medida(data.get("barra_mm", plano_corte.BARRA_MM), "barra_mm"),
+            "kerf_mm": _medida(data.get("kerf_mm", plano_corte.KERF_MM), "kerf_mm", zero=True),
+            "sobra_minima_mm": _medida(data.get("sobra_minima_mm", plano_corte.SOBRA_MINIMA_MM), "sobra_minima_mm", zero=True),
+            "otimizar_ms": min(_medida(data.get("otimizar_ms", plano_corte.OTIMIZAR_MS), "otimizar_ms", zero=True), 2000),
+            "barras_por_perfil": {str(k): _medida(v, f"barras_por_perfil[{k}]") for k, v in barras.items()}
+        }
+    except ValueError as e:
+        return jsonify({"success": False, "error": f"Parâmetros inválidos: {e}"}), 400
+
+    try:
+        portas = portas_dos_orcamentos(orcamentos)
+        plano = plano_corte.planejar(portas, catalogo.obter("perfis").por_id, **parametros)
+        return jsonify({"success": True, "portas": len(portas), **plano})
+    except requests.HTTPError as http_err:
+        return jsonify({"success": False, "error": f"{http_err.response.status_code} {http_err.response.text}"}), http_err.response.status_code
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+# =====================
+# PLANO DE CHAPAS DE VIDRO
+# =====================
+
+@producao_bp.route("/api/producao/plano-vidros", methods=["POST"])
+def plano_de_vidros():
+    """
+    Espera:
+    {
+        "orcamentos": ["<uuid>", ...],
+        "chapa_largura": 3210, "chapa_altura": 2250,
+        "refilo_mm": 10, "espaco_mm": 3, "girar": true,
+        "otimizar_ms": 300,
+        "chapas_por_vidro": {"<tipo>|<espessura>": {"largura": 3300, "altura": 2140}}
+    }
+    Tudo opcional menos orcamentos.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"success": False, "error": "Informe a lista de orcamentos"}), 400
+    try:
+        orcamentos = _orcamentos(data)
+        parametros = {
+            "chapa_largura": _medida(data.get("chapa_largura", plano_vidros.CHAPA_LARGURA_MM), "chapa_largura"),
+            "chapa_altura": _medida(data.get("chapa_altura", plano_vidros.CHAPA_ALTURA_MM), "chapa_altura"),
+            "refilo_mm": _medida(data.get("refilo_mm", plano_vidros.REFILO_MM), "refilo_mm", zero=True),
+            "espaco_mm": _medida(data.get("espaco_mm", plano_vidros.ESPACO_CORTE_MM), "espaco_mm", zero=True),
+            "girar": _booleano(data.get("girar", True), "girar"),
+            "otimizar_ms": min(_medida(data.get("otimizar_ms", plano_vidros.OTIMIZAR_MS), "otimizar_ms", zero=True), 5000),
+            "chapas_por_vidro": _chapas(data.get("chapas_por_vidro") or {})
+        }
+    except ValueError as e:
+        return jsonify({"success": False, "error": f"Parâmetros inválidos: {e}"}), 400
+
+    try:
+        portas = portas_dos_orcamentos(orcamentos)
+        plano = plano_vidros.planejar(portas, catalogo.obter("vidros").por_id, **parametros)
+        return jsonify({"success": True, "portas": len(portas), **plano})
+    except requests.HTTPError as http_err:
+        return jsonify({"success": False, "error": f"{http_err.response.status_code} {http_err.response.text}"}), http_err.response.status_code
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
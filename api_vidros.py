@@ -1,22 +1,7 @@
-import os
-import requests
 from flask import Blueprint, request, jsonify
-
-# =====================
-# CONFIG SUPABASE (LOCAL)
-# =====================
-
-SUPABASE_URL = os.environ.get("SUPABASE_URL")
-SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
-
-if not SUPABASE_URL or not SUPABASE_KEY:
-    raise RuntimeError("SUPABASE_URL ou SUPABASE_KEY não configurados")
-
-HEADERS = {
-    "apikey": SUPABASE_KEY,
-    "Authorization": f"Bearer {SUPABASE_KEY}",
-    "Content-Type": "application/json"
-}
+import supabase_client as db
+from catalog_cache import catalogo, responder
+from precificacao import calcular_preco
 
 # =====================
 # BLUEPRINT
@@ -24,14 +9,6 @@ HEADERS = {
 
 vidros_bp = Blueprint("vidros_bp", __name__)
 
-# =====================
-# CÁLCULO
-# =====================
-
-def calcular_preco(custo, margem, perda):
-    custo_com_perda = custo * (1 + perda / 100)
-    return custo_com_perda * (1 + margem / 100)
-
 # =====================
 # ROTAS VIDROS
 # =====================
@@ -39,12 +16,7 @@ def calcular_preco(custo, margem, perda):
 @vidros_bp.route("/api/vidros", methods=["GET"])
 def listar_vidros():
     try:
-        r = requests.get(
-            f"{SUPABASE_URL}/rest/v1/vidros?select=*&order=tipo.asc",
-            headers=HEADERS
-        )
-        r.raise_for_status()
-        return jsonify(r.json())
+        return responder("vidros")
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -69,12 +41,8 @@ def criar_vidro():
             "preco": round(preco, 2)
         }
 
-        r = requests.post(
-            f"{SUPABASE_URL}/rest/v1/vidros",
-            headers=HEADERS,
-            json=payload
-        )
-        r.raise_for_status()
+        db.insert("vidros", payload)
+        catalogo.invalidar("vidros")
 
         return jsonify({"status": "ok"})
     except Exception as e:
@@ -101,12 +69,8 @@ def editar_vidro(id):
             "preco": round(preco, 2)
         }
 
-        r = requests.patch(
-            f"{SUPABASE_URL}/rest/v1/vidros?id=eq.{id}",
-            headers=HEADERS,
-            json=payload
-        )
-        r.raise_for_status()
+        db.update("vidros", {"id": f"eq.{id}"}, payload)
+        catalogo.invalidar("vidros")
 
         return jsonify({"status": "updated"})
     except Exception as e:
@@ -116,11 +80,8 @@ def editar_vidro(id):
 @vidros_bp.route("/api/vidros/<id>", methods=["DELETE"])
 def deletar_vidro(id):
     try:
-        r = requests.delete(
-            f"{SUPABASE_URL}/rest/v1/vidros?id=eq.{id}",
-            headers=HEADERS
-        )
-        r.raise_for_status()
+        db.delete("vidros", {"id": f"eq.{id}"})
+        catalogo.invalidar("vidros")
 
         return jsonify({"status": "deleted"})
     except Exception as e:
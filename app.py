@@ -9,17 +9,8 @@ import datetime
 # CONFIG GLOBAL
 # =====================
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-
-if not SUPABASE_URL or not SUPABASE_KEY:
-    raise RuntimeError("SUPABASE_URL ou SUPABASE_KEY não definidos")
-
-HEADERS = {
-    "apikey": SUPABASE_KEY,
-    "Authorization": f"Bearer {SUPABASE_KEY}",
-    "Content-Type": "application/json"
-}
+# Config do Supabase fica em supabase_client (mantido aqui por compatibilidade)
+from supabase_client import SUPABASE_URL, SUPABASE_KEY, HEADERS
 
 # =====================
 # APP
@@ -28,6 +19,14 @@ HEADERS = {
 app = Flask(__name__)
 CORS(app)  # aceita requisições de qualquer origem, pode restringir se quiser
 
+# Latência por rota, chamadas ao Supabase por requisição, Server-Timing e /metrics
+import metricas
+metricas.instalar(app)
+
+# Profiling opt-in (PROFILE_SAMPLE_RATE ou header X-Profile com token de admin)
+import perfilador
+perfilador.instalar(app)
+
 # =====================
 # HEALTH CHECK
 # =====================
@@ -46,6 +45,11 @@ from api_insumos import insumos_bp
 from api_orcamentos import orcamentos_bp
 from api_portas import portas_bp  # ✅ blueprint de portas
 from api_orc import orc_bp  
+from api_precos import precos_bp
+from api_bot import bot_bp
+from api_producao import producao_bp
+from api_bom import bom_bp
+from api_catalogo import catalogo_bp
 
 app.register_blueprint(perfis_bp)
 app.register_blueprint(vidros_bp)
@@ -53,6 +57,11 @@ app.register_blueprint(insumos_bp)
 app.register_blueprint(orcamentos_bp)
 app.register_blueprint(portas_bp)  # ✅ registrando blueprint de portas
 app.register_blueprint(orc_bp)  
+app.register_blueprint(precos_bp)
+app.register_blueprint(bot_bp)
+app.register_blueprint(producao_bp)
+app.register_blueprint(bom_bp)
+app.register_blueprint(catalogo_bp)
 
 
 # =====================
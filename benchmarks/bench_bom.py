@@ -0,0 +1,75 @@
+"""
+Benchmark: lista de materiais de orçamentos com centenas de itens,
+com a memória de submontagens fria (1ª chamada) e quente (mesmo catálogo).
+
+    python benchmarks/bench_bom.py [n_itens]
+"""
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_KEY", "bench")
+
+from catalog_cache import catalogo, Entrada
+from lista_materiais import MotorBOM
+
+TIPOS = ["giro", "correr", "deslizante", "pivotante"]
+
+
+def catalogo_sintetico(n_perfis=300, n_vidros=100, n_materiais=200):
+    materiais = [{
+        "id": i, "nome": f"Material {i}",
+        "tipo_medida": random.choice(["unidade", "metro_linear", "metro_quadrado"]),
+        "preco": random.uniform(1, 50)
+    } for i in range(n_materiais)]
+    perfis = [{
+        "id": i, "nome": f"Perfil {i}", "preco": random.uniform(20, 200),
+        "insumos": [m["nome"] for m in random.sample(materiais, 4)]
+    } for i in range(n_perfis)]
+    vidros = [{"id": i, "tipo": f"Vidro {i}", "preco": random.uniform(50, 600)} for i in range(n_vidros)]
+    catalogo.ttl = float("inf")  # sem rede: o snapshot sintético não expira
+    catalogo._sinal_ativo = False
+    for tabela, dados in (("perfis", perfis), ("vidros", vidros), ("materiais", materiais)):
+        catalogo._aplicar(tabela, Entrada(dados))
+
+
+def itens_sinteticos(n):
+    """Orçamento realista: poucos modelos de porta repetidos em várias medidas."""
+    itens = []
+    for _ in range(n):
+        if random.random() < 0.1:
+            itens.append({"tipo": "cristaleira", "quantidade": 1, "dados": {
+                "largura": random.choice([800, 1000, 1200]), "portas": random.choice([2, 3]),
+                "perfil": random.randrange(300), "vidro": random.randrange(100)
+            }})
+        else:
+            itens.append({"tipo": random.choice(TIPOS), "quantidade": random.randint(1, 4), "dados": {
+                "largura": random.choice(range(600, 1300, 50)), "altura": random.choice(range(1900, 2500, 100)),
+                "qtd_folhas": random.choice([2, 3]), "perfil": random.randrange(30), "vidro": random.randrange(10)
+            }})
+    return itens
+
+
+def medir(fn, repeticoes=10):
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        fn()
+        melhor = min(melhor, time.perf_counter() - t0)
+    return melhor * 1000
+
+
+if __name__ == "__main__":
+    random.seed(42)
+    catalogo_sintetico()
+    for n in [int(sys.argv[1])] if len(sys.argv) > 1 else [100, 500, 2000]:
+        itens = itens_sinteticos(n)
+        frio = medir(lambda: MotorBOM().explodir(itens))
+        motor = MotorBOM()
+        motor.explodir(itens)
+        quente = medir(lambda: motor.explodir(itens))
+        print(f"{n:>6} itens | memória fria {frio:8.2f} ms | quente {quente:8.2f} ms | {motor.stats()}")
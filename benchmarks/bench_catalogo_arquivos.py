@@ -0,0 +1,72 @@
+"""
+Benchmark: importação de CSV do catálogo contra o PostgREST falso dos
+testes (tests/stubs.py), em processo. Mostra tempo, chamadas HTTP e o pico
+de memória (tracemalloc) para arquivos de tamanhos diferentes: o pico
+acompanha o lote e o catálogo, não o tamanho do arquivo.
+
+    python benchmarks/bench_catalogo_arquivos.py [n_linhas] [itens_distintos]
+"""
+import os
+import sys
+import time
+import tempfile
+import tracemalloc
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.join(RAIZ, "tests"))
+
+from stubs import PostgrestStub
+
+stub = PostgrestStub()
+os.environ["SUPABASE_URL"] = stub.url
+os.environ["SUPABASE_KEY"] = "bench"
+
+import catalogo_arquivos
+from catalog_cache import catalogo
+
+
+class Contador(list):
+    """Conta as chamadas do stub sem guardar os corpos (não pesa na medida)."""
+
+    def append(self, chamada):
+        self.total = getattr(self, "total", 0) + 1
+
+
+def arquivo_csv(n, distintos):
+    f = tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False, encoding="utf-8")
+    f.write("nome;custo;margem;perda;tipologias\n")
+    for i in range(n):
+        f.write(f"Perfil {i % distintos};{10 + i % 97},{i % 100:02d};30;5;giro|correr\n")
+    f.close()
+    return f.name
+
+
+def medir(n, distintos):
+    stub.limpar()
+    stub.chamadas = Contador()
+    catalogo._entradas.clear()
+    catalogo._sinal_ativo = False
+    caminho = arquivo_csv(n, distintos)
+    try:
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        with open(caminho, "rb") as f:
+            resultado = catalogo_arquivos.importar("perfis", f)
+        total = time.perf_counter() - t0
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        os.remove(caminho)
+    assert resultado["n_erros"] == 0, resultado["erros"][:3]
+    return total, stub.chamadas.total, pico
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    distintos = int(sys.argv[2]) if len(sys.argv) > 2 else n
+    print(f"lote de {catalogo_arquivos.LOTE_IMPORTACAO} linhas, {distintos} itens distintos no máximo")
+    for linhas in (n // 4, n):
+        total, chamadas, pico = medir(linhas, min(distintos, linhas))
+        print(f"{linhas:>8} linhas: {total:.2f}s | {chamadas} chamadas HTTP | pico {pico / 1024:.0f} KiB")
+    stub.fechar()
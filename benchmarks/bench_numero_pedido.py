@@ -0,0 +1,38 @@
+"""
+Dispara criações de orçamento em paralelo contra a API rodando e confere
+que nenhum numero_pedido se repete. Use com um Supabase/Postgres local
+(sql/003 aplicado), nunca com o de produção.
+
+    python benchmarks/bench_numero_pedido.py http://localhost:5000 [n] [threads]
+"""
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+
+def criar(base_url, i):
+    t0 = time.perf_counter()
+    r = requests.post(f"{base_url}/api/orcamento", json={"cliente_nome": f"teste concorrencia {i}"}, timeout=30)
+    r.raise_for_status()
+    return r.json()["numero_pedido"], time.perf_counter() - t0
+
+
+if __name__ == "__main__":
+    base_url = sys.argv[1]
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    threads = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        resultados = list(pool.map(lambda i: criar(base_url, i), range(n)))
+    total = time.perf_counter() - t0
+
+    numeros = Counter(num for num, _ in resultados)
+    repetidos = {num: c for num, c in numeros.items() if c > 1}
+    latencias = sorted(lat for _, lat in resultados)
+    print(f"{n} criações em {total:.2f}s | p50 {latencias[n // 2] * 1000:.1f} ms | p99 {latencias[int(n * 0.99)] * 1000:.1f} ms")
+    print("duplicados:", repetidos or "nenhum")
+    sys.exit(1 if repetidos else 0)
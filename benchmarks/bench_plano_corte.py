@@ -0,0 +1,52 @@
+"""
+Benchmark: plano de corte de um dia de produção sintético (milhares de
+peças), só a heurística e heurística + melhoria.
+
+    python benchmarks/bench_plano_corte.py [n_portas]
+"""
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_KEY", "bench")
+
+from plano_corte import planejar
+
+TIPOS = ["giro", "correr", "deslizante", "pivotante"]
+
+
+def portas_sinteticas(n, n_perfis=8):
+    return [{
+        "id": i,
+        "tipo": random.choice(TIPOS),
+        "quantidade": random.randint(1, 3),
+        "dados": {
+            "largura": random.randint(400, 1800),
+            "altura": random.randint(1800, 2700),
+            "qtd_folhas": random.choice([2, 3]),
+            "perfil": random.randrange(n_perfis),
+        },
+    } for i in range(n)]
+
+
+def medir(portas, otimizar_ms):
+    t0 = time.perf_counter()
+    plano = planejar(portas, otimizar_ms=otimizar_ms)
+    ms = (time.perf_counter() - t0) * 1000
+    cortes = sum(p["n_cortes"] for p in plano["perfis"])
+    limite = sum(p["limite_inferior"] for p in plano["perfis"])
+    return ms, cortes, plano["total_barras"], limite
+
+
+if __name__ == "__main__":
+    random.seed(42)
+    for n in [int(sys.argv[1])] if len(sys.argv) > 1 else [100, 500, 2000]:
+        portas = portas_sinteticas(n)
+        ms, cortes, barras, limite = medir(portas, 0)
+        print(f"{n:>5} portas {cortes:>6} cortes | heurística {ms:8.1f} ms {barras:>5} barras (limite {limite})")
+        ms, cortes, barras, limite = medir(portas, 300)
+        print(f"{'':>5}        {'':>6}        | + melhoria {ms:8.1f} ms {barras:>5} barras")
@@ -0,0 +1,59 @@
+"""
+Benchmark: plano de chapas de vidro de uma semana de pedidos sintética
+(milhares de peças), primeira passada e com busca no prazo.
+
+    python benchmarks/bench_plano_vidros.py [n_portas]
+"""
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_KEY", "bench")
+
+from plano_vidros import planejar
+
+TIPOS = ["giro", "correr", "deslizante", "pivotante"]
+
+
+def catalogo_sintetico():
+    tipos = ["Incolor", "Fumê", "Reflecta bronze", "Espelho prata"]
+    return {str(i): {"id": i, "tipo": tipos[i % 4], "espessura": 4 if i < 6 else 6} for i in range(10)}
+
+
+def portas_sinteticas(n, vidros):
+    return [{
+        "id": i,
+        "tipo": random.choice(TIPOS),
+        "quantidade": random.randint(1, 3),
+        "dados": {
+            "largura": random.randint(300, 1800),
+            "altura": random.randint(400, 2200),
+            "qtd_folhas": random.choice([2, 3]),
+            "vidro": random.choice(list(vidros)),
+        },
+    } for i in range(n)]
+
+
+def medir(portas, vidros, otimizar_ms):
+    t0 = time.perf_counter()
+    plano = planejar(portas, vidros, otimizar_ms=otimizar_ms)
+    ms = (time.perf_counter() - t0) * 1000
+    pecas = sum(g["n_pecas"] for g in plano["grupos"])
+    area = sum(g["area_pecas_m2"] for g in plano["grupos"])
+    chapas = sum(g["area_chapas_m2"] for g in plano["grupos"])
+    return ms, pecas, plano["total_chapas"], area / chapas if chapas else 0
+
+
+if __name__ == "__main__":
+    random.seed(42)
+    vidros = catalogo_sintetico()
+    for n in [int(sys.argv[1])] if len(sys.argv) > 1 else [100, 500, 2000]:
+        portas = portas_sinteticas(n, vidros)
+        for otimizar_ms in (0, 500):
+            ms, pecas, chapas, aproveitamento = medir(portas, vidros, otimizar_ms)
+            print(f"{n:>5} portas {pecas:>5} peças | busca {otimizar_ms:>4} ms | {ms:8.1f} ms "
+                  f"{chapas:>4} chapas ({aproveitamento:.1%} aproveitado)")
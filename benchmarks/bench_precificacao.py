@@ -0,0 +1,57 @@
+"""
+Benchmark: preço em lote (NumPy) x laço escalar.
+
+    python benchmarks/bench_precificacao.py [n_portas]
+"""
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from precificacao import calcular_lote, calcular_preco_porta
+
+
+def catalogo_sintetico(n_perfis=300, n_vidros=100):
+    perfis = {str(i): {"id": i, "preco": random.uniform(20, 200)} for i in range(n_perfis)}
+    vidros = {str(i): {"id": i, "preco": random.uniform(50, 600)} for i in range(n_vidros)}
+    return perfis, vidros
+
+
+def portas_sinteticas(n, perfis, vidros):
+    return [{
+        "largura": random.randint(400, 1200),
+        "altura": random.randint(1800, 2600),
+        "perfil_id": random.choice(list(perfis)),
+        "vidro_id": random.choice(list(vidros)),
+        "quantidade": random.randint(1, 5),
+    } for _ in range(n)]
+
+
+def escalar(portas, perfis, vidros):
+    total = 0
+    for p in portas:
+        total += calcular_preco_porta(
+            p["largura"], p["altura"], perfis.get(str(p["perfil_id"])), vidros.get(str(p["vidro_id"]))
+        ) * p["quantidade"]
+    return round(total, 2)
+
+
+def medir(fn, repeticoes=20):
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        fn()
+        melhor = min(melhor, time.perf_counter() - t0)
+    return melhor * 1000
+
+
+if __name__ == "__main__":
+    random.seed(42)
+    perfis, vidros = catalogo_sintetico()
+    for n in [int(sys.argv[1])] if len(sys.argv) > 1 else [10, 100, 1000, 10000]:
+        portas = portas_sinteticas(n, perfis, vidros)
+        t_lote = medir(lambda: calcular_lote(portas, perfis, vidros))
+        t_escalar = medir(lambda: escalar(portas, perfis, vidros))
+        print(f"{n:>6} portas | lote {t_lote:8.3f} ms | escalar {t_escalar:8.3f} ms")
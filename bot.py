@@ -1,67 +1,55 @@
 from flask import Flask, request, jsonify
-import requests
 import os
+from whatsapp_fila import FilaWhatsApp, SPOOL_DIR
+from webhook_dedup import criar_dedup
 
 app = Flask(__name__)
 
 # ===================== CONFIGURAÇÕES =====================
-# Supabase
-SUPABASE_URL = os.getenv("SUPABASE_URL", "https://xyz.supabase.co")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY", "SEU_SUPABASE_KEY")
-HEADERS = {
-    "apikey": SUPABASE_KEY,
-    "Authorization": f"Bearer {SUPABASE_KEY}",
-    "Content-Type": "application/json"
-}
+# Supabase: config e catálogo vêm de supabase_client / catalog_cache
+from catalog_cache import catalogo
+from paralelo import em_paralelo, ATRASADO
+import precificacao
+
+# Snapshot do catálogo mantido quente em segundo plano (sem rede por mensagem)
+catalogo.iniciar_atualizacao()
 
 # WhatsApp Business
 WHATSAPP_PHONE_ID = os.getenv("WHATSAPP_PHONE_ID", "SEU_PHONE_ID")
 WHATSAPP_TOKEN = os.getenv("WHATSAPP_TOKEN", "SEU_TEMPORARY_ACCESS_TOKEN")
 WHATSAPP_API_URL = f"https://graph.facebook.com/v17.0/{WHATSAPP_PHONE_ID}/messages"
 
-# ===================== FUNÇÕES =====================
-def enviar_mensagem_whatsapp(numero, mensagem):
-    """Envia mensagem pelo WhatsApp Business API"""
-    payload = {
-        "messaging_product": "whatsapp",
-        "to": numero,
-        "type": "text",
-        "text": {"body": mensagem}
-    }
-    headers = {
-        "Authorization": f"Bearer {WHATSAPP_TOKEN}",
-        "Content-Type": "application/json"
-    }
-    r = requests.post(WHATSAPP_API_URL, json=payload, headers=headers)
-    r.raise_for_status()
-    return r.json()
-
-def calcular_preco_porta(largura, altura, perfil_id=None, vidro_id=None):
-    """Busca perfis/vidros no Supabase e calcula preço da porta"""
-    # Pegar todos os perfis
-    r = requests.get(f"{SUPABASE_URL}/rest/v1/perfis?select=*", headers=HEADERS)
-    r.raise_for_status()
-    perfis = r.json()
-
-    # Pegar todos os vidros
-    r = requests.get(f"{SUPABASE_URL}/rest/v1/vidros?select=*", headers=HEADERS)
-    r.raise_for_status()
-    vidros = r.json()
+# Respostas saem por fila em segundo plano (o webhook responde 200 na hora)
+fila_whatsapp = FilaWhatsApp(WHATSAPP_API_URL, WHATSAPP_TOKEN, spool_dir=os.path.join(SPOOL_DIR, "bot"))
+# Reenvia já na subida do worker o que um processo morto deixou no spool
+fila_whatsapp.iniciar()
 
-    preco_perfil = 0
-    preco_vidro = 0
+# Tempo máximo para achar perfil e vidro; depois disso responde com o que tiver
+BOT_PRAZO_SEGUNDOS = float(os.getenv("BOT_PRAZO_SEGUNDOS", "2"))
 
-    if perfil_id:
-        perfil = next((p for p in perfis if p["id"] == perfil_id), None)
-        if perfil:
-            preco_perfil = perfil["preco"] * 2 * (largura + altura)
+# Ids de mensagens já respondidas (Meta reentrega quando o 200 atrasa)
+dedup = criar_dedup()
 
-    if vidro_id:
-        vidro = next((v for v in vidros if v["id"] == vidro_id), None)
-        if vidro:
-            preco_vidro = vidro["preco"] * largura * altura
+# ===================== FUNÇÕES =====================
+def _buscar(tabela, item_id):
+    return lambda: catalogo.obter(tabela).por_id.get(str(item_id)) if item_id else None
 
-    return round(preco_perfil + preco_vidro, 2)
+def calcular_preco_porta(largura, altura, perfil_id=None, vidro_id=None):
+    """
+    Calcula preço da porta (medidas em metros) com o catálogo em memória.
+    Perfil e vidro são buscados ao mesmo tempo, com prazo; retorna
+    (preco, pendentes) onde pendentes lista o que não chegou a tempo.
+    """
+    catalogo.iniciar_atualizacao()  # no-op se já rodando neste processo
+    perfil, vidro = em_paralelo(
+        _buscar("perfis", perfil_id),
+        _buscar("vidros", vidro_id),
+        prazo=BOT_PRAZO_SEGUNDOS
+    )
+    pendentes = [nome for nome, item in (("perfil", perfil), ("vidro", vidro)) if item is ATRASADO]
+    perfil = None if perfil is ATRASADO else perfil
+    vidro = None if vidro is ATRASADO else vidro
+    return precificacao.calcular_preco_porta(largura * 1000, altura * 1000, perfil, vidro), pendentes
 
 # ===================== ROTAS WHATSAPP =====================
 @app.route("/webhook", methods=["GET"])
@@ -83,36 +71,52 @@ def webhook_receber():
                 for change in entry.get("changes", []):
                     mensagem_obj = change.get("value", {}).get("messages", [])
                     for msg in mensagem_obj:
-                        numero = msg["from"]
-                        texto = msg.get("text", {}).get("body", "").lower()
-
-                        # ===================== LÓGICA DO BOT =====================
-                        if "preço" in texto or "orçamento" in texto:
-                            try:
-                                params = {}
-                                for part in texto.split():
-                                    if "=" in part:
-                                        k, v = part.split("=")
-                                        params[k] = v
-
-                                largura = float(params.get("largura", 0)) / 1000
-                                altura = float(params.get("altura", 0)) / 1000
-                                perfil_id = params.get("perfil")
-                                vidro_id = params.get("vidro")
-
-                                preco = calcular_preco_porta(largura, altura, perfil_id, vidro_id)
-                                resposta = f"O preço estimado da porta é: R$ {preco:.2f}"
-                            except Exception as e:
-                                resposta = f"Erro ao calcular o preço: {str(e)}"
-                        else:
-                            resposta = "Olá! Para calcular o preço de uma porta, envie algo como:\naltura=200 largura=100 perfil=<id> vidro=<id>"
-
-                        enviar_mensagem_whatsapp(numero, resposta)
+                        if msg.get("id") and not dedup.registrar(msg["id"]):
+                            continue  # reentrega: já respondida
+                        try:
+                            numero = msg["from"]
+                            texto = msg.get("text", {}).get("body", "").lower()
+
+                            # ===================== LÓGICA DO BOT =====================
+                            if "preço" in texto or "orçamento" in texto:
+                                try:
+                                    params = {}
+                                    for part in texto.split():
+                                        if "=" in part:
+                                            k, v = part.split("=")
+                                            params[k] = v
+
+                                    largura = float(params.get("largura", 0)) / 1000
+                                    altura = float(params.get("altura", 0)) / 1000
+                                    perfil_id = params.get("perfil")
+                                    vidro_id = params.get("vidro")
+
+                                    preco, pendentes = calcular_preco_porta(largura, altura, perfil_id, vidro_id)
+                                    resposta = f"O preço estimado da porta é: R$ {preco:.2f}"
+                                    if pendentes:
+                                        resposta += (f"\n(parcial, sem {' e '.join(pendentes)}: o catálogo demorou a "
+                                                     f"responder, envie de novo em instantes)")
+                                except Exception as e:
+                                    resposta = f"Erro ao calcular o preço: {str(e)}"
+                            else:
+                                resposta = "Olá! Para calcular o preço de uma porta, envie algo como:\naltura=200 largura=100 perfil=<id> vidro=<id>"
+
+                            fila_whatsapp.enviar(numero, resposta)
+                        except Exception:
+                            # falhou antes de enfileirar: a reentrega da Meta tem que ser atendida
+                            if msg.get("id"):
+                                dedup.esquecer(msg["id"])
+                            raise
         return jsonify({"status": "ok"})
     except Exception as e:
         print("Erro webhook:", e)
         return jsonify({"error": str(e)}), 500
 
+@app.route("/webhook/stats", methods=["GET"])
+def webhook_stats():
+    """Quantas reentregas da Meta foram descartadas"""
+    return jsonify(dedup.stats())
+
 # ===================== RODA APP =====================
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=int(os.getenv("PORT", 5000)))
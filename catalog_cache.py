@@ -0,0 +1,220 @@
+import os
+import time
+import json
+import hashlib
+import threading
+import requests
+from datetime import datetime, timezone
+from flask import request, jsonify
+
+import supabase_client as db
+
+# =====================
+# CONFIG
+# =====================
+
+# Catálogo muda poucas vezes por dia. Cada worker guarda sua cópia;
+# escritas invalidam o worker que as recebeu, os outros expiram pelo TTL.
+CATALOG_CACHE_TTL = float(os.getenv("CATALOG_CACHE_TTL", "120"))
+
+# Intervalo da atualização em segundo plano (quem chama iniciar_atualizacao)
+CATALOGO_REFRESH_SEGUNDOS = float(os.getenv("CATALOGO_REFRESH_SEGUNDOS", "60"))
+
+# Escritas de outros processos (app, bot, outros workers) chegam pela tabela
+# catalogo_versao (sql/006): consultada no máximo uma vez a cada N segundos.
+# Sem a migração, o atraso máximo volta a ser o TTL / CATALOGO_REFRESH_SEGUNDOS.
+CATALOGO_SINAL_SEGUNDOS = float(os.getenv("CATALOGO_SINAL_SEGUNDOS", "2"))
+
+# tabela -> params do select usado pelas rotas de listagem
+TABELAS = {
+    "perfis": {"order": "nome.asc"},
+    "vidros": {"order": "tipo.asc"},
+    "materiais": {"order": "nome.asc"},
+}
+
+# =====================
+# CACHE
+# =====================
+
+class Entrada:
+    """Snapshot de uma tabela do catálogo."""
+
+    def __init__(self, dados):
+        self.dados = dados
+        self.por_id = {str(row.get("id")): row for row in dados}
+        corpo = json.dumps(dados, sort_keys=True, default=str).encode()
+        self.etag = hashlib.sha1(corpo).hexdigest()
+        self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+        self.carregado_em = time.monotonic()
+
+
+class CatalogCache:
+    def __init__(self, ttl=CATALOG_CACHE_TTL):
+        self.ttl = ttl
+        self._entradas = {}
+        self._ultima_boa = {}
+        self._lock = threading.Lock()
+        # um lock por tabela: perfis e vidros podem carregar ao mesmo tempo
+        self._locks = {tabela: threading.Lock() for tabela in TABELAS}
+        self._refresh_pid = None
+        self._acordar = threading.Event()
+        self._versoes = {}
+        self._sinal_em = 0.0
+        self._sinal_ativo = True
+        self._sinal_lock = threading.Lock()
+        self._sinal_thread = None
+
+    def _carregar(self, tabela):
+        try:
+            return self._aplicar(tabela, Entrada(db.select(tabela, TABELAS[tabela])))
+        except requests.RequestException:
+            # Supabase fora (ou circuito aberto): serve a última cópia boa e tenta de novo em breve
+            antiga = self._ultima_boa.get(tabela)
+            if antiga is None:
+                raise
+            antiga.carregado_em = time.monotonic() - self.ttl + min(self.ttl, 10)
+            self._entradas[tabela] = antiga
+            return antiga
+
+    def _aplicar(self, tabela, nova):
+        antiga = self._entradas.get(tabela)
+        # conteúdo igual: mantém Last-Modified para o 304 continuar valendo
+        if antiga is not None and antiga.etag == nova.etag:
+            nova.last_modified = antiga.last_modified
+        self._entradas[tabela] = nova
+        self._ultima_boa[tabela] = nova
+        return nova
+
+    def obter(self, tabela) -> Entrada:
+        """Entrada atual da tabela; recarrega do Supabase se vazia, expirada ou alterada em outro processo."""
+        if not self.atualizando() and time.monotonic() - self._sinal_em > CATALOGO_SINAL_SEGUNDOS:
+            self._sincronizar_em_segundo_plano()
+        entrada = self._entradas.get(tabela)
+        if entrada is not None and not self._expirada(entrada):
+            return entrada
+        with self._locks[tabela]:
+            entrada = self._entradas.get(tabela)
+            if entrada is None or self._expirada(entrada):
+                entrada = self._carregar(tabela)
+            return entrada
+
+    def _expirada(self, entrada):
+        return time.monotonic() - entrada.carregado_em > self.ttl and not self.atualizando()
+
+    def dados(self, tabela) -> list[dict]:
+        return self.obter(tabela).dados
+
+    def invalidar(self, tabela):
+        """Chamado pelas rotas de escrita: próxima leitura vai ao Supabase."""
+        with self._locks[tabela]:
+            self._entradas.pop(tabela, None)
+        self._acordar.set()
+
+    # ---------- sinal entre processos ----------
+
+    def sincronizar(self):
+        """
+        Lê catalogo_versao (3 linhas) e descarta as tabelas cuja versão mudou
+        desde a última leitura. Retorna as tabelas descartadas. Uma thread por
+        vez; as outras seguem com o snapshot atual.
+        """
+        if not self._sinal_ativo or not self._sinal_lock.acquire(blocking=False):
+            return []
+        try:
+            self._sinal_em = time.monotonic()
+            rows = db.select("catalogo_versao", {"select": "tabela,versao"})
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                print("catalogo_versao não existe (sql/006): catálogo sincroniza só pelo TTL")
+                self._sinal_ativo = False
+            return []
+        except requests.RequestException:
+            return []
+        finally:
+            self._sinal_lock.release()
+
+        mudaram = []
+        for row in rows:
+            tabela, versao = row.get("tabela"), row.get("versao")
+            if tabela not in TABELAS:
+                continue
+            if self._versoes.get(tabela, versao) != versao:
+                with self._locks[tabela]:
+                    self._entradas.pop(tabela, None)
+                mudaram.append(tabela)
+            self._versoes[tabela] = versao
+        return mudaram
+
+    def _sincronizar_em_segundo_plano(self):
+        """
+        Sem a thread de atualização (workers da app): lê catalogo_versao fora
+        da requisição, que segue com o snapshot atual. O descarte vale a partir
+        da próxima leitura.
+        """
+        if not self._sinal_ativo or (self._sinal_thread is not None and self._sinal_thread.is_alive()):
+            return
+        self._sinal_em = time.monotonic()
+        self._sinal_thread = threading.Thread(target=self.sincronizar, daemon=True)
+        self._sinal_thread.start()
+
+    # ---------- atualização em segundo plano ----------
+
+    def atualizando(self):
+        return self._refresh_pid == os.getpid()
+
+    def iniciar_atualizacao(self, intervalo=CATALOGO_REFRESH_SEGUNDOS):
+        """
+        Mantém o catálogo quente: uma thread recarrega todas as tabelas a cada
+        `intervalo` segundos (ou logo após uma escrita neste processo) e, entre
+        uma carga e outra, recarrega só o que catalogo_versao disser que mudou
+        em outro processo. Enquanto ela roda, leituras nunca vão à rede por
+        causa do TTL, servem o último snapshot.
+        Idempotente e seguro após fork (uma thread por processo).
+        """
+        with self._lock:
+            if self.atualizando():
+                return
+            self._refresh_pid = os.getpid()
+        threading.Thread(target=self._loop_atualizacao, args=(intervalo,), daemon=True).start()
+
+    def _recarregar(self, tabelas):
+        for tabela in tabelas:
+            try:
+                nova = Entrada(db.select(tabela, TABELAS[tabela]))
+                with self._locks[tabela]:
+                    self._aplicar(tabela, nova)
+            except Exception as e:
+                print(f"Erro atualizando catálogo ({tabela}):", e)
+
+    def _loop_atualizacao(self, intervalo):
+        self.sincronizar()  # só registra as versões atuais
+        proxima_carga = 0.0
+        while True:
+            if time.monotonic() >= proxima_carga:
+                self._recarregar(TABELAS)
+                proxima_carga = time.monotonic() + intervalo
+            else:
+                self._recarregar(self.sincronizar())
+            if self._acordar.wait(min(intervalo, CATALOGO_SINAL_SEGUNDOS)):
+                self._acordar.clear()
+                proxima_carga = 0.0
+
+
+catalogo = CatalogCache()
+
+# =====================
+# RESPOSTA HTTP
+# =====================
+
+def responder(tabela):
+    """
+    Resposta JSON da tabela com ETag/Last-Modified.
+    Devolve 304 quando o navegador já tem a versão atual (If-None-Match).
+    """
+    entrada = catalogo.obter(tabela)
+    resp = jsonify(entrada.dados)
+    resp.set_etag(entrada.etag)
+    resp.last_modified = entrada.last_modified
+    # navegador guarda, mas sempre revalida (barato: 304 sem corpo)
+    resp.cache_control.no_cache = True
+    return resp.make_conditional(request)
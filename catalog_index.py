@@ -0,0 +1,99 @@
+import bisect
+import threading
+import unicodedata
+
+from catalog_cache import catalogo
+
+# =====================
+# NORMALIZAÇÃO
+# =====================
+
+def normalizar(texto):
+    """Minúsculas e sem acento: 'Refletância' -> 'refletancia'."""
+    texto = unicodedata.normalize("NFKD", str(texto or ""))
+    return "".join(c for c in texto if not unicodedata.combining(c)).lower().strip()
+
+# =====================
+# ÍNDICE
+# =====================
+
+class IndiceSubstring:
+    """
+    Busca por substring (equivalente ao ilike *termo*) sem ir ao banco.
+    Guarda todos os sufixos dos nomes normalizados ordenados: um termo é
+    substring de um nome se for prefixo de algum sufixo dele (bisect).
+    """
+
+    def __init__(self, linhas, campo):
+        self.linhas = linhas
+        sufixos = []
+        for pos, row in enumerate(linhas):
+            nome = normalizar(row.get(campo))
+            for i in range(len(nome)):
+                sufixos.append((nome[i:], pos))
+        sufixos.sort()
+        self._chaves = [s for s, _ in sufixos]
+        self._posicoes = [p for _, p in sufixos]
+        self._memo = {}
+
+    def buscar(self, termo):
+        """Primeira linha (na ordem do catálogo) cujo nome contém o termo."""
+        termo = normalizar(termo)
+        if not termo:
+            return None
+        if termo in self._memo:
+            return self._memo[termo]
+        ini = bisect.bisect_left(self._chaves, termo)
+        fim = bisect.bisect_left(self._chaves, termo + "\uffff", ini)
+        achado = self.linhas[min(self._posicoes[ini:fim])] if fim > ini else None
+        if len(self._memo) > 10000:
+            self._memo.clear()
+        self._memo[termo] = achado
+        return achado
+
+
+class IndiceCatalogo:
+    """Índices de perfis (nome) e vidros (tipo), refeitos quando o catálogo muda."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._indices = {}
+
+    def _indice(self, tabela, campo):
+        entrada = catalogo.obter(tabela)
+        atual = self._indices.get(tabela)
+        if atual is None or atual[0] != entrada.etag:
+            with self._lock:
+                atual = self._indices.get(tabela)
+                if atual is None or atual[0] != entrada.etag:
+                    atual = (entrada.etag, IndiceSubstring(entrada.dados, campo))
+                    self._indices[tabela] = atual
+        return atual[1]
+
+    def perfil(self, termo):
+        return self._indice("perfis", "nome").buscar(termo)
+
+    def vidro(self, termo):
+        return self._indice("vidros", "tipo").buscar(termo)
+
+    def _primeiro(self, tabela, campo, palavras):
+        indice = self._indice(tabela, campo)
+        for palavra in palavras:
+            achado = indice.buscar(palavra)
+            if achado is not None:
+                return achado
+        return None
+
+    def resolver_perfil(self, palavras):
+        """Primeiro perfil citado na mensagem."""
+        return self._primeiro("perfis", "nome", palavras)
+
+    def resolver_vidro(self, palavras):
+        """Primeiro vidro citado na mensagem."""
+        return self._primeiro("vidros", "tipo", palavras)
+
+    def resolver(self, palavras):
+        """(perfil, vidro): o primeiro perfil e o primeiro vidro encontrados na mensagem."""
+        return self.resolver_perfil(palavras), self.resolver_vidro(palavras)
+
+indice = IndiceCatalogo()
@@ -0,0 +1,380 @@
+"""
+Importação e exportação do catálogo (perfis, vidros, materiais) em CSV ou NDJSON.
+
+Importação: o arquivo é lido linha a linha, cada linha é validada e tem o
+preço calculado no servidor; as linhas válidas vão ao Supabase em lotes
+de LOTE_IMPORTACAO (um upsert para as que já existem, um insert para as
+novas). Linhas com erro são relatadas pelo número, sem parar o arquivo.
+Memória: um lote mais o id de cada item do catálogo (inclusive os criados
+na importação), não o arquivo (benchmarks/bench_catalogo_arquivos.py).
+
+Uma linha "já existe" se trouxer id ou se bater com um item do catálogo
+pelo nome (perfis/materiais) ou tipo + espessura (vidros).
+
+Exportação: gerador que pagina a tabela pelo id e devolve o arquivo em
+pedaços, no mesmo formato aceito pela importação.
+
+    python catalogo_arquivos.py importar perfis lista.csv --simular
+    python catalogo_arquivos.py exportar vidros --formato ndjson > vidros.ndjson
+"""
+import os
+import io
+import re
+import csv
+import math
+import sys
+import json
+import argparse
+import requests
+
+import supabase_client as db
+from catalog_cache import catalogo
+from catalog_index import normalizar
+from precificacao import calcular_precos
+
+# =====================
+# CONFIG
+# =====================
+
+LOTE_IMPORTACAO = int(os.getenv("CATALOGO_LOTE_IMPORTACAO", "500"))
+PAGINA_EXPORTACAO = int(os.getenv("CATALOGO_PAGINA_EXPORTACAO", "1000"))
+# Erros devolvidos um a um; acima disso só contados
+MAX_ERROS = 1000
+
+FORMATOS = ("csv", "ndjson")
+
+# tabela -> (colunas obrigatórias, colunas opcionais); preço é sempre calculado
+COLUNAS = {
+    "perfis": (("nome", "custo", "margem", "perda"), ("tipologias", "insumos")),
+    "vidros": (("tipo", "espessura", "custo", "margem", "perda"), ()),
+    "materiais": (("nome", "tipo_medida", "custo", "margem", "perda"), ()),
+}
+NUMERICAS = ("espessura", "custo", "margem", "perda")
+
+# =====================
+# LEITURA
+# =====================
+
+def _linhas_csv(arquivo):
+    """Aceita ',' ou ';' como separador (planilhas em português exportam com ';')."""
+    texto = io.TextIOWrapper(arquivo, encoding="utf-8-sig", newline="")
+    cabecalho = texto.readline()
+    separador = ";" if cabecalho.count(";") > cabecalho.count(",") else ","
+    colunas = [c.strip().lower() for c in next(csv.reader([cabecalho], delimiter=separador), [])]
+    for numero, valores in enumerate(csv.reader(texto, delimiter=separador), start=2):
+        if not any(v.strip() for v in valores):
+            continue
+        if len(valores) > len(colunas):
+            yield numero, ValueError(f"{len(valores)} colunas, cabeçalho tem {len(colunas)}")
+            continue
+        yield numero, dict(zip(colunas, valores))
+
+
+def _linhas_ndjson(arquivo):
+    for numero, linha in enumerate(arquivo, start=1):
+        linha = linha.strip()
+        if not linha:
+            continue
+        try:
+            row = json.loads(linha)
+        except ValueError as e:
+            yield numero, ValueError(f"JSON inválido: {e}")
+            continue
+        yield numero, row if isinstance(row, dict) else ValueError("Esperado um objeto JSON")
+
+
+def ler(arquivo, formato):
+    """arquivo binário -> (número da linha, dict ou ValueError), um por vez."""
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato inválido. Use: {', '.join(FORMATOS)}")
+    return _linhas_csv(arquivo) if formato == "csv" else _linhas_ndjson(arquivo)
+
+# =====================
+# VALIDAÇÃO
+# =====================
+
+# milhar agrupado de 3 em 3: 1.234.567 / 1,234,567
+MILHAR = {".": re.compile(r"\d{1,3}(\.\d{3})+"), ",": re.compile(r"\d{1,3}(,\d{3})+")}
+
+
+def _numero(valor):
+    """
+    Número brasileiro ou americano -> float: 12.5, "12,50", "1.234,56",
+    "1,234.56", "1.234.567". Com os dois separadores o último é o decimal.
+    Um separador só, seguido de 3 dígitos ("1,234", "1.234"), pode ser
+    milhar ou decimal: ValueError ("0,125" e "1234,567" não são ambíguos).
+    """
+    numero = _numero_texto(valor) if isinstance(valor, str) else float(valor)
+    if not math.isfinite(numero):
+        raise ValueError(f"número inválido: {valor!r}")
+    return numero
+
+
+def _numero_texto(valor):
+    texto = valor.strip()
+    sinal, digitos = (texto[0], texto[1:]) if texto[:1] in ("-", "+") else ("", texto)
+    virgula, ponto = digitos.rfind(","), digitos.rfind(".")
+    if virgula >= 0 and ponto >= 0:
+        decimal, milhar = (",", ".") if virgula > ponto else (".", ",")
+        inteiro, _, fracao = digitos.rpartition(decimal)
+        if not MILHAR[milhar].fullmatch(inteiro) or not fracao.isdigit():
+            raise ValueError(f"número inválido: {valor!r}")
+        return float(f"{sinal}{inteiro.replace(milhar, '')}.{fracao}")
+    separador = "," if virgula >= 0 else "." if ponto >= 0 else None
+    if separador is None:
+        return float(texto)
+    if digitos.count(separador) > 1:
+        if not MILHAR[separador].fullmatch(digitos):
+            raise ValueError(f"número inválido: {valor!r}")
+        return float(sinal + digitos.replace(separador, ""))
+    inteiro, _, fracao = digitos.partition(separador)
+    if len(fracao) == 3 and fracao.isdigit() and inteiro.isdigit() and len(inteiro) <= 3 and inteiro.lstrip("0"):
+        raise ValueError(f"número ambíguo: {valor!r} (use 1.234,00 ou 1,234.00)")
+    return float(f"{sinal}{inteiro}.{fracao}")
+
+
+def _lista(valor):
+    """Lista, JSON '["a", "b"]' ou texto de CSV 'a|b'."""
+    if isinstance(valor, list):
+        return valor
+    valor = str(valor).strip()
+    if valor.startswith("["):
+        return json.loads(valor)
+    return [v.strip() for v in valor.split("|") if v.strip()]
+
+
+def validar(tabela, row):
+    """Linha do arquivo -> payload (sem preço). Levanta ValueError com o motivo."""
+    obrigatorias, opcionais = COLUNAS[tabela]
+    row = {str(k).strip().lower(): v for k, v in row.items() if k is not None}
+    faltando = [c for c in obrigatorias if row.get(c) in (None, "")]
+    if faltando:
+        raise ValueError(f"Faltando: {', '.join(faltando)}")
+
+    payload = {}
+    if row.get("id") not in (None, ""):
+        payload["id"] = str(row["id"]).strip()
+    for campo in obrigatorias:
+        if campo in NUMERICAS:
+            try:
+                payload[campo] = _numero(row[campo])
+            except (TypeError, ValueError) as e:
+                if str(e).startswith("número ambíguo"):
+                    raise ValueError(f"{campo}: {e}")
+                raise ValueError(f"{campo} não é número: {row[campo]!r}")
+            if payload[campo] < 0:
+                raise ValueError(f"{campo} negativo")
+        else:
+            payload[campo] = str(row[campo]).strip()
+    for campo in opcionais:
+        if row.get(campo) not in (None, ""):
+            try:
+                payload[campo] = _lista(row[campo])
+            except ValueError:
+                raise ValueError(f"{campo} inválido: {row[campo]!r}")
+    return payload
+
+
+def chave_item(tabela, row):
+    """Identidade de um item sem id: nome, ou tipo + espessura nos vidros."""
+    if tabela == "vidros":
+        try:
+            return normalizar(row.get("tipo")), _numero(row.get("espessura"))
+        except (TypeError, ValueError):
+            return normalizar(row.get("tipo")), None
+    return normalizar(row.get("nome"))
+
+# =====================
+# IMPORTAÇÃO
+# =====================
+
+class _Importacao:
+    def __init__(self, tabela, simular):
+        self.tabela = tabela
+        self.simular = simular
+        # chave -> id dos itens já cadastrados (e dos criados durante a importação)
+        self.ids = {chave_item(tabela, r): str(r.get("id")) for r in catalogo.dados(tabela)}
+        self.lote = {}
+        self.resultado = {"linhas": 0, "inseridos": 0, "atualizados": 0, "erros": [], "n_erros": 0}
+
+    def erro(self, numero, mensagem):
+        self.resultado["n_erros"] += 1
+        if len(self.resultado["erros"]) < MAX_ERROS:
+            self.resultado["erros"].append({"linha": numero, "erro": mensagem})
+
+    def adicionar(self, numero, payload):
+        self.resultado["linhas"] += 1
+        if "id" not in payload:
+            id_existente = self.ids.get(chave_item(self.tabela, payload))
+            if id_existente is not None:
+                payload["id"] = id_existente
+        # mesma chave repetida no lote: vale a última linha
+        chave = ("id", payload["id"]) if "id" in payload else chave_item(self.tabela, payload)
+        self.lote[chave] = (numero, payload)
+        if len(self.lote) >= LOTE_IMPORTACAO:
+            self.gravar()
+
+    def gravar(self):
+        if not self.lote:
+            return
+        linhas = list(self.lote.values())
+        self.lote = {}
+        precos = calcular_precos(*zip(*((p["custo"], p["margem"], p["perda"]) for _, p in linhas)))
+        for (_, payload), preco in zip(linhas, precos.tolist()):
+            payload["preco"] = preco
+
+        existentes = [(n, p) for n, p in linhas if "id" in p]
+        novas = [(n, p) for n, p in linhas if "id" not in p]
+        if self.simular:
+            self.resultado["atualizados"] += len(existentes)
+            self.resultado["inseridos"] += len(novas)
+            return
+        self.resultado["atualizados"] += self._enviar(existentes, novo=False)
+        self.resultado["inseridos"] += self._enviar(novas, novo=True)
+
+    def _enviar(self, linhas, novo):
+        """
+        Um upsert/insert por grupo de colunas (o PostgREST exige as mesmas
+        chaves em todas as linhas). Se o Supabase recusar o lote (4xx), manda
+        linha a linha para apontar quais falharam. Retorna quantas gravou.
+        """
+        grupos = {}
+        for numero, payload in linhas:
+            grupos.setdefault(tuple(sorted(payload)), []).append((numero, payload))
+        gravadas = 0
+        for grupo in grupos.values():
+            try:
+                self._escrever([p for _, p in grupo], novo)
+                gravadas += len(grupo)
+            except requests.HTTPError as e:
+                if e.response is None or e.response.status_code >= 500:
+                    raise
+                for numero, payload in grupo:
+                    try:
+                        self._escrever([payload], novo)
+                        gravadas += 1
+                    except requests.HTTPError as e_linha:
+                        if e_linha.response is None or e_linha.response.status_code >= 500:
+                            raise
+                        self.erro(numero, f"{e_linha.response.status_code} {e_linha.response.text}")
+        return gravadas
+
+    def _escrever(self, payloads, novo):
+        if not novo:
+            db.upsert(self.tabela, payloads, on_conflict="id")
+            return
+        # ids dos criados: uma linha repetida num lote seguinte vira atualização
+        for row in db.insert(self.tabela, payloads, retornar=True):
+            self.ids[chave_item(self.tabela, row)] = str(row.get("id"))
+
+
+def importar(tabela, arquivo, formato="csv", simular=False):
+    """
+    arquivo: binário (request.stream, upload ou open(..., "rb")).
+    Retorna {"linhas", "inseridos", "atualizados", "erros": [{"linha", "erro"}], "n_erros"}.
+    Com simular=True só valida e conta, sem gravar.
+    Se o Supabase cair no meio, devolve o que já foi gravado e "interrompido".
+    """
+    if tabela not in COLUNAS:
+        raise ValueError(f"Tabela inválida. Use: {', '.join(COLUNAS)}")
+    imp = _Importacao(tabela, simular)
+    try:
+        for numero, row in ler(arquivo, formato):
+            if isinstance(row, ValueError):
+                imp.erro(numero, str(row))
+                continue
+            try:
+                imp.adicionar(numero, validar(tabela, row))
+            except ValueError as e:
+                imp.erro(numero, str(e))
+        imp.gravar()
+    except (requests.RequestException, UnicodeDecodeError) as e:
+        imp.resultado["interrompido"] = str(e)
+    finally:
+        if not simular and (imp.resultado["inseridos"] or imp.resultado["atualizados"]):
+            catalogo.invalidar(tabela)
+    return imp.resultado
+
+# =====================
+# EXPORTAÇÃO
+# =====================
+
+def colunas_exportacao(tabela):
+    obrigatorias, opcionais = COLUNAS[tabela]
+    return ("id",) + obrigatorias + ("preco",) + opcionais
+
+
+def _csv(valores):
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerow(valores)
+    return buffer.getvalue()
+
+
+def _celula(campo, valor):
+    if valor is None:
+        return ""
+    if campo == "tipologias" and isinstance(valor, list):
+        return "|".join(str(v) for v in valor)
+    if isinstance(valor, (list, dict)):
+        return json.dumps(valor, ensure_ascii=False)
+    return valor
+
+
+def exportar(tabela, formato="csv", pagina=PAGINA_EXPORTACAO):
+    """Gerador de pedaços de texto; cada página do Supabase vira um pedaço."""
+    if tabela not in COLUNAS:
+        raise ValueError(f"Tabela inválida. Use: {', '.join(COLUNAS)}")
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato inválido. Use: {', '.join(FORMATOS)}")
+    colunas = colunas_exportacao(tabela)
+    if formato == "csv":
+        yield _csv(colunas)
+
+    ultimo = None
+    while True:
+        params = {"select": ",".join(colunas), "order": "id.asc", "limit": pagina}
+        if ultimo is not None:
+            params["id"] = f"gt.{ultimo}"
+        rows = db.select(tabela, params)
+        if not rows:
+            return
+        if formato == "csv":
+            yield "".join(_csv([_celula(c, r.get(c)) for c in colunas]) for r in rows)
+        else:
+            yield "".join(json.dumps(r, ensure_ascii=False, default=str) + "\n" for r in rows)
+        if len(rows) < pagina:
+            return
+        ultimo = rows[-1]["id"]
+
+# =====================
+# CLI
+# =====================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Importação/exportação do catálogo")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    imp = sub.add_parser("importar")
+    imp.add_argument("tabela", choices=list(COLUNAS))
+    imp.add_argument("arquivo")
+    imp.add_argument("--formato", choices=FORMATOS)
+    imp.add_argument("--simular", action="store_true", help="só valida, não grava")
+    exp = sub.add_parser("exportar")
+    exp.add_argument("tabela", choices=list(COLUNAS))
+    exp.add_argument("--formato", choices=FORMATOS, default="csv")
+    args = parser.parse_args(argv)
+
+    if args.comando == "exportar":
+        for pedaco in exportar(args.tabela, args.formato):
+            sys.stdout.write(pedaco)
+        return
+
+    formato = args.formato or ("ndjson" if args.arquivo.endswith((".ndjson", ".jsonl")) else "csv")
+    with open(args.arquivo, "rb") as f:
+        resultado = importar(args.tabela, f, formato, args.simular)
+    for erro in resultado["erros"]:
+        print(f"linha {erro['linha']}: {erro['erro']}", file=sys.stderr)
+    print(json.dumps({k: v for k, v in resultado.items() if k != "erros"}, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+Desenho SVG das portas no servidor (mesmo traço do desenharPorta do navegador).
+
+O SVG depende só da especificação da porta (tipo, medidas, folhas,
+dobradiças, pivô). Cada desenho distinto é guardado uma vez, pela hash da
+especificação: LRU em memória + arquivo em DESENHO_CACHE_DIR. As portas
+guardam só a hash (coluna `desenho`); a especificação fica na tabela
+`desenhos`, e o SVG é refeito a partir dela quando não está no cache.
+"""
+import os
+import re
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+import portas_codec
+import supabase_client as db
+from paralelo import pool
+
+logger = logging.getLogger(__name__)
+
+# =====================
+# CONFIG
+# =====================
+
+DESENHO_CACHE_MAX = int(os.getenv("DESENHO_CACHE_MAX", "2048"))
+DESENHO_CACHE_DIR = os.getenv("DESENHO_CACHE_DIR", "/tmp/colorglass_desenhos")
+
+# Área do desenho (igual ao <svg id="portaSVG" width="200" height="400">)
+LARGURA_SVG = 200
+ALTURA_SVG = 400
+PADDING = 10
+
+TIPOS = ("giro", "deslizante", "correr", "pivotante")
+
+# Campos de `dados` que mudam o desenho (perfil/vidro/preço não mudam)
+CAMPOS_DESENHO = ("largura", "altura", "qtd_folhas", "dobradicas_alturas", "pivo")
+
+# =====================
+# ESPECIFICAÇÃO
+# =====================
+
+def spec_porta(tipo, dados):
+    """
+    Especificação canônica do desenho. None se faltar largura/altura válidas.
+    Medidas em mm; dobradicas_alturas medidas a partir da base da porta.
+    """
+    dados = portas_codec.tipar(dados)
+    largura, altura = dados.get("largura"), dados.get("altura")
+    if not isinstance(largura, (int, float)) or not isinstance(altura, (int, float)):
+        return None
+    if largura <= 0 or altura <= 0:
+        return None
+    spec = {"tipo": tipo}
+    for campo in CAMPOS_DESENHO:
+        if dados.get(campo) not in (None, "", []):
+            spec[campo] = dados[campo]
+    return spec
+
+
+def chave_spec(spec):
+    return hashlib.sha1(json.dumps(spec, sort_keys=True).encode()).hexdigest()
+
+# =====================
+# RENDER
+# =====================
+
+def _n(valor):
+    return f"{valor:.2f}".rstrip("0").rstrip(".")
+
+
+def renderizar(spec):
+    """spec -> markup SVG."""
+    largura, altura = spec["largura"], spec["altura"]
+    escala = min((LARGURA_SVG - 2 * PADDING) / largura, (ALTURA_SVG - 2 * PADDING) / altura)
+    w, h = largura * escala, altura * escala
+    x, y = (LARGURA_SVG - w) / 2, (ALTURA_SVG - h) / 2
+
+    partes = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{LARGURA_SVG}" height="{ALTURA_SVG}" '
+        f'viewBox="0 0 {LARGURA_SVG} {ALTURA_SVG}">',
+        f'<rect x="{_n(x)}" y="{_n(y)}" width="{_n(w)}" height="{_n(h)}" fill="#ccc" '
+        f'stroke="#000" stroke-width="6" vector-effect="non-scaling-stroke"/>'
+    ]
+
+    # divisão das folhas (portas de correr/deslizantes)
+    folhas = spec.get("qtd_folhas")
+    if spec["tipo"] in ("deslizante", "correr") and isinstance(folhas, int) and folhas > 1:
+        for i in range(1, folhas):
+            xi = x + w * i / folhas
+            partes.append(f'<line x1="{_n(xi)}" y1="{_n(y)}" x2="{_n(xi)}" y2="{_n(y + h)}" stroke="#000" stroke-width="2"/>')
+
+    # dobradiças no lado esquerdo, na altura informada (a partir da base)
+    for alt in spec.get("dobradicas_alturas") or []:
+        if isinstance(alt, (int, float)) and 0 <= alt <= altura:
+            yi = y + h - alt * escala
+            partes.append(f'<rect x="{_n(x - 3)}" y="{_n(yi - 6)}" width="6" height="12" fill="#555"/>')
+
+    # pivôs perto do lado esquerdo, em cima e embaixo
+    if spec["tipo"] == "pivotante":
+        xp = x + w * 0.1
+        for yp in (y + 4, y + h - 4):
+            partes.append(f'<circle cx="{_n(xp)}" cy="{_n(yp)}" r="3" fill="#555"/>')
+
+    partes.append("</svg>")
+    return "".join(partes)
+
+# =====================
+# CACHE (MEMÓRIA + DISCO)
+# =====================
+
+class CacheDesenhos:
+    """
+    LRU limitado na frente de um diretório de arquivos <hash>.svg.
+    O que vale entre processos é a tabela `desenhos` (persistir/obter).
+    """
+
+    def __init__(self, maximo=DESENHO_CACHE_MAX, diretorio=DESENHO_CACHE_DIR):
+        self.maximo = maximo
+        self.diretorio = diretorio
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.renderizados = 0
+
+    def _arquivo(self, chave):
+        return os.path.join(self.diretorio, chave[:2], f"{chave}.svg")
+
+    def _lembrar(self, chave, svg):
+        with self._lock:
+            self._lru[chave] = svg
+            self._lru.move_to_end(chave)
+            while len(self._lru) > self.maximo:
+                self._lru.popitem(last=False)
+
+    def obter(self, chave):
+        """SVG com essa hash (memória, disco, depois spec do banco) ou None."""
+        if not re.fullmatch(r"[0-9a-f]{40}", chave or ""):
+            return None
+        svg = self._local(chave)
+        return svg if svg is not None else self._do_banco(chave)
+
+    def _local(self, chave):
+        with self._lock:
+            svg = self._lru.get(chave)
+            if svg is not None:
+                self._lru.move_to_end(chave)
+                self.acertos += 1
+                return svg
+        try:
+            with open(self._arquivo(chave), encoding="utf-8") as f:
+                svg = f.read()
+        except (OSError, ValueError):
+            return None
+        self._lembrar(chave, svg)
+        self.acertos += 1
+        return svg
+
+    def _do_banco(self, chave):
+        linhas = db.select("desenhos", {"select": "spec", "chave": f"eq.{chave}"})
+        if not linhas:
+            return None
+        return self._renderizar(chave, linhas[0]["spec"])
+
+    def _renderizar(self, chave, spec):
+        svg = renderizar(spec)
+        self.renderizados += 1
+        self._lembrar(chave, svg)
+        self._gravar(chave, svg)
+        return svg
+
+    def _gravar(self, chave, svg):
+        caminho = self._arquivo(chave)
+        try:
+            os.makedirs(os.path.dirname(caminho), exist_ok=True)
+            tmp = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(svg)
+            os.replace(tmp, caminho)
+        except OSError as e:
+            logger.warning("Erro gravando desenho: %s", e)
+
+    def desenhar(self, tipo, dados):
+        """(hash, svg) da porta; (None, None) se não der para desenhar."""
+        spec = spec_porta(tipo, dados)
+        if spec is None:
+            return None, None
+        chave = chave_spec(spec)
+        svg = self._local(chave)
+        if svg is None:
+            svg = self._renderizar(chave, spec)
+        return chave, svg
+
+    def desenhar_para_link(self, tipo, dados):
+        """
+        Hash de desenhar() para um link que outra instância pode abrir. Só o que
+        não estava no cache local vai para a tabela `desenhos`, e em segundo
+        plano: a resposta não espera o upsert.
+        """
+        spec = spec_porta(tipo, dados)
+        if spec is None:
+            return None
+        chave = chave_spec(spec)
+        if self._local(chave) is None:
+            self._renderizar(chave, spec)
+            pool().submit(self._persistir_em_segundo_plano, [(tipo, dados)])
+        return chave
+
+    def _persistir_em_segundo_plano(self, portas):
+        try:
+            self.persistir(portas)
+        except Exception:
+            logger.exception("Erro gravando desenho")
+
+    def persistir(self, portas):
+        """
+        Grava no banco a spec dos desenhos de [(tipo, dados), ...] num upsert só.
+        Chamar antes de gravar portas que apontam para essas hashes.
+        """
+        specs = {}
+        for tipo, dados in portas:
+            spec = spec_porta(tipo, dados)
+            if spec is not None:
+                specs[chave_spec(spec)] = spec
+        if specs:
+            db.upsert("desenhos", [{"chave": c, "spec": s} for c, s in specs.items()], on_conflict="chave")
+
+    def stats(self):
+        return {"em_memoria": len(self._lru), "acertos": self.acertos, "renderizados": self.renderizados}
+
+
+desenhos = CacheDesenhos()
@@ -0,0 +1,28 @@
+"""
+Configuração do gunicorn para app.py, bot.py e webhook.py.
+
+    gunicorn -c gunicorn.conf.py app:app
+
+MODO_SERVIDOR=async (padrão: sync com threads) usa workers gevent: toda espera
+por Supabase / Graph API vira I/O não bloqueante num event loop, e um worker
+atende centenas de requisições em voo. As rotas e respostas não mudam.
+"""
+import os
+import multiprocessing
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", str(min(4, multiprocessing.cpu_count() * 2 + 1))))
+timeout = 60
+keepalive = 5
+
+if os.getenv("MODO_SERVIDOR", "sync") == "async":
+    worker_class = "gevent"
+    worker_connections = int(os.getenv("WORKER_CONNECTIONS", "500"))
+    # pool keep-alive do Supabase do tamanho da concorrência de cada worker
+    os.environ.setdefault("SUPABASE_POOL_SIZE", str(min(worker_connections, 100)))
+    os.environ.setdefault("PARALELO_THREADS", "100")
+else:
+    # threads: necessário para o SSE de /api/producao/stream
+    worker_class = "gthread"
+    threads = int(os.getenv("GUNICORN_THREADS", "8"))
+    os.environ.setdefault("GUNICORN_THREADS", str(threads))
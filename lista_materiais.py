@@ -0,0 +1,327 @@
+"""
+Lista de materiais (BOM) e custo de portas e módulos.
+
+Cada item vira linhas de material (perfil, vidro, insumos do perfil, MDF...)
+com quantidade e valor pelos preços do catálogo. O que só depende do
+catálogo (insumos de um perfil) e as submontagens repetidas (mesma porta,
+mesmo módulo) ficam memorizados enquanto a versão do catálogo (etags de
+perfis, vidros e materiais) não muda.
+
+Item:
+    {"tipo": "giro", "dados": {"largura", "altura" (mm), "perfil", "vidro", "qtd_folhas"}, "quantidade": 2}
+    {"tipo": "cristaleira", "dados": {"altura", "largura", "profundidade", "portas", "prateleiras",
+                                      "abertura", "perfil", "vidro", ...}, "quantidade": 1}
+"""
+import threading
+
+import portas_codec
+from catalog_cache import catalogo
+from catalog_index import normalizar
+
+# =====================
+# CONFIG
+# =====================
+
+BOM_MEMO_MAX = 10000
+
+# Folhas de correr se sobrepõem (mesmo valor do configurador PROMOB)
+SOBREPOSICAO_CORRER_MM = 30
+
+# Custos da cristaleira sem linha própria no catálogo (R$, iguais ao PROMOB).
+# Um material com o mesmo nome em /api/materiais tem prioridade.
+CUSTOS_CRISTALEIRA = {
+    "mdf": ("MDF", "m²", 115.0),
+    "baguete": ("Baguete PVC", "m", 1.2),
+    "kit": ("Kit montagem", "un", 4.84),
+}
+MAO_DE_OBRA_MODULO = 80.0
+MAO_DE_OBRA_PORTA = 35.0
+
+# Padrões da cristaleira (mm), como no configurador
+CRISTALEIRA_PADRAO = {
+    "altura": 2200, "largura": 1000, "profundidade": 450,
+    "mdf_lateral": 18, "mdf_topo": 18, "mdf_base": 18, "mdf_fundo": 6,
+    "tem_fundo": True, "prateleiras": 4, "portas": 2, "abertura": "giro",
+    "perda": 0, "margem": 0,
+}
+
+# tipo_medida do material -> unidade da linha
+UNIDADES = {"metro_linear": "m", "metro_quadrado": "m²", "unidade": "un"}
+
+# =====================
+# HELPERS
+# =====================
+
+def _numero(valor, padrao=0.0):
+    try:
+        return float(valor)
+    except (TypeError, ValueError):
+        return padrao
+
+
+def _preco(row):
+    return _numero(row.get("preco")) if row else 0.0
+
+
+def folhas_porta(tipo, largura, folhas=None):
+    """(número de folhas, largura de cada folha em mm). Correr soma a sobreposição."""
+    n = max(int(_numero(folhas, 1) or 1), 1) if tipo in ("correr", "deslizante") else 1
+    sobreposicao = SOBREPOSICAO_CORRER_MM * (n - 1) if tipo == "correr" else 0
+    return n, (largura + sobreposicao) / n
+
+
+class _Catalogo:
+    """Snapshot do catálogo usado numa versão."""
+
+    def __init__(self, perfis, vidros, materiais):
+        self.versao = (perfis.etag, vidros.etag, materiais.etag)
+        self.perfis = perfis.por_id
+        self.vidros = vidros.por_id
+        self.materiais = {normalizar(m.get("nome")): m for m in materiais.dados}
+
+
+class _Linhas:
+    """Acumula linhas (material, unidade) -> [quantidade, valor]."""
+
+    def __init__(self):
+        self.itens = {}
+
+    def add(self, material, unidade, quantidade, valor):
+        linha = self.itens.setdefault((material, unidade), [0.0, 0.0])
+        linha[0] += quantidade
+        linha[1] += valor
+
+    def somar(self, linhas, fator=1):
+        for (material, unidade), (q, v) in linhas:
+            self.add(material, unidade, q * fator, v * fator)
+
+    def congelar(self):
+        return tuple(((m, u), (q, v)) for (m, u), (q, v) in self.itens.items())
+
+    def listar(self):
+        return [
+            {"material": m, "unidade": u, "quantidade": round(q, 3), "valor": round(v, 2)}
+            for (m, u), (q, v) in self.itens.items()
+        ]
+
+
+class _Submontagem:
+    """Resultado memorizado de uma porta/módulo: linhas prontas para a resposta."""
+
+    __slots__ = ("linhas", "listadas", "valor", "avisos")
+
+    def __init__(self, linhas, avisos):
+        self.linhas = linhas.congelar()
+        self.listadas = linhas.listar()
+        self.valor = sum(v for _, (_, v) in self.linhas)
+        self.avisos = tuple(avisos)
+
+# =====================
+# MOTOR
+# =====================
+
+class MotorBOM:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cat = None
+        self._memo = {}
+        self.acertos = 0
+        self.calculados = 0
+
+    def _catalogo(self):
+        perfis, vidros, materiais = (catalogo.obter(t) for t in ("perfis", "vidros", "materiais"))
+        versao = (perfis.etag, vidros.etag, materiais.etag)
+        with self._lock:
+            if self._cat is None or self._cat.versao != versao:
+                self._cat = _Catalogo(perfis, vidros, materiais)
+                self._memo = {}
+            return self._cat, self._memo
+
+    def _memorizado(self, memo, chave, fn):
+        try:
+            valor = memo[chave]
+            self.acertos += 1
+            return valor
+        except KeyError:
+            pass
+        valor = fn()
+        self.calculados += 1
+        if len(memo) > BOM_MEMO_MAX:
+            memo.clear()
+        memo[chave] = valor
+        return valor
+
+    # ---------- submontagens ----------
+
+    def _insumos_perfil(self, cat, memo, perfil_id):
+        """Materiais dos insumos do perfil (pelo nome) e nomes não encontrados."""
+        def explodir():
+            perfil = cat.perfis.get(perfil_id) or {}
+            achados, faltando = [], []
+            for nome in perfil.get("insumos") or []:
+                material = cat.materiais.get(normalizar(nome))
+                if material:
+                    achados.append(material)
+                else:
+                    faltando.append(nome)
+            return tuple(achados), tuple(faltando)
+        return self._memorizado(memo, ("insumos", perfil_id), explodir)
+
+    def _porta(self, cat, memo, tipo, largura, altura, folhas, perfil_id, vidro_id):
+        """
+        Uma porta: perfil no perímetro de cada folha, vidro na área e cada
+        insumo do perfil pelo tipo de medida (m: perímetro, m²: área, un: por folha).
+        """
+        def explodir():
+            linhas = _Linhas()
+            avisos = []
+            n, largura_folha = folhas_porta(tipo, largura, folhas)
+            largura_folha /= 1000
+            altura_m = altura / 1000
+            perimetro = 2 * (largura_folha + altura_m) * n
+            area = largura_folha * altura_m * n
+
+            if perfil_id:
+                perfil = cat.perfis.get(perfil_id)
+                if perfil:
+                    linhas.add(perfil.get("nome"), "m", perimetro, perimetro * _preco(perfil))
+                    materiais, faltando = self._insumos_perfil(cat, memo, perfil_id)
+                    for m in materiais:
+                        unidade = UNIDADES.get(m.get("tipo_medida"), "un")
+                        q = {"m": perimetro, "m²": area}.get(unidade, n)
+                        linhas.add(m.get("nome"), unidade, q, q * _preco(m))
+                    avisos += [f"Insumo não encontrado: {nome}" for nome in faltando]
+                else:
+                    avisos.append(f"Perfil não encontrado: {perfil_id}")
+            if vidro_id:
+                vidro = cat.vidros.get(vidro_id)
+                if vidro:
+                    linhas.add(vidro.get("tipo"), "m²", area, area * _preco(vidro))
+                else:
+                    avisos.append(f"Vidro não encontrado: {vidro_id}")
+            return _Submontagem(linhas, avisos)
+        chave = ("porta", tipo, largura, altura, folhas, perfil_id, vidro_id)
+        return self._memorizado(memo, chave, explodir)
+
+    def _custo_fixo(self, cat, chave):
+        nome, unidade, padrao = CUSTOS_CRISTALEIRA[chave]
+        material = cat.materiais.get(normalizar(nome))
+        return nome, unidade, _preco(material) if material else padrao
+
+    def _cristaleira(self, cat, memo, dados):
+        """Cristaleira (mesma conta do calculateCristaleira do PROMOB)."""
+        d = {**CRISTALEIRA_PADRAO, **{k: v for k, v in dados.items() if v not in (None, "")}}
+
+        def explodir():
+            m = lambda mm: _numero(mm) / 1000
+            perda = 1 + _numero(d["perda"]) / 100
+            portas = max(int(_numero(d["portas"], 1)), 1)
+            tem_fundo = d["tem_fundo"] not in (False, "false", "0", 0)
+            largura_util = max(_numero(d["largura"]) - _numero(d["mdf_lateral"]) * 2, 0)
+            altura_util = max(_numero(d["altura"]) - _numero(d["mdf_topo"]) - _numero(d["mdf_base"]), 0)
+            prof_util = max(_numero(d["profundidade"]) - (_numero(d["mdf_fundo"]) if tem_fundo else 0), 0)
+
+            # portas reaproveitam a explosão de porta (perfil, vidro, insumos do perfil)
+            perfil_id = str(d.get("perfil") or "") or None
+            vidro_id = str(d.get("vidro") or "") or None
+            if d["abertura"] == "correr":
+                _, largura_folha = folhas_porta("correr", largura_util, portas)
+                porta = self._porta(cat, memo, "correr", largura_util, altura_util, portas, perfil_id, vidro_id)
+                fator = 1
+            else:
+                largura_folha = largura_util / portas
+                porta = self._porta(cat, memo, "giro", largura_folha, altura_util, 1, perfil_id, vidro_id)
+                fator = portas
+            linhas = _Linhas()
+            for (material, unidade), (q, v) in porta.linhas:
+                # perda só no que é cortado (m, m²), não em peças
+                f = fator * (perda if unidade != "un" else 1)
+                linhas.add(material, unidade, q * f, v * f)
+
+            area_mdf = (
+                m(d["altura"]) * m(d["profundidade"]) * 2 +
+                m(d["largura"]) * m(d["profundidade"]) * 2 +
+                (m(d["largura"]) * m(d["altura"]) if tem_fundo else 0) +
+                m(largura_util) * m(prof_util) * _numero(d["prateleiras"])
+            ) * perda
+            nome, unidade, preco = self._custo_fixo(cat, "mdf")
+            linhas.add(nome, unidade, area_mdf, area_mdf * preco)
+
+            # baguete no perímetro das portas (se o perfil já não a tiver como insumo)
+            nome, unidade, preco = self._custo_fixo(cat, "baguete")
+            if not any(normalizar(material) == normalizar(nome) for (material, _), _ in porta.linhas):
+                ml_baguete = 2 * (m(largura_folha) + m(altura_util)) * portas * perda
+                linhas.add(nome, unidade, ml_baguete, ml_baguete * preco)
+
+            nome, unidade, preco = self._custo_fixo(cat, "kit")
+            linhas.add(nome, unidade, portas, portas * preco)
+
+            mao_de_obra = MAO_DE_OBRA_MODULO + portas * MAO_DE_OBRA_PORTA
+            linhas.add("Mão de obra", "módulo", 1, mao_de_obra)
+            return _Submontagem(linhas, porta.avisos)
+
+        chave = ("cristaleira",) + tuple(sorted((k, str(v)) for k, v in d.items()))
+        return self._memorizado(memo, chave, explodir)
+
+    # ---------- API ----------
+
+    def explodir(self, itens):
+        """
+        itens -> {"itens": [...], "materiais": [...], "total": float, "avisos": [...]}
+        Cada item traz suas linhas e valor; "materiais" soma tudo por material.
+        """
+        cat, memo = self._catalogo()
+        resultado = []
+        avisos = []
+        # submontagem -> quantidade somada (o total por material sai no fim, uma vez por submontagem)
+        usadas = {}
+        for i, item in enumerate(itens):
+            tipo = item.get("tipo")
+            dados = portas_codec.tipar(item.get("dados") or {})
+            quantidade = max(int(_numero(item.get("quantidade"), 1)), 1)
+
+            if tipo == "cristaleira":
+                sub = self._cristaleira(cat, memo, dados)
+                margem = _numero(dados.get("margem"))
+            else:
+                largura, altura = _numero(dados.get("largura")), _numero(dados.get("altura"))
+                if largura <= 0 or altura <= 0:
+                    avisos.append(f"Item {i}: sem largura/altura")
+                    continue
+                sub = self._porta(
+                    cat, memo, tipo, largura, altura, dados.get("qtd_folhas"),
+                    str(dados["perfil"]) if dados.get("perfil") not in (None, "") else None,
+                    str(dados["vidro"]) if dados.get("vidro") not in (None, "") else None
+                )
+                margem = 0.0
+
+            # margem sobre o preço de venda, como no PROMOB (preços do catálogo já têm margem)
+            unitario = sub.valor / (1 - margem / 100) if 0 < margem < 100 else sub.valor
+            uso = usadas.setdefault(id(sub), [sub, 0])
+            uso[1] += quantidade
+            avisos += [f"Item {i}: {a}" for a in sub.avisos]
+            resultado.append({
+                "indice": i,
+                "tipo": tipo,
+                "quantidade": quantidade,
+                "linhas": sub.listadas,
+                "valor_unitario": round(unitario, 2),
+                "valor_total": round(unitario * quantidade, 2)
+            })
+
+        geral = _Linhas()
+        for sub, quantidade in usadas.values():
+            geral.somar(sub.linhas, quantidade)
+        return {
+            "itens": resultado,
+            "materiais": geral.listar(),
+            "total": round(sum(r["valor_total"] for r in resultado), 2),
+            "avisos": avisos
+        }
+
+    def stats(self):
+        return {"memorizados": len(self._memo), "acertos": self.acertos, "calculados": self.calculados}
+
+
+motor = MotorBOM()
@@ -0,0 +1,190 @@
+import os
+import json
+import time
+import glob
+import threading
+from flask import g, request, has_request_context, Response
+from flask.json.provider import DefaultJSONProvider
+
+# =====================
+# CONFIG
+# =====================
+
+# Cada worker grava seus contadores aqui; /metrics soma todos os arquivos
+METRICS_DIR = os.getenv("METRICS_DIR", "/tmp/colorglass_metrics")
+FLUSH_SEGUNDOS = 1.0
+
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BUCKETS_TAMANHO = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+# =====================
+# REGISTRO
+# =====================
+
+class Registro:
+    """Contadores e histogramas do processo, persistidos por pid para agregação."""
+
+    def __init__(self, diretorio=METRICS_DIR):
+        self.diretorio = diretorio
+        self._lock = threading.Lock()
+        self._contadores = {}
+        self._histogramas = {}
+        self._ultimo_flush = 0.0
+        self._pid = os.getpid()
+
+    def _resetar_se_fork(self):
+        if self._pid != os.getpid():
+            self._contadores = {}
+            self._histogramas = {}
+            self._pid = os.getpid()
+
+    def contar(self, nome, labels, valor=1.0):
+        chave = json.dumps([nome, sorted(labels.items())])
+        with self._lock:
+            self._resetar_se_fork()
+            self._contadores[chave] = self._contadores.get(chave, 0.0) + valor
+
+    def observar(self, nome, labels, valor, buckets=BUCKETS_LATENCIA):
+        chave = json.dumps([nome, sorted(labels.items()), list(buckets)])
+        with self._lock:
+            self._resetar_se_fork()
+            h = self._histogramas.get(chave)
+            if h is None:
+                h = self._histogramas[chave] = {"buckets": [0] * len(buckets), "soma": 0.0, "total": 0}
+            for i, limite in enumerate(buckets):
+                if valor <= limite:
+                    h["buckets"][i] += 1
+            h["soma"] += valor
+            h["total"] += 1
+
+    # ---------- agregação entre workers ----------
+
+    def flush(self, forcar=False):
+        agora = time.monotonic()
+        if not forcar and agora - self._ultimo_flush < FLUSH_SEGUNDOS:
+            return
+        self._ultimo_flush = agora
+        with self._lock:
+            self._resetar_se_fork()
+            dados = json.dumps({"contadores": self._contadores, "histogramas": self._histogramas})
+        os.makedirs(self.diretorio, exist_ok=True)
+        caminho = os.path.join(self.diretorio, f"{os.getpid()}.json")
+        with open(caminho + ".tmp", "w") as f:
+            f.write(dados)
+        os.replace(caminho + ".tmp", caminho)
+
+    def agregado(self):
+        contadores, histogramas = {}, {}
+        for caminho in glob.glob(os.path.join(self.diretorio, "*.json")):
+            try:
+                with open(caminho) as f:
+                    dados = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for k, v in dados["contadores"].items():
+                contadores[k] = contadores.get(k, 0.0) + v
+            for k, h in dados["histogramas"].items():
+                atual = histogramas.setdefault(k, {"buckets": [0] * len(h["buckets"]), "soma": 0.0, "total": 0})
+                atual["buckets"] = [a + b for a, b in zip(atual["buckets"], h["buckets"])]
+                atual["soma"] += h["soma"]
+                atual["total"] += h["total"]
+        return contadores, histogramas
+
+    def texto_prometheus(self):
+        self.flush(forcar=True)
+        contadores, histogramas = self.agregado()
+        linhas = []
+        tipos = set()
+
+        def fmt_labels(labels, extra=None):
+            itens = list(labels) + (extra or [])
+            if not itens:
+                return ""
+            return "{" + ",".join(f'{k}="{str(v)}"' for k, v in itens) + "}"
+
+        for chave in sorted(contadores):
+            nome, labels = json.loads(chave)
+            if nome not in tipos:
+                linhas.append(f"# TYPE {nome} counter")
+                tipos.add(nome)
+            linhas.append(f"{nome}{fmt_labels(labels)} {contadores[chave]}")
+
+        for chave in sorted(histogramas):
+            nome, labels, buckets = json.loads(chave)
+            h = histogramas[chave]
+            if nome not in tipos:
+                linhas.append(f"# TYPE {nome} histogram")
+                tipos.add(nome)
+            for limite, n in zip(buckets, h["buckets"]):
+                linhas.append(f"{nome}_bucket{fmt_labels(labels, [('le', limite)])} {n}")
+            linhas.append(f"{nome}_bucket{fmt_labels(labels, [('le', '+Inf')])} {h['total']}")
+            linhas.append(f"{nome}_sum{fmt_labels(labels)} {h['soma']}")
+            linhas.append(f"{nome}_count{fmt_labels(labels)} {h['total']}")
+        return "\n".join(linhas) + "\n"
+
+
+registro = Registro()
+
+# =====================
+# CHAMADAS EXTERNAS
+# =====================
+
+def registrar_upstream(servico, segundos, status=None):
+    """Chamado pelos clientes HTTP (Supabase, Graph API) após cada chamada."""
+    registro.observar("upstream_request_duration_seconds", {"servico": servico, "status": str(status)}, segundos)
+    if has_request_context():
+        chamadas = g.setdefault("upstream", {})
+        n, total = chamadas.get(servico, (0, 0.0))
+        chamadas[servico] = (n + 1, total + segundos)
+
+# =====================
+# FLASK
+# =====================
+
+class JSONProviderMedido(DefaultJSONProvider):
+    """Mede o tempo gasto serializando JSON dentro da requisição."""
+
+    def dumps(self, obj, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return super().dumps(obj, **kwargs)
+        finally:
+            if has_request_context():
+                g.json_segundos = g.get("json_segundos", 0.0) + time.perf_counter() - t0
+
+
+def instalar(app):
+    """Middleware de métricas + Server-Timing e rota /metrics."""
+    app.json = JSONProviderMedido(app)
+
+    @app.before_request
+    def _inicio():
+        g.inicio_req = time.perf_counter()
+
+    @app.after_request
+    def _fim(resp):
+        if "inicio_req" not in g:
+            return resp
+        total = time.perf_counter() - g.inicio_req
+        rota = request.url_rule.rule if request.url_rule else "desconhecida"
+        labels = {"rota": rota, "metodo": request.method, "status": str(resp.status_code)}
+        registro.observar("http_request_duration_seconds", labels, total)
+
+        timing = [f"app;dur={total * 1000:.1f}"]
+        for servico, (n, segundos) in g.get("upstream", {}).items():
+            registro.contar("http_upstream_calls_total", {"rota": rota, "servico": servico}, n)
+            registro.contar("http_upstream_seconds_total", {"rota": rota, "servico": servico}, segundos)
+            timing.append(f'{servico};dur={segundos * 1000:.1f};desc="{n} chamadas"')
+        if "json_segundos" in g:
+            timing.append(f"json;dur={g.json_segundos * 1000:.1f}")
+        resp.headers["Server-Timing"] = ", ".join(timing)
+
+        if not resp.is_streamed:
+            registro.observar("http_response_size_bytes", {"rota": rota}, resp.calculate_content_length() or 0,
+                              buckets=BUCKETS_TAMANHO)
+        registro.flush()
+        return resp
+
+    @app.route("/metrics")
+    def metrics():
+        return Response(registro.texto_prometheus(), mimetype="text/plain; version=0.0.4")
@@ -0,0 +1,39 @@
+import os
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait
+
+# =====================
+# FAN-OUT DE CHAMADAS INDEPENDENTES
+# =====================
+
+# Com gunicorn -k gevent (MODO_SERVIDOR=async) essas threads viram greenlets
+PARALELO_THREADS = int(os.getenv("PARALELO_THREADS", "16"))
+
+_pool = None
+_pool_pid = None
+
+
+def pool():
+    """Pool compartilhado do processo (recriado depois do fork)."""
+    global _pool, _pool_pid
+    if _pool is None or _pool_pid != os.getpid():
+        _pool = ThreadPoolExecutor(max_workers=PARALELO_THREADS, thread_name_prefix="paralelo")
+        _pool_pid = os.getpid()
+    return _pool
+
+
+# Resultado de quem não terminou dentro do prazo
+ATRASADO = object()
+
+
+def em_paralelo(*funcoes, prazo=None):
+    """
+    Roda funções independentes ao mesmo tempo e devolve os resultados na ordem.
+    Cada uma roda no contexto da requisição atual (g, métricas de upstream).
+    Com prazo (segundos), quem não terminou a tempo volta como ATRASADO
+    (segue rodando no pool e o resultado é descartado).
+    """
+    futuros = [pool().submit(contextvars.copy_context().run, f) for f in funcoes]
+    if prazo is not None:
+        wait(futuros, timeout=prazo)
+    return [f.result() if prazo is None or f.done() else ATRASADO for f in futuros]
@@ -0,0 +1,206 @@
+"""
+Profiling por amostragem de requisições em produção (opt-in).
+
+Liga com PROFILE_SAMPLE_RATE=0.01 (1% das requisições) ou, numa requisição
+específica, com o header "X-Profile: 1" + Authorization de admin.
+
+    python perfilador.py merge GET /api/orcamento/<orcamento_uuid>/portas > portas.folded
+    flamegraph.pl portas.folded > portas.svg
+
+Com workers gevent (MODO_SERVIDOR=async) a amostragem de pilha não funciona
+(as "threads" viram greenlets e sys._current_frames não as enxerga): o
+perfilador fica desligado, a não ser com PROFILE_MODE=cprofile, que então
+inclui também os greenlets que rodaram durante a requisição.
+"""
+import os
+import re
+import sys
+import glob
+import time
+import random
+import urllib.parse
+import pstats
+import cProfile
+import threading
+from collections import Counter
+
+# =====================
+# CONFIG
+# =====================
+
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+# "amostragem" (pilhas colapsadas, pronto p/ flamegraph) ou "cprofile" (.pstats)
+PROFILE_MODE = os.getenv("PROFILE_MODE", "amostragem")
+PROFILE_DIR = os.getenv("PROFILE_DIR", "/tmp/colorglass_profiles")
+PROFILE_MAX_ARQUIVOS = int(os.getenv("PROFILE_MAX_ARQUIVOS", "500"))
+INTERVALO_AMOSTRA = 0.005
+
+# =====================
+# COLETORES
+# =====================
+
+class AmostradorPilha:
+    """Lê a pilha da thread da requisição a cada INTERVALO_AMOSTRA segundos."""
+
+    extensao = "folded"
+
+    def __init__(self):
+        self.alvo = threading.get_ident()
+        self.pilhas = Counter()
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+
+    def iniciar(self):
+        self._thread.start()
+
+    def _loop(self):
+        while not self._parar.wait(INTERVALO_AMOSTRA):
+            frame = sys._current_frames().get(self.alvo)
+            pilha = []
+            while frame is not None:
+                codigo = frame.f_code
+                pilha.append(f"{os.path.basename(codigo.co_filename)}:{codigo.co_name}")
+                frame = frame.f_back
+            if pilha:
+                self.pilhas[";".join(reversed(pilha))] += 1
+
+    def parar(self):
+        self._parar.set()
+        self._thread.join()
+
+    def salvar(self, caminho):
+        with open(caminho, "w") as f:
+            for pilha, n in self.pilhas.items():
+                f.write(f"{pilha} {n}\n")
+
+
+class ColetorCProfile:
+    extensao = "pstats"
+
+    def __init__(self):
+        self.perfil = cProfile.Profile()
+
+    def iniciar(self):
+        self.perfil.enable()
+
+    def parar(self):
+        self.perfil.disable()
+
+    def salvar(self, caminho):
+        self.perfil.dump_stats(caminho)
+
+# =====================
+# FLASK
+# =====================
+
+def _nome_rota(rota):
+    """"GET /api/x/<id>" -> nome reversível para o arquivo (sem "/" nem espaço)."""
+    return urllib.parse.quote(rota, safe="")
+
+
+def _rota_do_arquivo(caminho):
+    """<ns>_<rota>_<ms>ms.<ext> -> "GET /api/..." (None se o nome não seguir o padrão)."""
+    m = re.fullmatch(r"\d+_(.+)_\d+ms\.\w+", os.path.basename(caminho))
+    return urllib.parse.unquote(m.group(1)) if m else None
+
+
+def _sob_gevent():
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched("threading")
+
+
+def _admin_pediu(request):
+    """X-Profile: 1 só vale com o token de admin (auth.token_required)."""
+    if request.headers.get("X-Profile") != "1":
+        return False
+    try:
+        from auth import token_required
+    except RuntimeError:
+        return False  # ADMIN_TOKEN não configurado
+    return token_required(lambda: True)() is True
+
+
+def _rotacionar(diretorio):
+    arquivos = sorted(glob.glob(os.path.join(diretorio, "*_*ms.*")), key=os.path.getmtime)
+    for caminho in arquivos[:max(0, len(arquivos) - PROFILE_MAX_ARQUIVOS)]:
+        try:
+            os.remove(caminho)
+        except FileNotFoundError:
+            pass
+
+
+def instalar(app):
+    from flask import g, request
+
+    if PROFILE_MODE != "cprofile" and _sob_gevent():
+        print("Perfilador desligado: amostragem de pilha não funciona com gevent (use PROFILE_MODE=cprofile)")
+        return
+
+    @app.before_request
+    def _talvez_perfilar():
+        if not (PROFILE_SAMPLE_RATE and random.random() < PROFILE_SAMPLE_RATE) and not _admin_pediu(request):
+            return
+        coletor = ColetorCProfile() if PROFILE_MODE == "cprofile" else AmostradorPilha()
+        g.perfil = (coletor, time.perf_counter())
+        coletor.iniciar()
+
+    @app.teardown_request
+    def _salvar_perfil(exc):
+        perfil = g.pop("perfil", None)
+        if perfil is None:
+            return
+        coletor, inicio = perfil
+        coletor.parar()
+        ms = (time.perf_counter() - inicio) * 1000
+        rota = f"{request.method} {request.url_rule.rule if request.url_rule else request.path}"
+        try:
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            nome = f"{time.time_ns()}_{_nome_rota(rota)}_{ms:.0f}ms.{coletor.extensao}"
+            coletor.salvar(os.path.join(PROFILE_DIR, nome))
+            _rotacionar(PROFILE_DIR)
+        except OSError as e:
+            print("Erro salvando profile:", e)
+
+# =====================
+# CLI
+# =====================
+
+def merge(metodo=None, rota=None, diretorio=PROFILE_DIR, saida=sys.stdout):
+    """
+    Junta os perfis de uma rota exata (método + regra do Flask, ex.: GET
+    /api/orcamento/<orcamento_uuid>/portas): .folded somados (flamegraph) e
+    .pstats num resumo. Sem método/rota junta tudo.
+    """
+    alvo = f"{metodo.upper()} {rota}" if metodo and rota else None
+    arquivos = [
+        caminho for caminho in glob.glob(os.path.join(diretorio, "*_*ms.*"))
+        if alvo is None or _rota_do_arquivo(caminho) == alvo
+    ]
+    dobrados = Counter()
+    pstats_arquivos = []
+    for caminho in arquivos:
+        if caminho.endswith(".folded"):
+            with open(caminho) as f:
+                for linha in f:
+                    pilha, _, n = linha.rstrip("\n").rpartition(" ")
+                    dobrados[pilha] += int(n)
+        elif caminho.endswith(".pstats"):
+            pstats_arquivos.append(caminho)
+
+    for pilha, n in dobrados.most_common():
+        saida.write(f"{pilha} {n}\n")
+    if pstats_arquivos:
+        stats = pstats.Stats(*pstats_arquivos, stream=sys.stderr)
+        stats.sort_stats("cumulative").print_stats(30)
+    print(f"{len(arquivos)} perfis combinados", file=sys.stderr)
+    return len(arquivos)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) in (2, 4) and sys.argv[1] == "merge":
+        merge(*sys.argv[2:4])
+    else:
+        print(__doc__)
@@ -0,0 +1,196 @@
+"""
+Plano de corte das barras de perfil (corte unidimensional).
+
+Cada folha de porta vira 4 peças de perfil (2 na largura, 2 na altura).
+As peças de um mesmo perfil são encaixadas em barras de estoque
+(BARRA_MM) descontando a espessura da serra (kerf) a cada corte.
+Sobra maior ou igual a sobra_minima volta ao estoque como retalho; menor
+é descarte.
+
+1. Best-fit decreasing: peças da maior para a menor, cada uma na barra
+   aberta com a menor folga em que ela cabe (busca binária nas folgas).
+2. Melhoria opcional, limitada por tempo: reempacota grupos pequenos de
+   barras até economizar barras ou juntar as sobras em retalhos maiores.
+"""
+import os
+import time
+import bisect
+import heapq
+import random
+
+from lista_materiais import folhas_porta
+
+# =====================
+# CONFIG
+# =====================
+
+BARRA_MM = float(os.getenv("BARRA_MM", "6000"))
+KERF_MM = float(os.getenv("KERF_MM", "4"))
+SOBRA_MINIMA_MM = float(os.getenv("SOBRA_MINIMA_MM", "300"))
+# Tempo máximo da etapa de melhoria (0 desliga)
+OTIMIZAR_MS = float(os.getenv("PLANO_CORTE_OTIMIZAR_MS", "200"))
+
+# =====================
+# PEÇAS
+# =====================
+
+def pecas_porta(porta):
+    """
+    porta: {"id", "tipo", "dados" (tipado), "quantidade"} ->
+    [(perfil_id, comprimento_mm, etiqueta)]
+    """
+    dados = porta.get("dados") or {}
+    perfil_id = dados.get("perfil")
+    largura, altura = dados.get("largura"), dados.get("altura")
+    if perfil_id in (None, "") or not isinstance(largura, (int, float)) or not isinstance(altura, (int, float)):
+        return []
+    n, largura_folha = folhas_porta(porta.get("tipo"), largura, dados.get("qtd_folhas"))
+    quantidade = int(porta.get("quantidade") or 1)
+    porta_id = porta.get("id")
+    pecas = []
+    for q in range(quantidade):
+        for f in range(n):
+            etiqueta = f"{porta_id}#{q + 1}.{f + 1}" if porta_id is not None else None
+            pecas += [(str(perfil_id), largura_folha, etiqueta)] * 2
+            pecas += [(str(perfil_id), float(altura), etiqueta)] * 2
+    return pecas
+
+# =====================
+# EMPACOTAMENTO
+# =====================
+
+def _best_fit(comprimentos, capacidade, kerf):
+    """
+    comprimentos (na ordem de encaixe, normalmente decrescente) -> (barras, folgas).
+    barras[i] = índices das peças; folgas[i] = espaço livre (já com kerf).
+    """
+    barras, folgas = [], []
+    abertas = []  # (folga, barra) ordenado
+    for i, c in enumerate(comprimentos):
+        consumo = c + kerf
+        pos = bisect.bisect_left(abertas, (consumo, -1))
+        if pos < len(abertas):
+            folga, b = abertas.pop(pos)
+        else:
+            b = len(barras)
+            barras.append([])
+            folgas.append(capacidade)
+            folga = capacidade
+        barras[b].append(i)
+        folgas[b] = folga - consumo
+        if folgas[b] > 0:
+            bisect.insort(abertas, (folgas[b], b))
+    return barras, folgas
+
+
+def _melhorar(barras, folgas, comprimentos, capacidade, kerf, limite, prazo, rng):
+    """
+    Reempacota pequenos grupos de barras (as mais folgadas + algumas ao
+    acaso) com a ordem das peças levemente embaralhada. Aceita se o grupo
+    usar menos barras ou concentrar a sobra (retalhos maiores). Para no
+    prazo ou ao atingir o limite inferior.
+    """
+    while len(barras) > limite and time.perf_counter() < prazo:
+        grupo = set(heapq.nlargest(2, range(len(barras)), key=folgas.__getitem__))
+        grupo |= set(rng.sample(range(len(barras)), min(6, len(barras))))
+        pecas = sorted(
+            (p for b in grupo for p in barras[b]),
+            key=lambda p: -comprimentos[p] * rng.uniform(0.8, 1.0)
+        )
+        novas, novas_folgas = _best_fit([comprimentos[p] for p in pecas], capacidade, kerf)
+        antes = (len(grupo), -sum(folgas[b] ** 2 for b in grupo))
+        depois = (len(novas), -sum(f ** 2 for f in novas_folgas))
+        if depois >= antes:
+            continue
+        for b in sorted(grupo, reverse=True):
+            del barras[b]
+            del folgas[b]
+        barras += [[pecas[i] for i in barra] for barra in novas]
+        folgas += novas_folgas
+
+
+def planejar_perfil(pecas, barra_mm=BARRA_MM, kerf_mm=KERF_MM, sobra_minima_mm=SOBRA_MINIMA_MM, otimizar_ms=OTIMIZAR_MS):
+    """
+    pecas: [(comprimento_mm, etiqueta)] de um perfil.
+    Retorna barras, totais e peças que não cabem numa barra inteira.
+    """
+    maiores = [p for p in pecas if p[0] > barra_mm]
+    pecas = sorted((p for p in pecas if 0 < p[0] <= barra_mm), key=lambda p: -p[0])
+    comprimentos = [p[0] for p in pecas]
+
+    # a última peça da barra não precisa de corte depois dela
+    capacidade = barra_mm + kerf_mm
+    barras, folgas = _best_fit(comprimentos, capacidade, kerf_mm)
+
+    consumo_total = sum(comprimentos) + kerf_mm * len(comprimentos)
+    limite = -(-consumo_total // capacidade) if comprimentos else 0
+    n_heuristica = len(barras)
+    if otimizar_ms and len(barras) > limite:
+        _melhorar(barras, folgas, comprimentos, capacidade, kerf_mm, limite,
+                  time.perf_counter() + otimizar_ms / 1000, random.Random(0))
+
+    saida = []
+    retalhos = descarte = 0.0
+    for idx, folga in zip(barras, folgas):
+        sobra = max(folga - kerf_mm, 0.0)
+        retalho = sobra >= sobra_minima_mm
+        if retalho:
+            retalhos += sobra
+        else:
+            descarte += sobra
+        saida.append({
+            "cortes": [{"comprimento": round(pecas[i][0], 1), "etiqueta": pecas[i][1]}
+                       for i in sorted(idx, key=lambda i: -comprimentos[i])],
+            "sobra": round(sobra, 1),
+            "retalho": retalho
+        })
+    saida.sort(key=lambda b: b["sobra"])
+
+    usado = sum(comprimentos)
+    return {
+        "barra_mm": barra_mm,
+        "barras": saida,
+        "n_barras": len(saida),
+        "n_barras_heuristica": n_heuristica,
+        "limite_inferior": int(limite),
+        "n_cortes": len(comprimentos),
+        "aproveitamento": round(usado / (len(saida) * barra_mm), 4) if saida else None,
+        "retalhos_mm": round(retalhos, 1),
+        "descarte_mm": round(descarte, 1),
+        "maiores_que_barra": [{"comprimento": c, "etiqueta": e} for c, e in maiores]
+    }
+
+
+def planejar(portas, perfis_por_id=None, barra_mm=BARRA_MM, kerf_mm=KERF_MM,
+             sobra_minima_mm=SOBRA_MINIMA_MM, otimizar_ms=OTIMIZAR_MS, barras_por_perfil=None):
+    """
+    portas -> {"perfis": [plano por perfil], "avisos": [...]}
+    barras_por_perfil: {perfil_id: comprimento da barra} para perfis com barra diferente.
+    O prazo de otimização é dividido entre os perfis, proporcional ao número de peças.
+    """
+    por_perfil = {}
+    avisos = []
+    for porta in portas:
+        pecas = pecas_porta(porta)
+        if not pecas:
+            avisos.append(f"Porta {porta.get('id')}: sem perfil ou medidas")
+        for perfil_id, comprimento, etiqueta in pecas:
+            por_perfil.setdefault(perfil_id, []).append((comprimento, etiqueta))
+
+    total_pecas = sum(len(p) for p in por_perfil.values()) or 1
+    planos = []
+    for perfil_id, pecas in por_perfil.items():
+        barra = float((barras_por_perfil or {}).get(perfil_id, barra_mm))
+        plano = planejar_perfil(pecas, barra, kerf_mm, sobra_minima_mm, otimizar_ms * len(pecas) / total_pecas)
+        perfil = (perfis_por_id or {}).get(perfil_id)
+        if perfis_por_id is not None and perfil is None:
+            avisos.append(f"Perfil não encontrado: {perfil_id}")
+        if plano["maiores_que_barra"]:
+            avisos.append(f"Perfil {perfil_id}: {len(plano['maiores_que_barra'])} peça(s) maiores que a barra de {barra:.0f} mm")
+        planos.append({"perfil_id": perfil_id, "nome": perfil.get("nome") if perfil else None, **plano})
+
+    return {
+        "perfis": planos,
+        "total_barras": sum(p["n_barras"] for p in planos),
+        "avisos": avisos
+    }
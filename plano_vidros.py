@@ -0,0 +1,295 @@
+"""
+Plano de corte das chapas de vidro (empacotamento 2D guilhotinado).
+
+Cada folha de porta vira uma peça de vidro (largura da folha x altura).
+As peças são agrupadas por vidro (tipo + espessura) e encaixadas em
+chapas de estoque (CHAPA_LARGURA_MM x CHAPA_ALTURA_MM), descontando o
+refilo da borda da chapa e o espaço de corte entre peças. O vidro não tem
+veio: as peças podem girar 90°.
+
+Heurística guilhotina: cada chapa guarda retângulos livres; a peça vai no
+retângulo com menor sobra de área (best area fit) da primeira chapa onde
+cabe (chapas cujo maior retângulo livre não comporta a peça são puladas),
+e o que sobra do retângulo é dividido em dois por um corte reto (sempre de
+ponta a ponta, logo cortável na mesa). Dentro do prazo (otimizar_ms) a
+mesma heurística roda com outras ordens de peças e regras de divisão, e
+fica o plano com menos chapas (empate: a chapa menos usada mais vazia,
+que vira retalho). Para antes se atingir o limite inferior de chapas
+pela área.
+"""
+import os
+import time
+import random
+
+from catalog_index import normalizar
+from lista_materiais import folhas_porta
+
+# =====================
+# CONFIG
+# =====================
+
+CHAPA_LARGURA_MM = float(os.getenv("CHAPA_LARGURA_MM", "3210"))
+CHAPA_ALTURA_MM = float(os.getenv("CHAPA_ALTURA_MM", "2250"))
+REFILO_MM = float(os.getenv("REFILO_MM", "10"))
+ESPACO_CORTE_MM = float(os.getenv("ESPACO_CORTE_MM", "3"))
+# Tempo máximo da busca por grupo de vidro (0 = só a primeira passada)
+OTIMIZAR_MS = float(os.getenv("PLANO_VIDROS_OTIMIZAR_MS", "300"))
+# A busca também para depois de tantas tentativas seguidas sem melhorar
+SEM_MELHORA_MAX = 200
+
+# Ordens de peças testadas antes das aleatórias
+ORDENS = (
+    lambda p: -p[0] * p[1],             # área
+    lambda p: -max(p[0], p[1]),         # lado maior
+    lambda p: -(p[0] + p[1]),           # perímetro
+    lambda p: -p[1],                    # altura
+    lambda p: -p[0],                    # largura
+)
+# Regra de divisão do retângulo livre: corte pelo eixo de sobra menor / maior
+REGRAS = ("menor", "maior")
+
+# =====================
+# PEÇAS
+# =====================
+
+def pecas_porta(porta):
+    """porta -> [(vidro_id, largura_mm, altura_mm, etiqueta)], uma por folha."""
+    dados = porta.get("dados") or {}
+    vidro_id = dados.get("vidro")
+    largura, altura = dados.get("largura"), dados.get("altura")
+    if vidro_id in (None, "") or not isinstance(largura, (int, float)) or not isinstance(altura, (int, float)):
+        return []
+    n, largura_folha = folhas_porta(porta.get("tipo"), largura, dados.get("qtd_folhas"))
+    porta_id = porta.get("id")
+    pecas = []
+    for q in range(int(porta.get("quantidade") or 1)):
+        for f in range(n):
+            etiqueta = f"{porta_id}#{q + 1}.{f + 1}" if porta_id is not None else None
+            pecas.append((str(vidro_id), float(largura_folha), float(altura), etiqueta))
+    return pecas
+
+# =====================
+# EMPACOTAMENTO
+# =====================
+
+class _Chapa:
+    __slots__ = ("livres", "pecas", "area", "maior_w", "maior_h")
+
+    def __init__(self, largura, altura):
+        self.livres = [(0.0, 0.0, largura, altura)]
+        self.pecas = []
+        self.area = 0.0
+        self.maior_w, self.maior_h = largura, altura
+
+    def recalcular(self):
+        self.maior_w = max((r[2] for r in self.livres), default=0)
+        self.maior_h = max((r[3] for r in self.livres), default=0)
+
+
+def _encaixar(pecas, ordem, largura, altura, regra, girar, menor_lado):
+    """
+    Uma passada da heurística. pecas: [(w, h)] já com o espaço de corte.
+    Retorna a lista de chapas ou None se alguma peça não couber em chapa vazia.
+    """
+    chapas = []
+    abertas = []
+    for i in ordem:
+        w, h = pecas[i]
+        lugar = None
+        for chapa in abertas:
+            mw, mh = chapa.maior_w, chapa.maior_h
+            if not ((w <= mw and h <= mh) or (girar and h <= mw and w <= mh)):
+                continue
+            melhor = None
+            for j, (x, y, fw, fh) in enumerate(chapa.livres):
+                for pw, ph, girada in ((w, h, False), (h, w, True)) if girar and w != h else ((w, h, False),):
+                    if pw <= fw and ph <= fh:
+                        sobra = fw * fh - pw * ph
+                        if melhor is None or sobra < melhor[0]:
+                            melhor = (sobra, j, pw, ph, girada)
+            if melhor is not None:
+                lugar = (chapa, melhor)
+                break
+        if lugar is None:
+            chapa = _Chapa(largura, altura)
+            chapas.append(chapa)
+            abertas.append(chapa)
+            if w <= largura and h <= altura:
+                lugar = (chapa, (0, 0, w, h, False))
+            elif girar and h <= largura and w <= altura:
+                lugar = (chapa, (0, 0, h, w, True))
+            else:
+                return None
+        chapa, (_, j, pw, ph, girada) = lugar
+        x, y, fw, fh = chapa.livres.pop(j)
+        chapa.pecas.append((i, x, y, pw, ph, girada))
+        chapa.area += pw * ph
+        # corte guilhotina do que sobrou do retângulo
+        sobra_w, sobra_h = fw - pw, fh - ph
+        if (sobra_w < sobra_h) == (regra == "menor"):
+            novos = ((x + pw, y, sobra_w, ph), (x, y + ph, fw, sobra_h))
+        else:
+            novos = ((x + pw, y, sobra_w, fh), (x, y + ph, pw, sobra_h))
+        chapa.livres += [r for r in novos if r[2] >= menor_lado and r[3] >= menor_lado]
+        chapa.recalcular()
+        if not chapa.livres:
+            abertas.remove(chapa)
+    return chapas
+
+
+def _nota(chapas):
+    """Menos chapas; no empate, última chapa com menos área usada."""
+    return (len(chapas), min(c.area for c in chapas) if chapas else 0)
+
+
+def planejar_grupo(pecas, chapa_largura=CHAPA_LARGURA_MM, chapa_altura=CHAPA_ALTURA_MM,
+                   refilo_mm=REFILO_MM, espaco_mm=ESPACO_CORTE_MM, girar=True, otimizar_ms=OTIMIZAR_MS):
+    """
+    pecas: [(largura_mm, altura_mm, etiqueta)] de um mesmo vidro.
+    Retorna as chapas com as posições (mm, a partir do canto da chapa).
+    """
+    util_w = chapa_largura - 2 * refilo_mm + espaco_mm
+    util_h = chapa_altura - 2 * refilo_mm + espaco_mm
+    cabe = lambda w, h: (w <= util_w and h <= util_h) or (girar and h <= util_w and w <= util_h)
+    maiores = [p for p in pecas if not cabe(p[0] + espaco_mm, p[1] + espaco_mm)]
+    pecas = [p for p in pecas if cabe(p[0] + espaco_mm, p[1] + espaco_mm) and p[0] > 0 and p[1] > 0]
+    dims = [(w + espaco_mm, h + espaco_mm) for w, h, _ in pecas]
+    menor_lado = min((min(d) for d in dims), default=0)
+
+    prazo = time.perf_counter() + otimizar_ms / 1000
+    rng = random.Random(0)
+    melhor = None
+    tentativas = 0
+    base = list(range(len(dims)))
+    candidatas = [(sorted(base, key=lambda i: o(dims[i])), r) for o in ORDENS for r in REGRAS]
+    limite = -(-sum(w * h for w, h in dims) // (util_w * util_h))
+    sem_melhora = 0
+    while True:
+        if candidatas:
+            ordem, regra = candidatas.pop(0)
+        else:
+            # perturba a melhor ordem: troca algumas peças de lugar
+            ordem = list(melhor[1])
+            for _ in range(max(1, len(ordem) // 50)):
+                a, b = rng.randrange(len(ordem)), rng.randrange(len(ordem))
+                ordem[a], ordem[b] = ordem[b], ordem[a]
+            regra = rng.choice(REGRAS)
+        chapas = _encaixar(dims, ordem, util_w, util_h, regra, girar, menor_lado)
+        tentativas += 1
+        if chapas is not None and (melhor is None or _nota(chapas) < _nota(melhor[0])):
+            melhor = (chapas, ordem)
+            sem_melhora = 0
+        else:
+            sem_melhora += 1
+        if not dims or time.perf_counter() >= prazo or sem_melhora >= SEM_MELHORA_MAX \
+                or (melhor and len(melhor[0]) <= limite):
+            break
+
+    chapas = melhor[0] if melhor else []
+    area_chapa = chapa_largura * chapa_altura
+    saida = []
+    for chapa in chapas:
+        area = sum(pecas[i][0] * pecas[i][1] for i, *_ in chapa.pecas)
+        saida.append({
+            "pecas": [{
+                "x": round(x + refilo_mm, 1), "y": round(y + refilo_mm, 1),
+                "largura": round(pecas[i][1] if girada else pecas[i][0], 1),
+                "altura": round(pecas[i][0] if girada else pecas[i][1], 1),
+                "girada": girada, "etiqueta": pecas[i][2]
+            } for i, x, y, _, _, girada in chapa.pecas],
+            "aproveitamento": round(area / area_chapa, 4)
+        })
+
+    area_pecas = sum(w * h for w, h, _ in pecas)
+    return {
+        "chapa": {"largura": chapa_largura, "altura": chapa_altura},
+        "chapas": saida,
+        "n_chapas": len(saida),
+        "n_pecas": len(pecas),
+        "area_pecas_m2": round(area_pecas / 1e6, 3),
+        "area_chapas_m2": round(len(saida) * area_chapa / 1e6, 3),
+        "aproveitamento": round(area_pecas / (len(saida) * area_chapa), 4) if saida else None,
+        "tentativas": tentativas,
+        "maiores_que_chapa": [{"largura": w, "altura": h, "etiqueta": e} for w, h, e in maiores]
+    }
+
+
+def chave_grupo(tipo, espessura):
+    """"<tipo>|<espessura>": tipo sem acento nem maiúsculas, espessura como número (8, 8.0 e "8" são 8)."""
+    if espessura in (None, ""):
+        return f"{normalizar(tipo)}|"
+    try:
+        espessura = f"{float(espessura):g}"
+    except (TypeError, ValueError):
+        espessura = str(espessura).strip()
+    return f"{normalizar(tipo)}|{espessura}"
+
+
+def _chaves_chapas(chapas_por_vidro):
+    """Chaves de chapas_por_vidro na mesma forma das chaves dos grupos ("id:<vidro>" fica como veio)."""
+    normalizadas = {}
+    for chave, chapa in (chapas_por_vidro or {}).items():
+        chave = str(chave)
+        if not chave.startswith("id:"):
+            tipo, _, espessura = chave.partition("|")
+            chave = chave_grupo(tipo, espessura.strip())
+        normalizadas[chave] = chapa
+    return normalizadas
+
+
+def planejar(portas, vidros_por_id=None, chapa_largura=CHAPA_LARGURA_MM, chapa_altura=CHAPA_ALTURA_MM,
+             refilo_mm=REFILO_MM, espaco_mm=ESPACO_CORTE_MM, girar=True, otimizar_ms=OTIMIZAR_MS,
+             chapas_por_vidro=None):
+    """
+    portas -> {"grupos": [plano por tipo/espessura de vidro], "avisos": [...]}
+    Vidros diferentes no catálogo com o mesmo tipo e espessura dividem as chapas.
+    chapas_por_vidro: {"<tipo>|<espessura>": {"largura", "altura"}} para chapas diferentes
+    (tipo sem diferença de acento/maiúsculas; grupo sem peças no plano vira aviso).
+    O prazo de otimização é dividido entre os grupos, proporcional ao número de peças.
+    """
+    grupos = {}
+    avisos = []
+    for porta in portas:
+        pecas = pecas_porta(porta)
+        if not pecas:
+            avisos.append(f"Porta {porta.get('id')}: sem vidro ou medidas")
+        for vidro_id, w, h, etiqueta in pecas:
+            vidro = (vidros_por_id or {}).get(vidro_id)
+            if vidro:
+                chave = chave_grupo(vidro.get("tipo"), vidro.get("espessura"))
+            else:
+                chave = f"id:{vidro_id}"
+                if vidros_por_id is not None:
+                    avisos.append(f"Vidro não encontrado: {vidro_id}")
+            grupo = grupos.setdefault(chave, {"vidros": {}, "pecas": []})
+            grupo["vidros"][vidro_id] = vidro
+            grupo["pecas"].append((w, h, etiqueta))
+
+    chapas_por_vidro = _chaves_chapas(chapas_por_vidro)
+    avisos += [f"chapas_por_vidro: nenhuma peça do grupo {chave}" for chave in chapas_por_vidro if chave not in grupos]
+
+    total_pecas = sum(len(g["pecas"]) for g in grupos.values()) or 1
+    planos = []
+    for chave, grupo in grupos.items():
+        chapa = chapas_por_vidro.get(chave) or {}
+        plano = planejar_grupo(
+            grupo["pecas"],
+            float(chapa.get("largura", chapa_largura)), float(chapa.get("altura", chapa_altura)),
+            refilo_mm, espaco_mm, girar, otimizar_ms * len(grupo["pecas"]) / total_pecas
+        )
+        if plano["maiores_que_chapa"]:
+            avisos.append(f"Vidro {chave}: {len(plano['maiores_que_chapa'])} peça(s) maiores que a chapa")
+        exemplo = next((v for v in grupo["vidros"].values() if v), None) or {}
+        planos.append({
+            "grupo": chave,
+            "tipo": exemplo.get("tipo"),
+            "espessura": exemplo.get("espessura"),
+            "vidro_ids": list(grupo["vidros"]),
+            **plano
+        })
+
+    return {
+        "grupos": planos,
+        "total_chapas": sum(p["n_chapas"] for p in planos),
+        "avisos": list(dict.fromkeys(avisos))
+    }
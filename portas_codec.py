@@ -0,0 +1,121 @@
+"""
+Codec do campo `dados` das portas.
+
+v1 (legado): coluna text[] `dados` com itens "chave:valor", tudo string.
+v2: coluna jsonb `dados_json` com {"v": 2, ...}, números como números.
+
+    python portas_codec.py migrar   # converte as linhas v1 existentes, em lotes
+"""
+import sys
+import math
+
+VERSAO = 2
+
+# Campos numéricos conhecidos dos formulários de tipologia
+CAMPOS_NUMERICOS = {"largura", "altura", "qtd_folhas"}
+CAMPOS_LISTA_NUMERICA = {"dobradicas_alturas"}
+
+
+def _numero(valor):
+    """
+    "12,5" -> 12.5. Texto que não é número (inclusive "nan"/"inf") fica como veio;
+    float NaN/Infinity (aceitos pelo json.loads) levanta ValueError: o jsonb recusaria.
+    """
+    if isinstance(valor, float) and not math.isfinite(valor):
+        raise ValueError(f"Valor numérico inválido: {valor}")
+    if isinstance(valor, (int, float)) or valor is None:
+        return valor
+    texto = str(valor).strip().replace(",", ".")
+    try:
+        n = float(texto)
+    except ValueError:
+        return valor
+    if not math.isfinite(n):
+        return valor
+    return int(n) if n.is_integer() else n
+
+
+def _lista(valor):
+    if isinstance(valor, str):
+        valor = [v.strip() for v in valor.split(",") if v.strip()]
+    return [_numero(v) for v in (valor or [])]
+
+
+def tipar(dados):
+    """Converte os campos conhecidos para número (o resto fica como veio)."""
+    out = {}
+    for k, v in (dados or {}).items():
+        if k in CAMPOS_NUMERICOS:
+            out[k] = _numero(v)
+        elif k in CAMPOS_LISTA_NUMERICA:
+            out[k] = _lista(v)
+        else:
+            out[k] = v
+    return out
+
+
+def encode(dados):
+    """dict vindo do cliente -> valor da coluna jsonb."""
+    return {"v": VERSAO, **tipar(dados)}
+
+
+def decode_legado(dados_array):
+    """text[] "k:v" (v1) -> dict tipado."""
+    dados = {}
+    for item in dados_array or []:
+        if ":" not in item:
+            continue
+        key, value = item.split(":", 1)
+        dados[key] = value
+    return tipar(dados)
+
+
+def decode(dados_json, dados_legado=None):
+    """Lê a linha em qualquer versão."""
+    if isinstance(dados_json, dict):
+        return {k: v for k, v in dados_json.items() if k != "v"}
+    if isinstance(dados_legado, list):
+        return decode_legado(dados_legado)
+    return {}
+
+# =====================
+# MIGRAÇÃO v1 -> v2
+# =====================
+
+def migrar(lote=500):
+    """
+    Percorre as portas ainda sem dados_json (paginação por id, sem carregar a
+    tabela inteira) e grava o jsonb em um upsert por lote. Pode ser
+    interrompida e rodada de novo.
+    """
+    import supabase_client as db
+
+    ultimo = None
+    total = 0
+    while True:
+        params = {
+            "select": "id,orcamento_uuid,tipo,quantidade,preco,dados",
+            "dados_json": "is.null",
+            "dados": "not.is.null",
+            "order": "id.asc",
+            "limit": lote
+        }
+        if ultimo is not None:
+            params["id"] = f"gt.{ultimo}"
+        rows = db.select("portas", params)
+        if not rows:
+            break
+        for row in rows:
+            row["dados_json"] = encode(decode_legado(row["dados"]))
+        db.upsert("portas", rows, on_conflict="id")
+        total += len(rows)
+        ultimo = rows[-1]["id"]
+        print(f"{total} portas migradas")
+    return total
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["migrar"]:
+        migrar()
+    else:
+        print(__doc__)
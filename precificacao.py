@@ -0,0 +1,113 @@
+import math
+
+import numpy as np
+
+# =====================
+# PREÇO DE CATÁLOGO (perfis, vidros, materiais)
+# =====================
+#
+# preço = custo * (1 + perda%) * (1 + margem%)
+
+
+def calcular_preco(custo, margem, perda):
+    custo_com_perda = custo * (1 + perda / 100)
+    return custo_com_perda * (1 + margem / 100)
+
+
+def calcular_precos(custos, margens, perdas):
+    """Mesma conta para vetores (NumPy), arredondada a centavos."""
+    custos, margens, perdas = (np.asarray(v, dtype=float) for v in (custos, margens, perdas))
+    return np.round(calcular_preco(custos, margens, perdas), 2)
+
+# =====================
+# MOTOR DE PREÇO DE PORTAS
+# =====================
+#
+# preço = perfil.preco * 2 * (largura + altura)   (R$/m linear do perímetro)
+#       + vidro.preco * largura * altura          (R$/m²)
+#
+# Medidas de entrada em mm (como nos formulários), cálculo em metros.
+
+
+def calcular_preco_porta(largura_mm, altura_mm, perfil=None, vidro=None):
+    """Preço de uma porta. perfil/vidro são as linhas do catálogo (ou None)."""
+    largura = largura_mm / 1000
+    altura = altura_mm / 1000
+    preco_perfil = float(perfil["preco"]) * 2 * (largura + altura) if perfil else 0
+    preco_vidro = float(vidro["preco"]) * largura * altura if vidro else 0
+    return round(preco_perfil + preco_vidro, 2)
+
+
+def _precos_por_id(por_id, ids):
+    """Vetor de preços para os ids (0 quando vazio/não encontrado) e ids não encontrados."""
+    chaves = [str(i) if i not in (None, "") else None for i in ids]
+    linhas = [por_id.get(k) if k is not None else None for k in chaves]
+    precos = np.fromiter((float(r["preco"]) if r else 0.0 for r in linhas), float, len(linhas))
+    faltando = [i for i, k, r in zip(ids, chaves, linhas) if k is not None and r is None]
+    return precos, faltando
+
+
+def _checar_porta(porta, i):
+    """Mesma regra do caminho vetorial, porta a porta: só roda para achar o índice do erro."""
+    if not isinstance(porta, dict):
+        raise ValueError(f"portas[{i}] deve ser um objeto")
+    for campo in ("largura", "altura"):
+        try:
+            numero = float(porta.get(campo))
+        except (TypeError, ValueError):
+            raise ValueError(f"portas[{i}].{campo} deve ser um número") from None
+        if not math.isfinite(numero) or numero <= 0:
+            raise ValueError(f"portas[{i}].{campo} deve ser > 0")
+    quantidade = porta.get("quantidade")
+    if quantidade is not None:
+        try:
+            numero = float(quantidade)
+        except (TypeError, ValueError):
+            numero = 0.0
+        if not numero >= 1 or not numero.is_integer():
+            raise ValueError(f"portas[{i}].quantidade deve ser um inteiro >= 1")
+
+
+def _vetores(portas):
+    """
+    (largura, altura, quantidade) em arrays, checados de uma vez: medidas finitas > 0 e
+    quantidade inteira >= 1 (1 se ausente). ValueError com o índice da primeira porta inválida.
+    """
+    n = len(portas)
+    try:
+        largura = np.fromiter((float(p["largura"]) for p in portas), float, n)
+        altura = np.fromiter((float(p["altura"]) for p in portas), float, n)
+        quantidade = np.fromiter(
+            (1.0 if p.get("quantidade") is None else float(p["quantidade"]) for p in portas), float, n
+        )
+        ok = (np.isfinite(largura) & (largura > 0) & np.isfinite(altura) & (altura > 0)
+              & (quantidade >= 1) & (quantidade == np.floor(quantidade)))
+    except (TypeError, ValueError, KeyError, AttributeError, OverflowError):
+        ok = None
+    if ok is None or not ok.all():
+        for i, porta in enumerate(portas):
+            _checar_porta(porta, i)
+        if ok is None:
+            raise ValueError("portas inválidas")
+    return largura, altura, quantidade
+
+
+def calcular_lote(portas, perfis_por_id, vidros_por_id):
+    """
+    Precifica N portas de uma vez.
+    portas: [{"largura", "altura" (mm), "perfil_id", "vidro_id", "quantidade"}]
+    Retorna (unitarios, totais, total_geral, avisos).
+    ValueError (com o índice) se alguma porta não tiver medidas > 0 ou quantidade inteira >= 1.
+    """
+    largura, altura, quantidade = _vetores(portas)
+    largura, altura = largura / 1000, altura / 1000
+
+    preco_perfil, perfis_faltando = _precos_por_id(perfis_por_id, [p.get("perfil_id") for p in portas])
+    preco_vidro, vidros_faltando = _precos_por_id(vidros_por_id, [p.get("vidro_id") for p in portas])
+
+    unitarios = np.round(preco_perfil * 2 * (largura + altura) + preco_vidro * largura * altura, 2)
+    totais = np.round(unitarios * quantidade, 2)
+
+    avisos = [f"Perfil não encontrado: {i}" for i in dict.fromkeys(perfis_faltando)]
+    avisos += [f"Vidro não encontrado: {i}" for i in dict.fromkeys(vidros_faltando)]
+    return unitarios, totais, round(float(totais.sum()), 2), avisos
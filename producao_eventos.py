@@ -0,0 +1,188 @@
+import os
+import re
+import json
+import time
+import queue
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+import supabase_client as db
+
+# =====================
+# CONFIG
+# =====================
+
+# Cada worker faz UMA consulta de delta por intervalo, não importa quantas telas estejam abertas
+PRODUCAO_POLL_SEGUNDOS = float(os.getenv("PRODUCAO_POLL_SEGUNDOS", "5"))
+# Eventos pendentes por tela antes de desconectá-la (ela reconecta com Last-Event-ID)
+PRODUCAO_BUFFER_CLIENTE = int(os.getenv("PRODUCAO_BUFFER_CLIENTE", "100"))
+HEARTBEAT_SEGUNDOS = 15
+# Linhas por consulta de delta (o resto vem na próxima volta, pelo cursor)
+PRODUCAO_POLL_LIMITE = int(os.getenv("PRODUCAO_POLL_LIMITE", "500"))
+# Orçamentos lembrados para não publicar a mesma versão duas vezes (os mais antigos saem)
+PRODUCAO_VISTOS_MAX = int(os.getenv("PRODUCAO_VISTOS_MAX", "10000"))
+
+CAMPOS_EVENTO = "id,numero_pedido,cliente_nome,data_criacao,quantidade_total,valor_total,situacao,updated_at"
+
+# =====================
+# DIFUSOR
+# =====================
+
+class Difusor:
+    """
+    Fan-out das mudanças de orçamentos para as telas conectadas via SSE.
+    O id do evento é "<updated_at>|<id>" da linha: a tela que reconecta manda
+    Last-Event-ID e recebe só o que mudou depois (uma consulta de delta).
+    Cursores são (updated_at, id): linhas com o mesmo updated_at não se perdem
+    na virada de página.
+    """
+
+    def __init__(self, buffer=PRODUCAO_BUFFER_CLIENTE, vistos_max=PRODUCAO_VISTOS_MAX):
+        self.buffer = buffer
+        self.vistos_max = vistos_max
+        self._clientes = set()
+        self._lock = threading.Lock()
+        self._vistos = OrderedDict()
+        self._cursor = None
+        self._poll_pid = None
+
+    # ---------- publicação ----------
+
+    def publicar(self, orcamento):
+        """Envia a linha para todas as telas (ignora se já publicada nessa versão)."""
+        chave = (orcamento.get("id"), orcamento.get("updated_at"))
+        with self._lock:
+            if self._vistos.get(chave[0]) == chave[1]:
+                return
+            self._vistos[chave[0]] = chave[1]
+            self._vistos.move_to_end(chave[0])
+            while len(self._vistos) > self.vistos_max:
+                self._vistos.popitem(last=False)
+            clientes = list(self._clientes)
+        for q in clientes:
+            try:
+                q.put_nowait(orcamento)
+            except queue.Full:
+                # tela lenta: derruba; ela volta com Last-Event-ID e pega o delta
+                self._desconectar(q)
+
+    def _desconectar(self, q):
+        with self._lock:
+            self._clientes.discard(q)
+        try:
+            while True:
+                q.get_nowait()
+        except queue.Empty:
+            pass
+        # um publicar que já tinha a lista de clientes pode ter enchido a fila de novo
+        while True:
+            try:
+                q.put_nowait(None)
+                return
+            except queue.Full:
+                try:
+                    q.get_nowait()
+                except queue.Empty:
+                    pass
+
+    # ---------- polling do banco (mudanças feitas em outros workers) ----------
+
+    def _iniciar_poll(self):
+        with self._lock:
+            if self._poll_pid == os.getpid():
+                return
+            self._poll_pid = os.getpid()
+        threading.Thread(target=self._loop_poll, daemon=True).start()
+
+    def _loop_poll(self):
+        while True:
+            try:
+                self._poll()
+            except Exception as e:
+                print("Erro no poll de produção:", e)
+            time.sleep(PRODUCAO_POLL_SEGUNDOS)
+
+    def _poll(self):
+        if self._cursor is None:
+            # primeira volta: só marca onde começar
+            ultimo = db.select("orcamentos", {"select": "updated_at,id", "order": "updated_at.desc,id.desc", "limit": 1})
+            self._cursor = (ultimo[0]["updated_at"], ultimo[0]["id"]) if ultimo else ("1970-01-01T00:00:00+00:00", "")
+            return
+        for row in db.select("orcamentos", {
+            "select": CAMPOS_EVENTO,
+            **_depois_de(*self._cursor),
+            "order": "updated_at.asc,id.asc",
+            "limit": PRODUCAO_POLL_LIMITE
+        }):
+            self.publicar(row)
+            self._cursor = (row["updated_at"], row["id"])
+
+    # ---------- assinatura (uma por conexão SSE) ----------
+
+    def stream(self, last_event_id=None):
+        """Gerador de texto SSE para uma tela."""
+        self._iniciar_poll()
+        q = queue.Queue(maxsize=self.buffer)
+        with self._lock:
+            self._clientes.add(q)
+        try:
+            cursor = _ler_cursor(last_event_id) if last_event_id else None
+            while cursor is not None:
+                # retomada: o que mudou enquanto a tela estava desconectada, em páginas
+                perdidos = db.select("orcamentos", {
+                    "select": CAMPOS_EVENTO,
+                    **_depois_de(*cursor),
+                    "order": "updated_at.asc,id.asc",
+                    "limit": PRODUCAO_POLL_LIMITE
+                })
+                for row in perdidos:
+                    yield _formatar(row)
+                if len(perdidos) < PRODUCAO_POLL_LIMITE:
+                    break
+                cursor = (perdidos[-1]["updated_at"], perdidos[-1]["id"])
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    row = q.get(timeout=HEARTBEAT_SEGUNDOS)
+                except queue.Empty:
+                    yield ": ping\n\n"
+                    continue
+                if row is None:
+                    return
+                yield _formatar(row)
+        finally:
+            with self._lock:
+                self._clientes.discard(q)
+
+
+ID_EVENTO = re.compile(r"[0-9A-Za-z-]*")
+
+
+def _ler_cursor(last_event_id):
+    """
+    (updated_at, id) do Last-Event-ID, ou None se não for "<instante ISO>|<id>"
+    (id inteiro ou uuid; vazio nos ids antigos): a tela segue só com o que vier dali em diante.
+    """
+    updated_at, _, ultimo_id = last_event_id.partition("|")
+    try:
+        instante = datetime.fromisoformat(updated_at.strip())
+    except ValueError:
+        return None
+    if not ID_EVENTO.fullmatch(ultimo_id):
+        return None
+    return instante.isoformat(), ultimo_id
+
+
+def _depois_de(updated_at, ultimo_id):
+    """Filtro do PostgREST para (updated_at, id) > cursor; sem id (Last-Event-ID antigo), só updated_at."""
+    if not ultimo_id:
+        return {"updated_at": f"gt.{updated_at}"}
+    return {"or": f'(updated_at.gt."{updated_at}",and(updated_at.eq."{updated_at}",id.gt."{ultimo_id}"))'}
+
+
+def _formatar(row):
+    return f"id: {row.get('updated_at', '')}|{row.get('id', '')}\nevent: orcamento\ndata: {json.dumps(row, default=str)}\n\n"
+
+
+difusor = Difusor()
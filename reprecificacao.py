@@ -0,0 +1,163 @@
+"""
+Reprecificação em lote de perfis, vidros ou materiais.
+
+Aplica um ajuste de custo/margem/perda num conjunto filtrado de itens,
+recalcula todos os preços de uma vez (NumPy) e grava tudo num único
+upsert. Devolve o diff (antes -> depois) de cada item alterado.
+
+    python reprecificacao.py perfis --custo-percentual 8 --busca 2215 --simular
+    python reprecificacao.py materiais --margem 40 --tipo-medida metro_linear
+"""
+import sys
+import argparse
+import numpy as np
+
+import supabase_client as db
+from catalog_cache import catalogo
+from precificacao import calcular_precos
+
+# =====================
+# CONFIG
+# =====================
+
+# tabela -> coluna com o nome do item
+TABELAS = {"perfis": "nome", "vidros": "tipo", "materiais": "nome"}
+
+# filtro -> (tabelas onde vale, montagem do filtro do PostgREST)
+FILTROS = {
+    "ids": (None, lambda v: ("id", f"in.({','.join(str(i) for i in v)})")),
+    "tipologia": (("perfis",), lambda v: ("tipologias", f"cs.{{{v}}}")),
+    "espessura": (("vidros",), lambda v: ("espessura", f"eq.{v}")),
+    "tipo_medida": (("materiais",), lambda v: ("tipo_medida", f"eq.{v}")),
+}
+
+AJUSTES = ("custo_percentual", "margem", "margem_delta", "perda", "perda_delta")
+CAMPOS = ("custo", "margem", "perda", "preco")
+
+# =====================
+# REPRECIFICAÇÃO
+# =====================
+
+def _filtros(tabela, filtros):
+    params = {"order": "id.asc"}
+    for nome, valor in (filtros or {}).items():
+        if valor in (None, "", []):
+            continue
+        if nome == "busca":
+            params[TABELAS[tabela]] = f"ilike.*{valor}*"
+            continue
+        if nome not in FILTROS:
+            raise ValueError(f"Filtro desconhecido: {nome}")
+        tabelas, montar = FILTROS[nome]
+        if tabelas and tabela not in tabelas:
+            raise ValueError(f"Filtro {nome} não vale para {tabela}")
+        coluna, expressao = montar(valor)
+        params[coluna] = expressao
+    return params
+
+
+def _vetor(rows, campo):
+    return np.fromiter((float(r.get(campo) or 0) for r in rows), float, len(rows))
+
+
+def aplicar_ajuste(rows, ajuste):
+    """
+    Calcula (custo, margem, perda, preço) novos de todas as linhas de uma vez.
+    ajuste: custo_percentual (+8 = 8% mais caro), margem / perda (novo valor)
+    ou margem_delta / perda_delta (pontos percentuais a somar).
+    """
+    ajuste = {k: float(v) for k, v in (ajuste or {}).items() if k in AJUSTES and v not in (None, "")}
+    if not ajuste:
+        raise ValueError(f"Informe ao menos um ajuste: {', '.join(AJUSTES)}")
+
+    custos = _vetor(rows, "custo")
+    if "custo_percentual" in ajuste:
+        custos = np.round(custos * (1 + ajuste["custo_percentual"] / 100), 2)
+    margens = _vetor(rows, "margem")
+    perdas = _vetor(rows, "perda")
+    if "margem" in ajuste:
+        margens = np.full(len(rows), ajuste["margem"])
+    if "perda" in ajuste:
+        perdas = np.full(len(rows), ajuste["perda"])
+    margens = margens + ajuste.get("margem_delta", 0)
+    perdas = perdas + ajuste.get("perda_delta", 0)
+    if (margens < 0).any() or (perdas < 0).any():
+        raise ValueError("Ajuste deixaria margem ou perda negativa")
+    return custos, margens, perdas, calcular_precos(custos, margens, perdas)
+
+
+def reprecificar(tabela, filtros=None, ajuste=None, simular=False):
+    """
+    Retorna {"alterados": [...diff...], "total": n filtrados, "gravados": n}.
+    Com simular=True só calcula o diff, sem gravar.
+    """
+    if tabela not in TABELAS:
+        raise ValueError(f"Tabela inválida. Use: {', '.join(TABELAS)}")
+    rows = db.select(tabela, _filtros(tabela, filtros))
+    if not rows:
+        return {"alterados": [], "total": 0, "gravados": 0}
+
+    novos = dict(zip(CAMPOS, aplicar_ajuste(rows, ajuste)))
+    # mudou = diferente em centavos; campo que não mudou fica como está no banco
+    mudou_campo = {
+        campo: np.round(novos[campo], 2) != np.round(_vetor(rows, campo), 2)
+        for campo in CAMPOS
+    }
+    mudou = np.logical_or.reduce([mudou_campo[campo] for campo in CAMPOS])
+
+    alterados, payload = [], []
+    listas = {campo: novos[campo].tolist() for campo in CAMPOS}
+    for i in np.flatnonzero(mudou).tolist():
+        row = rows[i]
+        depois = {
+            campo: round(listas[campo][i], 2) if mudou_campo[campo][i] else row.get(campo)
+            for campo in CAMPOS
+        }
+        alterados.append({
+            "id": row.get("id"),
+            "nome": row.get(TABELAS[tabela]),
+            **{campo: [row.get(campo), depois[campo]] for campo in CAMPOS}
+        })
+        # linha completa: o upsert não pode cair no insert com colunas faltando
+        payload.append({**row, **depois})
+
+    if payload and not simular:
+        db.upsert(tabela, payload, on_conflict="id")
+        catalogo.invalidar(tabela)
+
+    return {
+        "alterados": alterados,
+        "total": len(rows),
+        "gravados": 0 if simular else len(payload)
+    }
+
+# =====================
+# CLI
+# =====================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reprecificação em lote do catálogo")
+    parser.add_argument("tabela", choices=list(TABELAS))
+    parser.add_argument("--ids", help="ids separados por vírgula")
+    parser.add_argument("--busca", help="trecho do nome/tipo")
+    parser.add_argument("--tipologia")
+    parser.add_argument("--espessura")
+    parser.add_argument("--tipo-medida", dest="tipo_medida")
+    for ajuste in AJUSTES:
+        parser.add_argument("--" + ajuste.replace("_", "-"), dest=ajuste, type=float)
+    parser.add_argument("--simular", action="store_true", help="só mostra o diff, não grava")
+    args = vars(parser.parse_args(argv))
+
+    filtros = {k: args[k] for k in ("busca", "tipologia", "espessura", "tipo_medida")}
+    filtros["ids"] = args["ids"].split(",") if args["ids"] else None
+    resultado = reprecificar(args["tabela"], filtros, {k: args[k] for k in AJUSTES}, args["simular"])
+
+    for item in resultado["alterados"]:
+        antes, depois = item["preco"]
+        print(f"{item['id']:>6}  {str(item['nome'])[:40]:<40}  R$ {float(antes or 0):>10.2f} -> R$ {float(depois or 0):>10.2f}")
+    fim = "simulação, nada gravado" if args["simular"] else f"{resultado['gravados']} gravados"
+    print(f"{len(resultado['alterados'])} de {resultado['total']} alterados ({fim})", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
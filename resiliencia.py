@@ -0,0 +1,183 @@
+import os
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import requests
+
+# =====================
+# ERROS
+# =====================
+
+class CircuitoAberto(requests.ConnectionError):
+    """Serviço externo marcado como fora do ar: falha na hora, sem tentar a rede."""
+
+# =====================
+# CIRCUIT BREAKER
+# =====================
+
+class Disjuntor:
+    """
+    fechado -> (N falhas seguidas) -> aberto -> (espera) -> meio-aberto
+    No meio-aberto passa uma chamada de teste: sucesso fecha, falha reabre.
+    """
+
+    def __init__(self, nome, falhas_para_abrir=5, segundos_aberto=30):
+        self.nome = nome
+        self.falhas_para_abrir = falhas_para_abrir
+        self.segundos_aberto = segundos_aberto
+        self._falhas = 0
+        self._aberto_ate = 0.0
+        self._testando = False
+        self._lock = threading.Lock()
+
+    @property
+    def estado(self):
+        if self._falhas < self.falhas_para_abrir:
+            return "fechado"
+        return "aberto" if time.monotonic() < self._aberto_ate else "meio-aberto"
+
+    def permitir(self):
+        with self._lock:
+            estado = self.estado
+            if estado == "fechado":
+                return
+            if estado == "meio-aberto" and not self._testando:
+                self._testando = True
+                return
+        raise CircuitoAberto(f"{self.nome} indisponível (circuito aberto)")
+
+    def sucesso(self):
+        with self._lock:
+            self._falhas = 0
+            self._testando = False
+
+    def liberar(self):
+        """Erro que não diz nada do serviço (bug local): só libera o teste do meio-aberto."""
+        with self._lock:
+            self._testando = False
+
+    def falha(self):
+        with self._lock:
+            self._falhas += 1
+            self._testando = False
+            if self._falhas >= self.falhas_para_abrir:
+                self._aberto_ate = time.monotonic() + self.segundos_aberto
+
+# =====================
+# POLÍTICA POR SERVIÇO
+# =====================
+
+STATUS_TRANSITORIOS = {502, 503, 504}
+METODOS_IDEMPOTENTES = {"GET", "HEAD", "OPTIONS"}
+
+_hedge_pool = ThreadPoolExecutor(max_workers=int(os.getenv("HEDGE_THREADS", "8")))
+
+
+class Politica:
+    """
+    Timeouts, retentativas com backoff + jitter (só idempotentes, por padrão),
+    disjuntor e, opcionalmente, hedging de GETs (dispara uma 2ª cópia se a 1ª
+    demorar mais que hedge_segundos e fica com a que responder primeiro).
+    prazo_total limita a chamada inteira (tentativas + esperas): cada tentativa
+    recebe no máximo o tempo que sobra.
+    """
+
+    def __init__(self, nome, timeout=(3, 15), tentativas=3, backoff=0.2,
+                 falhas_para_abrir=5, segundos_aberto=30, hedge_segundos=None, prazo_total=None):
+        self.nome = nome
+        self.timeout = timeout
+        self.tentativas = tentativas
+        self.backoff = backoff
+        self.hedge_segundos = hedge_segundos
+        self.prazo_total = prazo_total
+        self.disjuntor = Disjuntor(nome, falhas_para_abrir, segundos_aberto)
+
+    def _timeout_ate(self, fim):
+        conectar, ler = self.timeout if isinstance(self.timeout, tuple) else (self.timeout, self.timeout)
+        if fim is None:
+            return conectar, ler
+        restante = max(fim - time.monotonic(), 0.001)
+        return min(conectar, restante), min(ler, restante)
+
+    def executar(self, metodo, chamada, idempotente=None):
+        """
+        chamada(timeout) -> requests.Response. Status >= 400 que não seja
+        transitório volta como está (quem chama decide com raise_for_status).
+        Todo resultado passa pelo disjuntor antes de sair daqui, inclusive
+        exceções inesperadas (senão o teste do meio-aberto ficaria preso).
+        """
+        if idempotente is None:
+            idempotente = metodo.upper() in METODOS_IDEMPOTENTES
+        tentativas = self.tentativas if idempotente else 1
+        fim = time.monotonic() + self.prazo_total if self.prazo_total else None
+
+        for tentativa in range(1, tentativas + 1):
+            espera = self.backoff * 2 ** (tentativa - 1) * random.uniform(0.5, 1.5)
+            self.disjuntor.permitir()
+            timeout = self._timeout_ate(fim)
+            try:
+                if self.hedge_segundos and metodo.upper() == "GET":
+                    r = self._com_hedge(chamada, timeout)
+                else:
+                    r = chamada(timeout)
+            except requests.RequestException:
+                self.disjuntor.falha()
+                if self._ultima(tentativa, tentativas, espera, fim):
+                    raise
+            except BaseException:
+                self.disjuntor.liberar()
+                raise
+            else:
+                if r.status_code not in STATUS_TRANSITORIOS:
+                    self.disjuntor.sucesso()
+                    return r
+                self.disjuntor.falha()
+                if self._ultima(tentativa, tentativas, espera, fim):
+                    return r
+            time.sleep(espera)
+
+    @staticmethod
+    def _ultima(tentativa, tentativas, espera, fim):
+        """Acabaram as tentativas ou não dá tempo de esperar e tentar de novo."""
+        return tentativa == tentativas or (fim is not None and time.monotonic() + espera >= fim)
+
+    def _com_hedge(self, chamada, timeout):
+        primeira = _hedge_pool.submit(chamada, timeout)
+        feitos, _ = wait([primeira], timeout=self.hedge_segundos)
+        if feitos:
+            return primeira.result()
+        segunda = _hedge_pool.submit(chamada, timeout)
+        pendentes = {primeira, segunda}
+        erro = None
+        while pendentes:
+            feitos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+            for f in feitos:
+                try:
+                    return f.result()
+                except requests.RequestException as e:
+                    erro = e
+        raise erro
+
+
+def _hedge_env(nome):
+    valor = os.getenv(nome)
+    return float(valor) if valor else None
+
+
+POLITICAS = {
+    "supabase": Politica(
+        "supabase",
+        timeout=(float(os.getenv("SUPABASE_CONNECT_TIMEOUT", "3")), float(os.getenv("SUPABASE_READ_TIMEOUT", "15"))),
+        tentativas=int(os.getenv("SUPABASE_TENTATIVAS", "3")),
+        hedge_segundos=_hedge_env("SUPABASE_HEDGE_SEGUNDOS"),
+        # sem isso o pior caso seria 3 × (connect + read) + backoff ≈ 55 s
+        prazo_total=float(os.getenv("SUPABASE_PRAZO_TOTAL", "20"))
+    ),
+    # a fila do WhatsApp já tem retentativa própria
+    "whatsapp": Politica("whatsapp", timeout=(3, 10), tentativas=1),
+}
+
+
+def politica(nome):
+    return POLITICAS[nome]
@@ -0,0 +1,129 @@
+import os
+import time
+import fcntl
+import hashlib
+import threading
+
+# =====================
+# CONFIG
+# =====================
+
+# Se definido, leituras idênticas também são combinadas entre workers do gunicorn
+SINGLEFLIGHT_DIR = os.getenv("SINGLEFLIGHT_DIR")
+
+# Resultados gravados lá só servem para quem esperava a chamada em voo:
+# arquivos mais velhos que isso são apagados (varredura a cada TTL/2)
+SINGLEFLIGHT_TTL = float(os.getenv("SINGLEFLIGHT_TTL", "60"))
+
+# =====================
+# NO PROCESSO
+# =====================
+
+class _Chamada:
+    def __init__(self):
+        self.inicio = time.time()
+        self.pronto = threading.Event()
+        self.resultado = None
+        self.erro = None
+
+
+class SingleFlight:
+    """
+    Chamadas concorrentes com a mesma chave compartilham uma única execução:
+    a primeira vai à rede, as outras esperam e recebem o mesmo resultado (ou erro).
+    O resultado deve ser imutável (bytes), cada um faz o próprio parse.
+
+    desde (time.time()): só aproveita chamada que começou depois desse instante.
+    Quem acabou de escrever passa o fim da escrita e não recebe uma leitura
+    que saiu antes dela.
+    """
+
+    def __init__(self, diretorio=SINGLEFLIGHT_DIR):
+        self.diretorio = diretorio
+        self._lock = threading.Lock()
+        self._em_voo = {}
+        self.combinadas = 0
+        self._varrido_em = 0.0
+
+    def executar(self, chave, fn, desde=0.0):
+        with self._lock:
+            chamada = self._em_voo.get(chave)
+            lider = chamada is None or chamada.inicio < desde
+            if lider:
+                chamada = self._em_voo[chave] = _Chamada()
+            else:
+                self.combinadas += 1
+
+        if not lider:
+            chamada.pronto.wait()
+            if chamada.erro is not None:
+                raise chamada.erro
+            return chamada.resultado
+
+        try:
+            chamada.resultado = self._entre_workers(chave, fn, desde) if self.diretorio else fn()
+            return chamada.resultado
+        except Exception as e:
+            chamada.erro = e
+            raise
+        finally:
+            with self._lock:
+                # pode ter sido substituída por uma leitura mais nova (desde)
+                if self._em_voo.get(chave) is chamada:
+                    del self._em_voo[chave]
+            chamada.pronto.set()
+
+    # ---------- entre workers (arquivo + flock) ----------
+
+    def _entre_workers(self, chave, fn, desde):
+        """
+        Um worker por vez executa a chave; quem esperou no lock reaproveita o
+        resultado gravado depois que ele chegou (chamada que já estava em voo),
+        se essa chamada começou depois de desde. O início vai na 1ª linha do .res.
+        """
+        os.makedirs(self.diretorio, exist_ok=True)
+        base = os.path.join(self.diretorio, hashlib.sha1(chave.encode()).hexdigest())
+        inicio = time.time()
+        try:
+            with open(base + ".lock", "w") as trava:
+                # espera sem bloquear o processo inteiro (importante com workers gevent)
+                while True:
+                    try:
+                        fcntl.flock(trava, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        break
+                    except BlockingIOError:
+                        time.sleep(0.005)
+                try:
+                    if os.path.getmtime(base + ".res") >= inicio:
+                        with open(base + ".res", "rb") as f:
+                            comecou, resultado = f.read().split(b"\n", 1)
+                        if float(comecou) >= desde:
+                            self.combinadas += 1
+                            return resultado
+                except FileNotFoundError:
+                    pass
+                comecou = time.time()
+                resultado = fn()
+                with open(base + ".tmp", "wb") as f:
+                    f.write(repr(comecou).encode() + b"\n" + resultado)
+                os.replace(base + ".tmp", base + ".res")
+                return resultado
+        finally:
+            self._varrer()
+
+    def _varrer(self):
+        """Apaga .lock/.res/.tmp parados há mais de SINGLEFLIGHT_TTL (não guarda dados à toa)."""
+        agora = time.time()
+        if agora - self._varrido_em < SINGLEFLIGHT_TTL / 2:
+            return
+        self._varrido_em = agora
+        for nome in os.listdir(self.diretorio):
+            caminho = os.path.join(self.diretorio, nome)
+            try:
+                if agora - os.path.getmtime(caminho) > SINGLEFLIGHT_TTL:
+                    os.remove(caminho)
+            except OSError:
+                pass
+
+
+singleflight = SingleFlight()
@@ -0,0 +1,5 @@
+-- Portas com id estável (gerado pela API) e hash do conteúdo,
+-- usados pelo salvamento incremental de api_portas.criar_portas.
+alter table portas alter column id set default gen_random_uuid();
+alter table portas add column if not exists hash text;
+create index if not exists portas_orcamento_uuid_idx on portas (orcamento_uuid);
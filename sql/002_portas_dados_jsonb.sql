@@ -0,0 +1,5 @@
+-- dados das portas como jsonb tipado (portas_codec v2).
+-- A coluna text[] "dados" continua sendo lida para linhas antigas até rodar:
+--     python portas_codec.py migrar
+alter table portas add column if not exists dados_json jsonb;
+alter table portas alter column dados drop not null;
@@ -0,0 +1,39 @@
+-- numero_pedido atribuído pelo banco no próprio INSERT (sem ler o último antes).
+--
+-- O código antigo (lê o máximo e soma 1) pode ter gravado números repetidos.
+-- Para conferir antes de rodar:
+--     select numero_pedido, count(*), array_agg(id order by data_criacao, id)
+--     from orcamentos group by numero_pedido having count(*) > 1;
+-- Em cada grupo repetido o orçamento mais antigo mantém o número; os outros
+-- (e os sem número) recebem números novos no fim da sequência.
+begin;
+
+-- nenhum INSERT do código antigo entre a renumeração e a constraint
+lock table orcamentos in exclusive mode;
+
+create sequence if not exists orcamentos_numero_pedido_seq owned by orcamentos.numero_pedido;
+select setval('orcamentos_numero_pedido_seq', coalesce((select max(numero_pedido) from orcamentos), 0) + 1, false);
+
+with repetidos as (
+    select id, row_number() over (partition by numero_pedido order by data_criacao, id) as ordem
+    from orcamentos
+    where numero_pedido is not null
+)
+update orcamentos o
+set numero_pedido = nextval('orcamentos_numero_pedido_seq')
+from repetidos r
+where o.id = r.id and r.ordem > 1;
+
+update orcamentos set numero_pedido = nextval('orcamentos_numero_pedido_seq') where numero_pedido is null;
+
+alter table orcamentos alter column numero_pedido set default nextval('orcamentos_numero_pedido_seq');
+
+do $$
+begin
+    if not exists (select 1 from pg_constraint where conname = 'orcamentos_numero_pedido_key') then
+        alter table orcamentos add constraint orcamentos_numero_pedido_key unique (numero_pedido);
+    end if;
+end;
+$$;
+
+commit;
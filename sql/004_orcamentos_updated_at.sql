@@ -0,0 +1,18 @@
+-- updated_at para sincronização incremental (GET /api/orcamentos?updated_since=...)
+alter table orcamentos add column if not exists updated_at timestamptz not null default now();
+-- situação usada por producao.html (filtro ?situacao=)
+alter table orcamentos add column if not exists situacao text not null default 'orcamento';
+
+create or replace function orcamentos_touch_updated_at() returns trigger as $$
+begin
+    new.updated_at = now();
+    return new;
+end;
+$$ language plpgsql;
+
+drop trigger if exists orcamentos_updated_at on orcamentos;
+create trigger orcamentos_updated_at before update on orcamentos
+    for each row execute function orcamentos_touch_updated_at();
+
+create index if not exists orcamentos_updated_at_idx on orcamentos (updated_at);
+create index if not exists orcamentos_cliente_nome_idx on orcamentos (lower(cliente_nome) text_pattern_ops);
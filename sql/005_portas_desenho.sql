@@ -0,0 +1,4 @@
+-- Hash do desenho da porta (desenho_portas.chave_spec). O SVG é gerado no
+-- servidor e guardado uma vez por desenho distinto; a coluna svg fica só
+-- para linhas antigas e é zerada quando a porta é salva de novo.
+alter table portas add column if not exists desenho text;
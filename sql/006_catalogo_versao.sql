@@ -0,0 +1,32 @@
+-- Sinal de escrita no catálogo entre processos (app, bot, workers do gunicorn).
+-- Cada insert/update/delete em perfis, vidros ou materiais incrementa a versão
+-- da tabela; catalog_cache.CatalogCache.sincronizar lê estas 3 linhas a cada
+-- CATALOGO_SINAL_SEGUNDOS e recarrega só o que mudou.
+create table if not exists catalogo_versao (
+    tabela text primary key,
+    versao bigint not null default 0,
+    alterado_em timestamptz not null default now()
+);
+
+insert into catalogo_versao (tabela) values ('perfis'), ('vidros'), ('materiais')
+on conflict (tabela) do nothing;
+
+create or replace function catalogo_versao_incrementar() returns trigger as $$
+begin
+    update catalogo_versao set versao = versao + 1, alterado_em = now()
+    where tabela = tg_table_name;
+    return null;
+end;
+$$ language plpgsql;
+
+drop trigger if exists perfis_catalogo_versao on perfis;
+create trigger perfis_catalogo_versao after insert or update or delete on perfis
+    for each statement execute function catalogo_versao_incrementar();
+
+drop trigger if exists vidros_catalogo_versao on vidros;
+create trigger vidros_catalogo_versao after insert or update or delete on vidros
+    for each statement execute function catalogo_versao_incrementar();
+
+drop trigger if exists materiais_catalogo_versao on materiais;
+create trigger materiais_catalogo_versao after insert or update or delete on materiais
+    for each statement execute function catalogo_versao_incrementar();
@@ -0,0 +1,6 @@
+-- GET /api/orcamentos?cliente= filtra com cliente_nome=ilike.<prefixo>*.
+-- O índice lower(cliente_nome) text_pattern_ops de sql/004 não serve para
+-- ilike; trigram (pg_trgm) serve para ilike com prefixo ou trecho.
+create extension if not exists pg_trgm;
+drop index if exists orcamentos_cliente_nome_idx;
+create index if not exists orcamentos_cliente_nome_trgm_idx on orcamentos using gin (cliente_nome gin_trgm_ops);
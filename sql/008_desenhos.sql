@@ -0,0 +1,8 @@
+-- Especificação de cada desenho distinto, pela hash (desenho_portas.chave_spec).
+-- portas.desenho aponta para cá. O SVG não é guardado: é re-desenhado da spec
+-- quando falta no cache do processo/disco (restart, deploy, outra instância).
+create table if not exists desenhos (
+    chave text primary key,
+    spec jsonb not null,
+    criado_em timestamptz not null default now()
+);
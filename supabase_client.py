@@ -0,0 +1,141 @@
+import os
+import time
+import json as _json
+import contextvars
+import requests
+from requests.adapters import HTTPAdapter
+from metricas import registrar_upstream
+from resiliencia import politica
+from singleflight import singleflight
+
+# =====================
+# CONFIG SUPABASE (ÚNICA)
+# =====================
+
+SUPABASE_URL = os.getenv("SUPABASE_URL")
+SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+
+if not SUPABASE_URL or not SUPABASE_KEY:
+    raise RuntimeError("SUPABASE_URL ou SUPABASE_KEY não definidos")
+
+HEADERS = {
+    "apikey": SUPABASE_KEY,
+    "Authorization": f"Bearer {SUPABASE_KEY}",
+    "Content-Type": "application/json"
+}
+
+# Conexões mantidas abertas por worker do gunicorn (1 por thread basta)
+POOL_SIZE = int(os.getenv("SUPABASE_POOL_SIZE", os.getenv("GUNICORN_THREADS", "4")))
+
+# Timeouts, retentativas e circuit breaker: resiliencia.POLITICAS["supabase"]
+POLITICA = politica("supabase")
+
+# Fim da última escrita feita neste contexto (requisição/thread/greenlet):
+# leituras depois dela não aproveitam GET em voo que saiu antes
+_ultima_escrita = contextvars.ContextVar("supabase_ultima_escrita", default=0.0)
+
+# =====================
+# SESSÃO (KEEP-ALIVE)
+# =====================
+
+_session = None
+_session_pid = None
+
+
+def get_session():
+    """
+    Sessão HTTP com pool de conexões keep-alive.
+    Criada por processo: depois do fork do gunicorn cada worker abre a sua.
+    """
+    global _session, _session_pid
+    if _session is None or _session_pid != os.getpid():
+        s = requests.Session()
+        s.headers.update(HEADERS)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+        s.mount("https://", adapter)
+        s.mount("http://", adapter)
+        _session = s
+        _session_pid = os.getpid()
+    return _session
+
+
+def _url(tabela):
+    return f"{SUPABASE_URL}/rest/v1/{tabela}"
+
+
+def request(method, tabela, params=None, json=None, prefer=None, timeout=None, idempotente=None):
+    """
+    Chamada crua ao PostgREST. Levanta requests.HTTPError se status >= 400
+    e resiliencia.CircuitoAberto se o Supabase estiver marcado como fora.
+    Só repete a chamada se for idempotente (padrão: GET).
+    """
+    headers = {"Prefer": prefer} if prefer else None
+    t0 = time.perf_counter()
+    status = None
+    try:
+        r = POLITICA.executar(
+            method,
+            lambda timeout_padrao: get_session().request(
+                method,
+                _url(tabela),
+                params=params,
+                json=json,
+                headers=headers,
+                timeout=timeout or timeout_padrao
+            ),
+            idempotente=idempotente
+        )
+        status = r.status_code
+    finally:
+        registrar_upstream("supabase", time.perf_counter() - t0, status)
+        if method != "GET":
+            # mesmo com erro/timeout a escrita pode ter sido aplicada
+            _ultima_escrita.set(time.time())
+    r.raise_for_status()
+    return r
+
+# =====================
+# API
+# =====================
+
+def select(tabela: str, params: dict | None = None) -> list[dict]:
+    """
+    GET /rest/v1/<tabela>
+    params no formato do PostgREST, ex: {"select": "*", "order": "nome.asc", "id": "eq.10"}
+    """
+    params = {"select": "*", **(params or {})}
+    # GETs idênticos simultâneos viram uma só chamada ao Supabase
+    # (menos os que saíram antes de uma escrita nossa: read-your-writes)
+    chave = f"{tabela}?{sorted(params.items())}"
+    corpo = singleflight.executar(chave, lambda: request("GET", tabela, params=params).content,
+                                  desde=_ultima_escrita.get())
+    return _json.loads(corpo)
+
+
+def insert(tabela: str, rows: dict | list[dict], retornar: bool = False) -> list[dict]:
+    """POST /rest/v1/<tabela>. Com retornar=True devolve as linhas criadas."""
+    prefer = "return=representation" if retornar else "return=minimal"
+    r = request("POST", tabela, json=rows, prefer=prefer)
+    return r.json() if retornar else []
+
+
+def update(tabela: str, filtros: dict, dados: dict, retornar: bool = False) -> list[dict]:
+    """PATCH /rest/v1/<tabela>?<filtros>"""
+    prefer = "return=representation" if retornar else "return=minimal"
+    r = request("PATCH", tabela, params=filtros, json=dados, prefer=prefer)
+    return r.json() if retornar else []
+
+
+def delete(tabela: str, filtros: dict) -> None:
+    """DELETE /rest/v1/<tabela>?<filtros>"""
+    request("DELETE", tabela, params=filtros, idempotente=True)
+
+
+def upsert(tabela: str, rows: dict | list[dict], on_conflict: str | None = None,
+           retornar: bool = False) -> list[dict]:
+    """POST com merge-duplicates (insere ou atualiza pela chave de conflito)."""
+    prefer = "resolution=merge-duplicates," + ("return=representation" if retornar else "return=minimal")
+    params = {"on_conflict": on_conflict} if on_conflict else None
+    # upsert pela chave é idempotente: pode repetir com segurança
+    r = request("POST", tabela, params=params, json=rows, prefer=prefer, idempotente=True)
+    return r.json() if retornar else []
@@ -0,0 +1,59 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stubs import PostgrestStub, GraphStub
+
+# Os módulos leem a configuração no import: o stub sobe antes de tudo
+_postgrest = PostgrestStub()
+_temporario = tempfile.mkdtemp(prefix="colorglass_testes_")
+os.environ["SUPABASE_URL"] = _postgrest.url
+os.environ["SUPABASE_KEY"] = "teste"
+os.environ.setdefault("ADMIN_TOKEN", "admin-teste")
+os.environ["WHATSAPP_SPOOL_DIR"] = os.path.join(_temporario, "whatsapp")
+os.environ["DESENHO_CACHE_DIR"] = os.path.join(_temporario, "desenhos")
+os.environ["PROFILE_DIR"] = os.path.join(_temporario, "profiles")
+os.environ.pop("SINGLEFLIGHT_DIR", None)
+
+
+def _fechar_disjuntores():
+    from resiliencia import POLITICAS
+    for p in POLITICAS.values():
+        p.disjuntor.sucesso()
+
+
+@pytest.fixture
+def pg():
+    """Supabase falso, vazio e sem falhas, com catálogo e disjuntores zerados."""
+    from catalog_cache import catalogo
+
+    _postgrest.limpar()
+    catalogo._entradas.clear()
+    catalogo._ultima_boa.clear()
+    catalogo._versoes.clear()
+    # sem catalogo_versao em segundo plano disputando as falhas injetadas no stub
+    catalogo._sinal_ativo = False
+    catalogo._sinal_em = 0.0
+    _fechar_disjuntores()
+    yield _postgrest
+    _postgrest.limpar()
+
+
+@pytest.fixture
+def graph():
+    stub = GraphStub()
+    _fechar_disjuntores()
+    yield stub
+    stub.fechar()
+
+
+@pytest.fixture
+def cliente(pg):
+    from app import app
+    app.config["TESTING"] = True
+    return app.test_client()
@@ -0,0 +1,322 @@
+"""
+Servidores HTTP de teste (em thread) com falhas programáveis.
+
+- PostgrestStub: tabelas em memória com o subconjunto do PostgREST que o
+  supabase_client usa (filtros eq/neq/gt/gte/lt/lte/in/like/ilike/is/cs,
+  and=(...)/or=(...) aninhados, select com alias, order, limit, upsert com merge-duplicates).
+- GraphStub: registra cada mensagem enviada para a Graph API do WhatsApp.
+
+Falhas: stub.falhar(503, "derrubar", ("atraso", 0.5), "truncar", "gzip_invalido")
+vale uma ação por requisição, na ordem.
+"""
+import re
+import json
+import time
+import uuid
+import threading
+import itertools
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qsl
+
+# =====================
+# BASE
+# =====================
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _tratar(self, metodo):
+        stub = self.server.stub
+        url = urlparse(self.path)
+        tamanho = int(self.headers.get("Content-Length") or 0)
+        corpo = json.loads(self.rfile.read(tamanho)) if tamanho else None
+        stub.chamadas.append((metodo, url.path, parse_qsl(url.query), corpo))
+
+        acao = stub._proxima_falha()
+        if isinstance(acao, tuple) and acao[0] == "atraso":
+            time.sleep(acao[1])
+        elif acao == "derrubar":
+            self.close_connection = True
+            self.connection.close()
+            return
+        elif acao == "truncar":
+            # promete 100 bytes e entrega 2: IncompleteRead no cliente
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", "100")
+            self.end_headers()
+            self.wfile.write(b"[]")
+            self.close_connection = True
+            return
+        elif acao == "gzip_invalido":
+            self._enviar(200, b"isto nao e gzip", {"Content-Encoding": "gzip"})
+            return
+        elif isinstance(acao, int):
+            self._enviar(acao, json.dumps({"message": f"falha injetada {acao}"}).encode())
+            return
+
+        with stub.lock:
+            status, resposta = stub.responder(metodo, url.path, parse_qsl(url.query), corpo, self.headers)
+        self._enviar(status, b"" if resposta is None else json.dumps(resposta, default=str).encode())
+
+    def _enviar(self, status, corpo, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def do_GET(self):
+        self._tratar("GET")
+
+    def do_POST(self):
+        self._tratar("POST")
+
+    def do_PATCH(self):
+        self._tratar("PATCH")
+
+    def do_DELETE(self):
+        self._tratar("DELETE")
+
+
+class ServidorStub:
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.chamadas = []
+        self._falhas = []
+        self._servidor = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._servidor.daemon_threads = True
+        self._servidor.stub = self
+        threading.Thread(target=self._servidor.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._servidor.server_port}"
+
+    def falhar(self, *acoes):
+        with self.lock:
+            self._falhas.extend(acoes)
+
+    def _proxima_falha(self):
+        with self.lock:
+            return self._falhas.pop(0) if self._falhas else None
+
+    def limpar(self):
+        with self.lock:
+            self.chamadas.clear()
+            self._falhas.clear()
+
+    def responder(self, metodo, caminho, query, corpo, headers):
+        return 200, {}
+
+    def fechar(self):
+        self._servidor.shutdown()
+
+# =====================
+# POSTGREST
+# =====================
+
+def _valor(texto):
+    texto = texto.strip()
+    if len(texto) >= 2 and texto[0] == texto[-1] == '"':
+        return texto[1:-1]
+    return texto
+
+
+def _comparavel(a, b):
+    try:
+        return float(a), float(b)
+    except (TypeError, ValueError):
+        return str(a), str(b)
+
+
+def _casa(row, coluna, expressao):
+    op, _, alvo = expressao.partition(".")
+    if op == "not":
+        return not _casa(row, coluna, alvo)
+    valor = row.get(coluna)
+    if op == "is":
+        return (valor is None) == (alvo == "null")
+    if op in ("eq", "neq"):
+        a, b = _comparavel(valor, _valor(alvo))
+        igual = valor is not None and a == b
+        return igual if op == "eq" else not igual
+    if op in ("gt", "gte", "lt", "lte"):
+        if valor is None:
+            return False
+        a, b = _comparavel(valor, _valor(alvo))
+        return {"gt": a > b, "gte": a >= b, "lt": a < b, "lte": a <= b}[op]
+    if op == "in":
+        return str(valor) in [_valor(v) for v in alvo.strip("()").split(",")]
+    if op in ("like", "ilike"):
+        padrao = "^" + re.escape(alvo).replace(r"\*", ".*") + "$"
+        return re.match(padrao, str(valor or ""), re.I if op == "ilike" else 0) is not None
+    if op == "cs":
+        return set(_valor(v) for v in alvo.strip("{}").split(",")) <= set(map(str, valor or []))
+    raise ValueError(f"operador não suportado no stub: {op}")
+
+
+def _partes(texto):
+    """Divide "a,b(c,d),e" nas vírgulas de fora dos parênteses e aspas."""
+    partes, atual, nivel, aspas = [], "", 0, False
+    for c in texto:
+        if c == '"':
+            aspas = not aspas
+        elif not aspas and c == "(":
+            nivel += 1
+        elif not aspas and c == ")":
+            nivel -= 1
+        elif not aspas and nivel == 0 and c == ",":
+            partes.append(atual)
+            atual = ""
+            continue
+        atual += c
+    return partes + [atual]
+
+
+def _logico(row, operador, expressao):
+    """and=(...) / or=(...) com and(...)/or(...) aninhados."""
+    resultados = []
+    for parte in _partes(expressao.strip()[1:-1]):
+        m = re.fullmatch(r"(not\.)?(and|or)(\(.*\))", parte.strip())
+        if m:
+            r = _logico(row, m.group(2), m.group(3))
+            resultados.append(not r if m.group(1) else r)
+        else:
+            coluna, _, resto = parte.strip().partition(".")
+            resultados.append(_casa(row, coluna, resto))
+    return all(resultados) if operador == "and" else any(resultados)
+
+
+RESERVADOS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+
+class PostgrestStub(ServidorStub):
+    """
+    tabelas: {"perfis": [...]} ; tabela ausente dá 404, como no PostgREST.
+    Ids novos são inteiros sequenciais (portas/orcamentos recebem uuid).
+    padroes: {"tabela": {"coluna": fn()}} valores default no insert.
+    """
+
+    UUID = {"portas", "orcamentos"}
+    TABELAS = ("perfis", "vidros", "materiais", "orcamentos", "portas", "desenhos")
+
+    def __init__(self):
+        super().__init__()
+        self._ids = itertools.count(1)
+        self.limpar()
+
+    def limpar(self):
+        super().limpar()
+        with self.lock:
+            self.tabelas = {t: [] for t in self.TABELAS}
+            self.padroes = {}
+
+    def responder(self, metodo, caminho, query, corpo, headers):
+        m = re.fullmatch(r"/rest/v1/(\w+)", caminho)
+        if not m or m.group(1) not in self.tabelas:
+            return 404, {"code": "PGRST205", "message": "tabela não encontrada"}
+        tabela = self.tabelas[m.group(1)]
+        params = dict(query)
+        prefer = headers.get("Prefer") or ""
+        representacao = "return=representation" in prefer
+
+        if metodo == "GET":
+            return 200, self._projetar(self._ordenar(self._filtrar(tabela, query), params), params)
+        if metodo == "DELETE":
+            manter = self._filtrar(tabela, query, negar=True)
+            tabela[:] = manter
+            return 204, None
+        if metodo == "PATCH":
+            alteradas = self._filtrar(tabela, query)
+            for row in alteradas:
+                row.update(corpo)
+            return 200, ([dict(r) for r in alteradas] if representacao else None)
+        if metodo == "POST":
+            linhas = corpo if isinstance(corpo, list) else [corpo]
+            if len({tuple(sorted(r)) for r in linhas}) > 1:
+                return 400, {"message": "All object keys must match"}
+            conflito = params.get("on_conflict", "id")
+            saida = []
+            for nova in linhas:
+                nova = dict(nova)
+                existente = None
+                if "merge-duplicates" in prefer and nova.get(conflito) is not None:
+                    existente = next((r for r in tabela if str(r.get(conflito)) == str(nova[conflito])), None)
+                if existente is not None:
+                    existente.update(nova)
+                    saida.append(dict(existente))
+                    continue
+                for coluna, padrao in self.padroes.get(m.group(1), {}).items():
+                    nova.setdefault(coluna, padrao())
+                if "id" not in nova:
+                    nova["id"] = str(uuid.uuid4()) if m.group(1) in self.UUID else next(self._ids)
+                elif any(str(r.get("id")) == str(nova["id"]) for r in tabela):
+                    return 409, {"message": "duplicate key value violates unique constraint"}
+                tabela.append(nova)
+                saida.append(dict(nova))
+            return 201, (saida if representacao else None)
+        return 405, {"message": "método não suportado"}
+
+    def _filtrar(self, tabela, query, negar=False):
+        filtros = [(k, v) for k, v in query if k not in RESERVADOS]
+
+        def ok(row):
+            for coluna, expressao in filtros:
+                casou = _logico(row, coluna, expressao) if coluna in ("and", "or") else _casa(row, coluna, expressao)
+                if not casou:
+                    return False
+            return True
+
+        return [r for r in tabela if ok(r) != negar]
+
+    def _ordenar(self, rows, params):
+        for ordem in reversed((params.get("order") or "").split(",")):
+            if not ordem:
+                continue
+            coluna, _, direcao = ordem.partition(".")
+            rows = sorted(rows, key=lambda r: (r.get(coluna) is None, _chave_ordem(r.get(coluna))),
+                          reverse=direcao.startswith("desc"))
+        if "offset" in params:
+            rows = rows[int(params["offset"]):]
+        if "limit" in params:
+            rows = rows[:int(params["limit"])]
+        return rows
+
+    def _projetar(self, rows, params):
+        select = params.get("select", "*")
+        if select == "*":
+            return [dict(r) for r in rows]
+        colunas = [c.split(":") for c in select.split(",")]
+        return [{c[0]: r.get(c[-1]) for c in colunas} for r in rows]
+
+
+def _chave_ordem(valor):
+    return (0, valor, "") if isinstance(valor, (int, float)) else (1, 0, str(valor))
+
+# =====================
+# GRAPH API (WHATSAPP)
+# =====================
+
+class GraphStub(ServidorStub):
+    """Guarda (numero, texto) de cada mensagem aceita, na ordem de chegada."""
+
+    def __init__(self):
+        super().__init__()
+        self.entregues = []
+
+    def limpar(self):
+        super().limpar()
+        with self.lock:
+            self.entregues = []
+
+    def responder(self, metodo, caminho, query, corpo, headers):
+        if metodo != "POST":
+            return 200, {}
+        self.entregues.append((corpo["to"], corpo["text"]["body"]))
+        return 200, {"messages": [{"id": f"wamid.{len(self.entregues)}"}]}
@@ -0,0 +1,51 @@
+import time
+
+import pytest
+
+from desenho_portas import desenhos
+
+
+@pytest.fixture
+def catalogo_bot(pg, monkeypatch, tmp_path):
+    pg.tabelas["perfis"] = [{"id": 1, "nome": "2215", "preco": 10.0}]
+    pg.tabelas["vidros"] = [{"id": 3, "tipo": "Reflecta", "preco": 100.0}]
+    # processo novo: nenhum desenho em cache
+    monkeypatch.setattr(desenhos, "_lru", type(desenhos._lru)())
+    monkeypatch.setattr(desenhos, "diretorio", str(tmp_path))
+    return pg
+
+
+def _aguardar(condicao, segundos=5):
+    fim = time.monotonic() + segundos
+    while not condicao() and time.monotonic() < fim:
+        time.sleep(0.01)
+    return condicao()
+
+
+def _upserts_de_desenho(pg):
+    return [c for c in pg.chamadas if c[0] == "POST" and c[1] == "/rest/v1/desenhos"]
+
+
+def test_desenho_novo_vai_ao_banco_so_uma_vez(cliente, catalogo_bot):
+    mensagem = {"mensagem": "porta 80x210 perfil 2215 vidro reflecta"}
+    r = cliente.post("/api/bot", json=mensagem).json
+    chave = r["desenho"].rsplit("/", 1)[1].removesuffix(".svg")
+    assert "R$" in r["resposta"]
+    assert _aguardar(lambda: catalogo_bot.tabelas["desenhos"])
+    assert [d["chave"] for d in catalogo_bot.tabelas["desenhos"]] == [chave]
+
+    # mesma porta de novo: desenho já no cache local, nenhuma escrita
+    assert cliente.post("/api/bot", json=mensagem).json["desenho"] == r["desenho"]
+    time.sleep(0.05)
+    assert len(_upserts_de_desenho(catalogo_bot)) == 1
+
+
+def test_resposta_nao_espera_gravar_o_desenho(cliente, catalogo_bot):
+    cliente.get("/api/perfis")
+    cliente.get("/api/vidros")  # catálogo quente: a próxima chamada ao banco é o upsert
+    catalogo_bot.falhar(("atraso", 1.0))
+    inicio = time.monotonic()
+    r = cliente.post("/api/bot", json={"mensagem": "porta 90x210 perfil 2215 vidro reflecta"})
+    assert r.status_code == 200 and r.json["desenho"]
+    assert time.monotonic() - inicio < 0.5
+    assert _aguardar(lambda: catalogo_bot.tabelas["desenhos"])
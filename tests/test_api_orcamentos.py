@@ -0,0 +1,64 @@
+import pytest
+
+
+def _orcamentos(n):
+    return [{
+        "id": f"o{i}", "numero_pedido": i, "cliente_nome": f"Cliente {i}", "data_criacao": f"2024-01-{i:02d}",
+        "quantidade_total": 0, "valor_total": 0, "situacao": "orcamento", "updated_at": f"2024-02-{i:02d}T00:00:00+00:00"
+    } for i in range(1, n + 1)]
+
+
+def test_pagina_por_cursor_ate_o_fim(cliente, pg):
+    pg.tabelas["orcamentos"] = _orcamentos(5)
+    vistos, cursor = [], None
+    for _ in range(5):
+        r = cliente.get("/api/orcamentos", query_string={"limit": 2, **({"cursor": cursor} if cursor else {})}).json
+        vistos += [o["numero_pedido"] for o in r["orcamentos"]]
+        cursor = r["next_cursor"]
+        if cursor is None:
+            break
+    assert vistos == [1, 2, 3, 4, 5]
+
+
+@pytest.mark.parametrize("limite", ["0", "-5", "abc"])
+def test_limit_invalido_da_400(cliente, pg, limite):
+    pg.tabelas["orcamentos"] = _orcamentos(3)
+    resp = cliente.get(f"/api/orcamentos?limit={limite}")
+    assert resp.status_code == 400
+    assert pg.chamadas == []
+
+
+def test_limit_acima_do_maximo_e_limitado(cliente, pg):
+    cliente.get("/api/orcamentos?limit=100000")
+    assert dict(pg.chamadas[0][2])["limit"] == "501"
+
+
+def test_filtros_cliente_e_updated_since(cliente, pg):
+    pg.tabelas["orcamentos"] = _orcamentos(5)
+    r = cliente.get("/api/orcamentos?cliente=cliente 4").json
+    assert [o["numero_pedido"] for o in r["orcamentos"]] == [4]
+    r = cliente.get("/api/orcamentos?updated_since=2024-02-03T00:00:00%2B00:00").json
+    assert [o["numero_pedido"] for o in r["orcamentos"]] == [4, 5]
+
+
+def test_filtro_por_intervalo_de_datas(cliente, pg):
+    pg.tabelas["orcamentos"] = _orcamentos(5)
+    r = cliente.get("/api/orcamentos?data_inicio=2024-01-02&data_fim=2024-01-04").json
+    assert [o["numero_pedido"] for o in r["orcamentos"]] == [2, 3, 4]
+
+
+@pytest.mark.parametrize("parametro", [
+    "data_inicio=2024-13-01", "data_fim=ontem", 'data_fim=2024-01-01",numero_pedido.gt.0',
+    "updated_since=2024-02-30T00:00:00",
+])
+def test_data_invalida_da_400_sem_ir_ao_banco(cliente, pg, parametro):
+    resp = cliente.get(f"/api/orcamentos?{parametro}")
+    assert resp.status_code == 400
+    assert parametro.split("=")[0] in resp.json["error"]
+    assert pg.chamadas == []
+
+
+def test_cliente_e_prefixo_literal(cliente, pg):
+    pg.tabelas["orcamentos"] = _orcamentos(3)
+    cliente.get("/api/orcamentos", query_string={"cliente": "50%_off*\\"})
+    assert dict(pg.chamadas[0][2])["cliente_nome"] == "ilike.50\\%\\_off_\\\\*"
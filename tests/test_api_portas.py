@@ -0,0 +1,77 @@
+from desenho_portas import desenhos
+
+URL = "/api/orcamento/orc-1/portas"
+
+
+def _porta(largura=800, altura=2100):
+    return {"tipo": "giro", "dados": {"largura": largura, "altura": altura, "perfil": "1"}, "quantidade": 1, "preco": 100}
+
+
+def test_salvamento_incremental_so_grava_o_que_mudou(cliente, pg):
+    r = cliente.post(URL, json={"portas": [_porta(), _porta(900)]}).json
+    assert r["success"] and len(r["portas_salvas"]) == 2
+    salvas = {p["id"]: p["hash"] for p in r["portas_salvas"]}
+
+    pg.chamadas.clear()
+    portas = [{"id": i, "hash": h} for i, h in salvas.items()]
+    r = cliente.post(URL, json={"portas": portas}).json
+    assert r["success"] and r["inalteradas"] == 2 and r["portas_salvas"] == []
+    assert [c[0] for c in pg.chamadas] == ["GET"]
+
+
+def test_referencia_a_porta_de_fora_do_orcamento_da_400(cliente, pg):
+    r = cliente.post(URL, json={"portas": [_porta()]}).json
+    id_existente = r["ids"][0]
+
+    resp = cliente.post(URL, json={"portas": [{"id": id_existente}, {"id": "nao-existe", "hash": "x"}]})
+    assert resp.status_code == 400
+    assert "nao-existe" in resp.json["error"]
+    assert len(pg.tabelas["portas"]) == 1
+
+
+def test_porta_sem_id_nem_conteudo_da_400(cliente, pg):
+    resp = cliente.post(URL, json={"portas": [{"quantidade": 2}]})
+    assert resp.status_code == 400
+    assert pg.tabelas["portas"] == []
+
+
+def test_desenho_abre_depois_de_restart_ou_em_outra_instancia(cliente, pg, tmp_path, monkeypatch):
+    r = cliente.post(URL, json={"portas": [_porta()]}).json
+    chave = r["portas_salvas"][0]["desenho"]
+    original = cliente.get(f"/api/desenhos/{chave}.svg").data
+    # spec gravada antes da porta
+    posts = [c[1] for c in pg.chamadas if c[0] == "POST"]
+    assert posts == ["/rest/v1/desenhos", "/rest/v1/portas"]
+    assert [d["chave"] for d in pg.tabelas["desenhos"]] == [chave]
+
+    # processo novo: memória e disco vazios
+    monkeypatch.setattr(desenhos, "_lru", type(desenhos._lru)())
+    monkeypatch.setattr(desenhos, "diretorio", str(tmp_path))
+    resp = cliente.get(f"/api/desenhos/{chave}.svg")
+    assert resp.status_code == 200 and resp.data == original
+    assert cliente.get(f"/api/desenhos/{'0' * 40}.svg").status_code == 404
+
+
+def test_svg_do_cliente_fica_quando_o_servidor_nao_desenha(cliente, pg):
+    porta = {"tipo": "giro", "dados": {"perfil": "1"}, "svg": "<svg>cliente</svg>"}
+    r = cliente.post(URL, json={"portas": [porta]}).json
+    salva = r["portas_salvas"][0]
+    assert salva["desenho"] is None and salva["svg"] == "<svg>cliente</svg>"
+    assert pg.tabelas["desenhos"] == []
+
+    # svg novo sem outra mudança também é gravado
+    r = cliente.post(URL, json={"portas": [{**porta, "id": salva["id"], "svg": "<svg>novo</svg>"}]}).json
+    assert r["portas_salvas"][0]["svg"] == "<svg>novo</svg>"
+
+    resp = cliente.get(f"/api/orcamento/orc-1/portas/{salva['id']}/svg")
+    assert resp.status_code == 200 and resp.data == b"<svg>novo</svg>"
+
+
+def test_listagem_mantem_quantidade_zero_e_completa_so_a_nula(cliente, pg):
+    pg.tabelas["portas"] = [
+        {"id": "a", "orcamento_uuid": "orc-1", "tipo": "giro", "quantidade": 0},
+        {"id": "b", "orcamento_uuid": "orc-1", "tipo": "giro", "quantidade": None},
+        {"id": "c", "orcamento_uuid": "orc-1", "tipo": "giro", "quantidade": "3"},
+    ]
+    r = cliente.get(URL + "?fields=id,quantidade").json
+    assert {p["id"]: p["quantidade"] for p in r["portas"]} == {"a": 0, "b": 1, "c": 3}
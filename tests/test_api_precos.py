@@ -0,0 +1,39 @@
+import pytest
+
+
+@pytest.fixture
+def catalogo_precos(pg):
+    pg.tabelas["perfis"] = [{"id": 1, "nome": "2215", "preco": 10.0}]
+    pg.tabelas["vidros"] = [{"id": 3, "tipo": "Temperado", "preco": 100.0}]
+    return pg
+
+
+def test_lote_soma_as_portas(cliente, catalogo_precos):
+    r = cliente.post("/api/precos/lote", json={"portas": [
+        {"largura": 1000, "altura": 2000, "perfil_id": 1, "vidro_id": 3, "quantidade": 2},
+        {"largura": "500", "altura": "1000", "perfil_id": 1, "vidro_id": 9},
+    ]})
+    assert r.status_code == 200
+    corpo = r.get_json()
+    assert corpo["portas"] == [
+        {"preco_unitario": 260.0, "preco_total": 520.0},
+        {"preco_unitario": 30.0, "preco_total": 30.0},
+    ]
+    assert corpo["total"] == 550.0
+    assert corpo["avisos"] == ["Vidro não encontrado: 9"]
+
+
+@pytest.mark.parametrize("porta,erro", [
+    ({"largura": "nan", "altura": 2000}, "portas[1].largura deve ser > 0"),
+    ({"largura": 800, "altura": -2000}, "portas[1].altura deve ser > 0"),
+    ({"largura": 800}, "portas[1].altura deve ser um número"),
+    ({"largura": "abc", "altura": 2000}, "portas[1].largura deve ser um número"),
+    ({"largura": 800, "altura": 2000, "quantidade": -1}, "portas[1].quantidade deve ser um inteiro >= 1"),
+    ({"largura": 800, "altura": 2000, "quantidade": 1.5}, "portas[1].quantidade deve ser um inteiro >= 1"),
+    ("porta", "portas[1] deve ser um objeto"),
+])
+def test_lote_porta_invalida_da_400_com_o_indice(cliente, catalogo_precos, porta, erro):
+    valida = {"largura": 800, "altura": 2000, "perfil_id": 1, "vidro_id": 3}
+    r = cliente.post("/api/precos/lote", json={"portas": [valida, porta]})
+    assert r.status_code == 400
+    assert erro in r.get_json()["error"]
@@ -0,0 +1,124 @@
+import uuid
+
+import pytest
+
+import portas_codec
+
+ORCAMENTO = str(uuid.uuid4())
+
+
+@pytest.fixture
+def orcamento(pg):
+    pg.tabelas["perfis"] = [{"id": 1, "nome": "2215"}]
+    pg.tabelas["vidros"] = [{"id": 7, "tipo": "Temperado", "espessura": 8}]
+    dados = {"largura": 800, "altura": 2100, "perfil": 1, "vidro": 7}
+    pg.tabelas["portas"] = [{
+        "id": str(uuid.uuid4()), "orcamento_uuid": ORCAMENTO, "tipo": "giro",
+        "dados_json": portas_codec.encode(dados), "dados": None, "quantidade": 2
+    }]
+    return ORCAMENTO
+
+
+# ---------- plano de corte ----------
+
+def test_plano_corte_com_barra_propria_do_perfil(cliente, orcamento):
+    r = cliente.post("/api/producao/plano-corte", json={
+        "orcamentos": [orcamento], "otimizar_ms": 0, "barras_por_perfil": {"1": 5000}
+    })
+    assert r.status_code == 200, r.json
+    assert r.json["portas"] == 1 and r.json["total_barras"] > 0
+
+
+@pytest.mark.parametrize("corpo", [
+    {},
+    {"orcamentos": []},
+    {"orcamentos": "abc"},
+    {"orcamentos": [123]},
+    {"orcamentos": [{"id": 1}]},
+    {"orcamentos": ["a,b)"]},
+    {"orcamentos": [ORCAMENTO], "barras_por_perfil": [5000]},
+    {"orcamentos": [ORCAMENTO], "barras_por_perfil": {"1": "abc"}},
+    {"orcamentos": [ORCAMENTO], "barras_por_perfil": {"1": None}},
+    {"orcamentos": [ORCAMENTO], "barras_por_perfil": {"1": [5000]}},
+    {"orcamentos": [ORCAMENTO], "barras_por_perfil": {"1": 0}},
+    {"orcamentos": [ORCAMENTO], "barras_por_perfil": {"1": -6000}},
+    {"orcamentos": [ORCAMENTO], "barras_por_perfil": {"1": "nan"}},
+    {"orcamentos": [ORCAMENTO], "barra_mm": "inf"},
+    {"orcamentos": [ORCAMENTO], "kerf_mm": -1},
+])
+def test_plano_corte_parametro_invalido_da_400(cliente, orcamento, corpo):
+    r = cliente.post("/api/producao/plano-corte", json=corpo)
+    assert r.status_code == 400, r.json
+    assert r.json["success"] is False
+
+
+def test_plano_corte_corpo_que_nao_e_objeto_da_400(cliente, orcamento):
+    assert cliente.post("/api/producao/plano-corte", json=[ORCAMENTO]).status_code == 400
+
+
+# ---------- plano de vidros ----------
+
+@pytest.fixture
+def parametros_vidros(monkeypatch):
+    import plano_vidros
+    recebidos = {}
+    original = plano_vidros.planejar
+
+    def planejar(portas, vidros_por_id, **kw):
+        recebidos.update(kw)
+        return original(portas, vidros_por_id, **kw)
+
+    monkeypatch.setattr(plano_vidros, "planejar", planejar)
+    return recebidos
+
+
+@pytest.mark.parametrize("girar,esperado", [
+    (True, True), (False, False), ("false", False), ("False", False), ("0", False), (0, False),
+    ("true", True), ("1", True), (1, True),
+])
+def test_plano_vidros_girar(cliente, orcamento, parametros_vidros, girar, esperado):
+    r = cliente.post("/api/producao/plano-vidros", json={"orcamentos": [orcamento], "girar": girar, "otimizar_ms": 0})
+    assert r.status_code == 200, r.json
+    assert parametros_vidros["girar"] is esperado
+
+
+def test_plano_vidros_chapa_propria_do_grupo(cliente, orcamento, parametros_vidros):
+    r = cliente.post("/api/producao/plano-vidros", json={
+        "orcamentos": [orcamento], "otimizar_ms": 0,
+        "chapas_por_vidro": {"temperado|8": {"largura": "2500", "altura": 2200}}
+    })
+    assert r.status_code == 200, r.json
+    assert parametros_vidros["chapas_por_vidro"] == {"temperado|8": {"largura": 2500.0, "altura": 2200.0}}
+    assert r.json["total_chapas"] == 1
+
+
+def test_plano_vidros_chave_da_chapa_normalizada_e_grupo_sem_pecas_avisado(cliente, orcamento):
+    r = cliente.post("/api/producao/plano-vidros", json={
+        "orcamentos": [orcamento], "otimizar_ms": 0,
+        "chapas_por_vidro": {"TEMPERADO | 8.0": {"largura": 1000, "altura": 1000}, "Laminado|10": {"largura": 3000}}
+    })
+    assert r.status_code == 200, r.json
+    assert r.json["avisos"] == [
+        "chapas_por_vidro: nenhuma peça do grupo laminado|10",
+        "Vidro temperado|8: 2 peça(s) maiores que a chapa",
+    ]
+
+
+@pytest.mark.parametrize("extra", [
+    {"girar": "nao"},
+    {"girar": 2},
+    {"girar": None},
+    {"girar": [True]},
+    {"chapas_por_vidro": [1]},
+    {"chapas_por_vidro": {"temperado|8": 3300}},
+    {"chapas_por_vidro": {"temperado|8": {"largura": "abc"}}},
+    {"chapas_por_vidro": {"temperado|8": {"largura": 0, "altura": 2000}}},
+    {"chapas_por_vidro": {"temperado|8": {"altura": None}}},
+    {"chapas_por_vidro": {"temperado|8": {"altura": "inf"}}},
+    {"chapa_altura": -1},
+    {"refilo_mm": "x"},
+])
+def test_plano_vidros_parametro_invalido_da_400(cliente, orcamento, extra):
+    r = cliente.post("/api/producao/plano-vidros", json={"orcamentos": [orcamento], **extra})
+    assert r.status_code == 400, r.json
+    assert r.json["success"] is False
@@ -0,0 +1,75 @@
+import time
+
+import pytest
+
+import catalog_cache
+from catalog_cache import catalogo
+
+
+@pytest.fixture
+def sinal(pg, monkeypatch):
+    monkeypatch.setattr(catalog_cache, "CATALOGO_SINAL_SEGUNDOS", 0)
+    monkeypatch.setattr(catalogo, "_sinal_ativo", True)
+    return pg
+
+
+def _sincronizado():
+    """Espera a leitura de catalogo_versao disparada pelo último obter()."""
+    if catalogo._sinal_thread is not None:
+        catalogo._sinal_thread.join(5)
+
+
+def _perfil(preco):
+    return {"id": 1, "nome": "2215", "custo": 10, "margem": 50, "perda": 5, "preco": preco}
+
+
+def test_escrita_de_outro_processo_chega_pelo_catalogo_versao(sinal):
+    sinal.tabelas["catalogo_versao"] = [{"tabela": t, "versao": 1} for t in ("perfis", "vidros", "materiais")]
+    sinal.tabelas["perfis"] = [_perfil(15.75)]
+    assert catalogo.obter("perfis").por_id["1"]["preco"] == 15.75
+    _sincronizado()
+
+    # outro processo grava direto no banco: o trigger de sql/006 incrementa a versão
+    sinal.tabelas["perfis"][0]["preco"] = 20.0
+    assert catalogo.obter("perfis").por_id["1"]["preco"] == 15.75
+    _sincronizado()
+    sinal.tabelas["catalogo_versao"][0]["versao"] = 2
+    catalogo.obter("perfis")
+    _sincronizado()
+    assert catalogo.obter("perfis").por_id["1"]["preco"] == 20.0
+
+
+def test_tabela_sem_mudanca_nao_recarrega(sinal):
+    sinal.tabelas["catalogo_versao"] = [{"tabela": "perfis", "versao": 7}, {"tabela": "vidros", "versao": 3}]
+    sinal.tabelas["perfis"] = [_perfil(15.75)]
+    catalogo.obter("perfis")
+    _sincronizado()
+    sinal.tabelas["catalogo_versao"][1]["versao"] = 4
+    sinal.chamadas.clear()
+    catalogo.obter("perfis")
+    _sincronizado()
+    assert [c[1] for c in sinal.chamadas] == ["/rest/v1/catalogo_versao"]
+
+
+def test_leitura_nao_espera_o_catalogo_versao(sinal):
+    sinal.tabelas["catalogo_versao"] = [{"tabela": "perfis", "versao": 1}]
+    sinal.tabelas["perfis"] = [_perfil(15.75)]
+    catalogo.obter("perfis")
+    _sincronizado()
+
+    sinal.falhar(("atraso", 1.0))  # a próxima chamada é o catalogo_versao
+    inicio = time.monotonic()
+    assert catalogo.obter("perfis").por_id["1"]["preco"] == 15.75
+    assert time.monotonic() - inicio < 0.5
+    _sincronizado()
+
+
+def test_sem_migracao_sincroniza_so_pelo_ttl(sinal):
+    sinal.tabelas["perfis"] = [_perfil(15.75)]
+    catalogo.obter("perfis")
+    _sincronizado()
+    assert catalogo._sinal_ativo is False
+    sinal.chamadas.clear()
+    catalogo.obter("perfis")
+    _sincronizado()
+    assert sinal.chamadas == []
@@ -0,0 +1,43 @@
+from catalog_cache import catalogo
+from catalog_index import IndiceSubstring, indice, normalizar
+
+
+def test_normalizar_tira_acento_e_caixa():
+    assert normalizar("  Refletância FUMÊ ") == "refletancia fume"
+    assert normalizar(None) == ""
+
+
+def test_indice_busca_substring_sem_acento_na_ordem_do_catalogo():
+    linhas = [{"id": 1, "nome": "Perfil 2215 Alumínio"}, {"id": 2, "nome": "Perfil 1036"}, {"id": 3, "nome": "2215 reforçado"}]
+    idx = IndiceSubstring(linhas, "nome")
+    assert idx.buscar("ALUMINIO")["id"] == 1
+    assert idx.buscar("reforcado")["id"] == 3
+    assert idx.buscar("215")["id"] == 1  # primeiro na ordem, não na ordem dos sufixos
+    assert idx.buscar("03")["id"] == 2
+    assert idx.buscar("9999") is None
+    assert idx.buscar("") is None
+
+
+def test_resolver_perfil_e_vidro_pelas_palavras_da_mensagem(pg):
+    pg.tabelas["perfis"] = [{"id": 1, "nome": "Linha Suprema 2215"}, {"id": 2, "nome": "Gold 1036"}]
+    pg.tabelas["vidros"] = [{"id": 7, "tipo": "Temperado Fumê"}, {"id": 8, "tipo": "Refletância prata"}]
+    palavras = "porta 80x210 perfil 1036 vidro refletancia".split()
+    perfil, vidro = indice.resolver(palavras)
+    assert perfil["id"] == 2 and vidro["id"] == 8
+    assert indice.resolver_vidro(["FUME"])["id"] == 7
+    assert indice.resolver_perfil(["nada", "aqui"]) is None
+
+
+def test_indice_refeito_quando_o_etag_do_catalogo_muda(pg):
+    pg.tabelas["perfis"] = [{"id": 1, "nome": "Perfil 2215"}]
+    assert indice.perfil("1036") is None
+    antes = indice._indice("perfis", "nome")
+
+    # mesmo conteúdo recarregado: mesmo etag, índice reaproveitado
+    catalogo.invalidar("perfis")
+    assert indice._indice("perfis", "nome") is antes
+
+    pg.tabelas["perfis"].append({"id": 2, "nome": "Perfil 1036"})
+    catalogo.invalidar("perfis")
+    assert indice.perfil("1036")["id"] == 2
+    assert indice._indice("perfis", "nome") is not antes
@@ -0,0 +1,71 @@
+import io
+import tracemalloc
+
+import pytest
+
+import catalogo_arquivos
+from catalogo_arquivos import _numero, importar
+
+
+@pytest.mark.parametrize("texto,esperado", [
+    ("12.5", 12.5), ("12,5", 12.5), ("12,50", 12.5), (" 7 ", 7.0), ("-3,25", -3.25),
+    ("1.234,56", 1234.56), ("1,234.56", 1234.56),
+    ("1.234.567", 1234567.0), ("1,234,567", 1234567.0), ("1.234.567,8", 1234567.8),
+    ("0,125", 0.125), ("1234,567", 1234.567), (",5", 0.5),
+    (3, 3.0), (2.5, 2.5),
+])
+def test_numero_brasileiro_e_americano(texto, esperado):
+    assert _numero(texto) == esperado
+
+
+@pytest.mark.parametrize("texto", ["1,234", "1.234", "12.34,5", "1,2,3", "1.234.56", "abc", "", "nan", "inf"])
+def test_numero_ambiguo_ou_invalido(texto):
+    with pytest.raises(ValueError):
+        _numero(texto)
+
+
+def test_importacao_relata_numero_ambiguo_na_linha(pg):
+    csv = "nome;custo;margem;perda\nA;1.234,50;30;5\nB;1,234;30;5\n".encode()
+    r = importar("perfis", io.BytesIO(csv))
+    assert r["inseridos"] == 1
+    assert r["erros"] == [{"linha": 3, "erro": "custo: número ambíguo: '1,234' (use 1.234,00 ou 1,234.00)"}]
+    assert pg.tabelas["perfis"][0]["custo"] == 1234.5
+
+
+class _Contador(list):
+    """Conta as chamadas do stub sem guardar os corpos."""
+
+    def append(self, chamada):
+        self.escritas = getattr(self, "escritas", 0) + (chamada[0] == "POST")
+
+
+def _csv(n, distintos):
+    linhas = (f"Perfil {i % distintos};{10 + i % 90},{i % 100:02d};30;5\n" for i in range(n))
+    return io.BytesIO(("nome;custo;margem;perda\n" + "".join(linhas)).encode())
+
+
+def _importar_medindo(pg, n, distintos):
+    pg.limpar()
+    arquivo = _csv(n, distintos)  # o arquivo em si fica fora da medida
+    tracemalloc.start()
+    try:
+        r = importar("perfis", arquivo)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert r["n_erros"] == 0 and r["linhas"] == n
+    return pico
+
+
+def test_importacao_em_lotes_com_memoria_do_tamanho_do_lote(pg, monkeypatch):
+    monkeypatch.setattr(catalogo_arquivos, "LOTE_IMPORTACAO", 100)
+    monkeypatch.setattr(pg, "chamadas", _Contador())
+
+    # 100 itens repetidos: só o 1º lote insere, os outros atualizam
+    importar("perfis", _csv(2000, 100))
+    assert pg.chamadas.escritas == 2000 // 100  # 1 escrita por lote
+    assert len(pg.tabelas["perfis"]) == 100
+
+    pequeno = _importar_medindo(pg, 1000, 100)
+    grande = _importar_medindo(pg, 8000, 100)
+    assert grande < pequeno * 1.5
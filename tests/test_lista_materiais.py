@@ -0,0 +1,95 @@
+"""
+Referência: calculateCristaleira do configurador (PROMOB/src/features/configurator),
+com o catálogo de PROMOB/.../data/catalog.ts. Os valores esperados são os daquela
+função para as mesmas entradas.
+"""
+import uuid
+
+import pytest
+
+import portas_codec
+from catalog_cache import catalogo
+from lista_materiais import MotorBOM
+
+
+@pytest.fixture
+def catalogo_promob(pg):
+    pg.tabelas["perfis"] = [{"id": "1036", "nome": "Perfil 1036", "preco": 19}]
+    pg.tabelas["vidros"] = [{"id": "reflecta_bronze", "tipo": "Reflecta bronze", "preco": 230}]
+    pg.tabelas["materiais"] = []
+    return pg
+
+
+def _linhas(item):
+    return {l["material"]: (l["quantidade"], l["valor"]) for l in item["linhas"]}
+
+
+# configuração inicial do configuratorStore.ts e uma de correr sem fundo
+@pytest.mark.parametrize("dados,linhas,venda", [
+    ({"altura": 2200, "largura": 1000, "profundidade": 450, "tem_fundo": True, "portas": 2, "abertura": "giro",
+      "prateleiras": 4, "perda": 10, "margem": 45},
+     {"MDF": (7.471, 859.2), "Perfil 1036": (11.642, 221.21), "Reflecta bronze": (2.295, 527.78),
+      "Baguete PVC": (11.642, 13.97), "Kit montagem": (2, 9.68), "Mão de obra": (1, 150)},
+     3239.7),
+    ({"altura": 1800, "largura": 1500, "profundidade": 400, "tem_fundo": False, "portas": 3, "abertura": "correr",
+      "prateleiras": 2, "perda": 5, "margem": 30},
+     {"MDF": (4.002, 460.2), "Perfil 1036": (14.314, 271.96), "Reflecta bronze": (2.823, 649.23),
+      "Baguete PVC": (14.314, 17.18), "Kit montagem": (3, 14.52), "Mão de obra": (1, 185)},
+     2282.99),
+])
+def test_cristaleira_igual_ao_promob(catalogo_promob, dados, linhas, venda):
+    item = {"tipo": "cristaleira", "dados": {**dados, "perfil": "1036", "vidro": "reflecta_bronze"}, "quantidade": 1}
+    bom = MotorBOM().explodir([item])
+    assert _linhas(bom["itens"][0]) == linhas
+    assert bom["itens"][0]["valor_unitario"] == pytest.approx(venda, abs=0.01)
+    assert bom["avisos"] == []
+
+
+def test_porta_perfil_no_perimetro_e_vidro_na_area(catalogo_promob):
+    bom = MotorBOM().explodir([
+        {"tipo": "giro", "dados": {"largura": 800, "altura": 2100, "perfil": "1036", "vidro": "reflecta_bronze"},
+         "quantidade": 2},
+        {"tipo": "correr", "dados": {"largura": 1570, "altura": 2000, "perfil": "1036", "qtd_folhas": 2}},
+    ])
+    giro, correr = bom["itens"]
+    assert _linhas(giro) == {"Perfil 1036": (5.8, 110.2), "Reflecta bronze": (1.68, 386.4)}
+    assert giro["valor_total"] == 993.2
+    # duas folhas de (1570 + 30) / 2 = 800 mm
+    assert _linhas(correr) == {"Perfil 1036": (11.2, 212.8)}
+    assert {m["material"]: m["quantidade"] for m in bom["materiais"]} == {"Perfil 1036": 22.8, "Reflecta bronze": 3.36}
+
+
+def test_memo_vale_ate_o_catalogo_mudar(catalogo_promob):
+    motor = MotorBOM()
+    porta = {"tipo": "giro", "dados": {"largura": 800, "altura": 2100, "perfil": "1036"}}
+    assert motor.explodir([porta])["total"] == 110.2
+    calculados, memorizados = motor.calculados, motor.stats()["memorizados"]  # porta e insumos do perfil
+    assert motor.explodir([porta, porta])["total"] == 220.4
+    assert motor.calculados == calculados and motor.acertos == 2
+
+    catalogo_promob.tabelas["perfis"][0]["preco"] = 20
+    catalogo.invalidar("perfis")  # etag nova: o memo da versão anterior é descartado
+    assert motor.explodir([porta])["total"] == 116.0
+    assert motor.calculados == 2 * calculados and motor.stats()["memorizados"] == memorizados
+
+    catalogo.invalidar("perfis")  # recarregou igual: mesma etag, memo mantido
+    motor.explodir([porta])
+    assert motor.calculados == 2 * calculados
+
+
+def test_bom_do_orcamento_soma_portas_salvas_e_extras(cliente, catalogo_promob):
+    orcamento = str(uuid.uuid4())
+    dados = {"largura": 800, "altura": 2100, "perfil": "1036", "vidro": "reflecta_bronze"}
+    catalogo_promob.tabelas["portas"] = [{
+        "id": "p1", "orcamento_uuid": orcamento, "tipo": "giro",
+        "dados_json": portas_codec.encode(dados), "dados": None, "quantidade": 2
+    }]
+    cristaleira = {"tipo": "cristaleira", "dados": {"perfil": "1036", "vidro": "reflecta_bronze", "perda": 10,
+                                                    "margem": 45}}
+    r = cliente.post(f"/api/orcamento/{orcamento}/bom", json={"itens": [cristaleira]}).json
+    assert r["success"]
+    assert [(i["tipo"], i.get("porta_id"), i["valor_total"]) for i in r["itens"]] == [
+        ("giro", "p1", 993.2), ("cristaleira", None, 3239.7)
+    ]
+    assert r["total"] == 4232.9
+    assert cliente.post(f"/api/orcamento/{orcamento}/bom", json={"itens": {}}).status_code == 400
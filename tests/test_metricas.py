@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+import metricas
+from metricas import Registro
+
+
+def _outro_worker(diretorio, pid, contadores, histogramas=None):
+    (diretorio / f"{pid}.json").write_text(json.dumps({"contadores": contadores, "histogramas": histogramas or {}}))
+
+
+def test_agregado_soma_os_arquivos_de_todos_os_workers(tmp_path):
+    registro = Registro(str(tmp_path))
+    registro.contar("pedidos_total", {"rota": "/a"}, 2)
+    registro.observar("duracao", {"rota": "/a"}, 0.02, buckets=(0.01, 0.1))
+    registro.flush(forcar=True)
+
+    chave_contador = json.dumps(["pedidos_total", [["rota", "/a"]]])
+    chave_hist = json.dumps(["duracao", [["rota", "/a"]], [0.01, 0.1]])
+    _outro_worker(tmp_path, 999999, {chave_contador: 3.0},
+                  {chave_hist: {"buckets": [1, 1], "soma": 0.005, "total": 1}})
+    (tmp_path / "999998.json").write_text("{meio arquivo")  # worker gravando: ignorado
+
+    contadores, histogramas = registro.agregado()
+    assert contadores == {chave_contador: 5.0}
+    assert histogramas[chave_hist] == {"buckets": [1, 2], "soma": pytest.approx(0.025), "total": 2}
+
+
+def test_texto_prometheus(tmp_path):
+    registro = Registro(str(tmp_path))
+    registro.contar("pedidos_total", {"rota": "/a"})
+    registro.observar("duracao", {}, 0.5, buckets=(0.1, 1))
+    assert registro.texto_prometheus().splitlines() == [
+        "# TYPE pedidos_total counter",
+        'pedidos_total{rota="/a"} 1.0',
+        "# TYPE duracao histogram",
+        'duracao_bucket{le="0.1"} 0',
+        'duracao_bucket{le="1"} 1',
+        'duracao_bucket{le="+Inf"} 1',
+        "duracao_sum 0.5",
+        "duracao_count 1",
+    ]
+
+
+@pytest.fixture
+def registro(monkeypatch, tmp_path):
+    monkeypatch.setattr(metricas.registro, "diretorio", str(tmp_path))
+    return metricas.registro
+
+
+def test_server_timing_separa_app_supabase_e_json(cliente, pg, registro):
+    pg.tabelas["perfis"] = [{"id": 1, "nome": "2215", "preco": 10}]
+    resp = cliente.get("/api/perfis")
+    partes = [p.split(";")[0] for p in resp.headers["Server-Timing"].split(", ")]
+    assert partes == ["app", "supabase", "json"]
+    assert 'desc="1 chamadas"' in resp.headers["Server-Timing"]
+
+
+def _valores(cliente):
+    resp = cliente.get("/metrics")
+    assert resp.mimetype == "text/plain"
+    linhas = resp.get_data(as_text=True).splitlines()
+    return dict(linha.rsplit(" ", 1) for linha in linhas if not linha.startswith("#"))
+
+
+def test_rota_metrics_conta_as_requisicoes(cliente, pg, registro):
+    pg.tabelas["perfis"] = []
+    duracao = 'http_request_duration_seconds_count{metodo="GET",rota="/api/perfis",status="200"}'
+    chamadas = 'http_upstream_calls_total{rota="/api/perfis",servico="supabase"}'
+    antes = _valores(cliente)  # o registro é do processo: outros testes já contaram
+    cliente.get("/api/perfis")
+    depois = _valores(cliente)
+    assert int(depois[duracao]) - int(antes.get(duracao, 0)) == 1
+    assert float(depois[chamadas]) - float(antes.get(chamadas, 0)) == 1.0
@@ -0,0 +1,100 @@
+"""
+sql/003 contra um Postgres de verdade (pulado sem TEST_DATABASE_URL).
+
+    TEST_DATABASE_URL=postgresql://postgres@localhost/postgres python -m pytest tests/test_numero_pedido_pg.py
+
+Cada teste roda num schema próprio, apagado no fim.
+"""
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+psycopg = pytest.importorskip("psycopg")
+
+DSN = os.getenv("TEST_DATABASE_URL")
+MIGRACAO = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        "sql", "003_orcamentos_numero_pedido_seq.sql")
+
+pytestmark = pytest.mark.skipif(not DSN, reason="TEST_DATABASE_URL não definido")
+
+
+@pytest.fixture
+def conectar():
+    schema = f"teste_{uuid.uuid4().hex[:12]}"
+    conexoes = []
+
+    def conectar():
+        conn = psycopg.connect(DSN, autocommit=True, options=f"-c search_path={schema}")
+        conexoes.append(conn)
+        return conn
+
+    try:
+        admin = psycopg.connect(DSN, autocommit=True)
+    except psycopg.OperationalError as e:
+        pytest.skip(f"Postgres indisponível: {e}")
+    admin.execute(f"create schema {schema}")
+    conectar().execute("""
+        create table orcamentos (
+            id uuid primary key default gen_random_uuid(),
+            numero_pedido integer,
+            cliente_nome text,
+            data_criacao timestamptz not null default now(),
+            quantidade_total integer default 0,
+            valor_total numeric default 0
+        )
+    """)
+    yield conectar
+    for conn in conexoes:
+        conn.close()
+    admin.execute(f"drop schema {schema} cascade")
+    admin.close()
+
+
+def _migrar(conn):
+    with open(MIGRACAO) as f:
+        conn.execute(f.read())
+
+
+def test_migracao_renumera_repetidos_da_corrida_antiga(conectar):
+    conn = conectar()
+    # o que o "max + 1" concorrente deixava: números repetidos e um buraco
+    for numero, cliente, criado in [(1, "a", "2024-01-01"), (2, "b", "2024-01-02"), (2, "c", "2024-01-03"),
+                                    (2, "d", "2024-01-04"), (4, "e", "2024-01-05"), (None, "f", "2024-01-06")]:
+        conn.execute("insert into orcamentos (numero_pedido, cliente_nome, data_criacao) values (%s, %s, %s)",
+                     (numero, cliente, criado))
+    _migrar(conn)
+
+    numeros = dict(conn.execute("select cliente_nome, numero_pedido from orcamentos").fetchall())
+    assert numeros["a"] == 1 and numeros["b"] == 2 and numeros["e"] == 4  # os mais antigos mantêm
+    assert sorted(numeros[c] for c in "cdf") == [5, 6, 7]
+    assert len(set(numeros.values())) == len(numeros)
+
+    novo = conn.execute("insert into orcamentos (cliente_nome) values ('g') returning numero_pedido").fetchone()[0]
+    assert novo == 8
+
+
+def test_migracao_pode_rodar_de_novo(conectar):
+    conn = conectar()
+    conn.execute("insert into orcamentos (numero_pedido, cliente_nome) values (1, 'a')")
+    _migrar(conn)
+    _migrar(conn)
+    assert conn.execute("select numero_pedido from orcamentos").fetchall() == [(1,)]
+
+
+def test_inserts_concorrentes_nao_repetem_numero(conectar):
+    _migrar(conectar())
+    n, threads = 300, 30
+    conexoes = [conectar() for _ in range(threads)]
+
+    def criar(i):
+        conn = conexoes[i % threads]
+        return conn.execute(
+            "insert into orcamentos (cliente_nome) values (%s) returning numero_pedido", (f"cliente {i}",)
+        ).fetchone()[0]
+
+    with ThreadPoolExecutor(threads) as pool:
+        numeros = list(pool.map(criar, range(n)))
+    assert len(set(numeros)) == n
+    assert sorted(numeros) == list(range(1, n + 1))
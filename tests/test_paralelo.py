@@ -0,0 +1,37 @@
+import contextvars
+import threading
+import time
+
+import pytest
+
+from paralelo import em_paralelo, ATRASADO
+
+
+def test_resultados_na_ordem_das_funcoes():
+    assert em_paralelo(lambda: 1, lambda: "dois", lambda: None) == [1, "dois", None]
+
+
+def test_prazo_vencido_devolve_parcial_sem_esperar_a_lenta():
+    liberar = threading.Event()
+    try:
+        inicio = time.monotonic()
+        rapida, lenta = em_paralelo(lambda: "perfil", lambda: liberar.wait(5), prazo=0.1)
+        assert time.monotonic() - inicio < 1
+        assert rapida == "perfil"
+        assert lenta is ATRASADO
+    finally:
+        liberar.set()  # devolve a thread ao pool
+
+
+def test_excecao_de_quem_terminou_sobe():
+    def falha():
+        raise ValueError("catálogo")
+
+    with pytest.raises(ValueError, match="catálogo"):
+        em_paralelo(lambda: 1, falha, prazo=1)
+
+
+def test_funcoes_veem_o_contexto_de_quem_chamou():
+    requisicao = contextvars.ContextVar("requisicao")
+    requisicao.set("r-1")
+    assert em_paralelo(requisicao.get, requisicao.get) == ["r-1", "r-1"]
@@ -0,0 +1,40 @@
+import io
+import os
+
+from flask import Flask
+
+import perfilador
+
+
+def _arquivo(diretorio, rota, pilha, ms=12):
+    nome = f"{len(os.listdir(diretorio))}_{perfilador._nome_rota(rota)}_{ms}ms.folded"
+    (diretorio / nome).write_text(f"{pilha} 1\n")
+
+
+def test_merge_junta_so_a_rota_e_o_metodo_exatos(tmp_path):
+    _arquivo(tmp_path, "GET /api/orcamento/<orcamento_uuid>/portas", "app.py:listar")
+    _arquivo(tmp_path, "GET /api/orcamento/<orcamento_uuid>/portas", "app.py:listar")
+    _arquivo(tmp_path, "POST /api/orcamento/<orcamento_uuid>/portas", "app.py:criar")
+    _arquivo(tmp_path, "GET /api/orcamento/<orcamento_uuid>/portas/<porta_id>/svg", "app.py:svg")
+
+    saida = io.StringIO()
+    n = perfilador.merge("get", "/api/orcamento/<orcamento_uuid>/portas", diretorio=str(tmp_path), saida=saida)
+    assert n == 2
+    assert saida.getvalue() == "app.py:listar 2\n"
+
+    assert perfilador.merge(diretorio=str(tmp_path), saida=io.StringIO()) == 4
+
+
+def test_requisicao_do_admin_gera_perfil_com_a_rota_no_nome(cliente, pg):
+    antes = set(os.listdir(perfilador.PROFILE_DIR)) if os.path.isdir(perfilador.PROFILE_DIR) else set()
+    cliente.get("/health", headers={"X-Profile": "1", "Authorization": f"Bearer {os.environ['ADMIN_TOKEN']}"})
+    novos = set(os.listdir(perfilador.PROFILE_DIR)) - antes
+    assert [perfilador._rota_do_arquivo(n) for n in novos] == ["GET /health"]
+
+
+def test_amostragem_desligada_sob_gevent(monkeypatch):
+    monkeypatch.setattr(perfilador, "_sob_gevent", lambda: True)
+    monkeypatch.setattr(perfilador, "PROFILE_MODE", "amostragem")
+    app = Flask(__name__)
+    perfilador.instalar(app)
+    assert not app.before_request_funcs.get(None)
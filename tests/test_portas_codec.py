@@ -0,0 +1,36 @@
+import json
+
+import pytest
+
+import portas_codec
+
+
+def test_tipar_converte_medidas_e_listas():
+    dados = portas_codec.tipar({"largura": "800", "altura": "2100,5", "dobradicas_alturas": "100, 1000", "perfil": "2215"})
+    assert dados == {"largura": 800, "altura": 2100.5, "dobradicas_alturas": [100, 1000], "perfil": "2215"}
+
+
+@pytest.mark.parametrize("texto", ["nan", "NaN", "inf", "-Infinity"])
+def test_texto_nao_finito_fica_como_texto(texto):
+    codificado = portas_codec.encode({"largura": texto})
+    assert codificado["largura"] == texto
+    json.dumps(codificado, allow_nan=False)
+
+
+@pytest.mark.parametrize("valor", [float("nan"), float("inf"), float("-inf")])
+def test_float_nao_finito_e_recusado(valor):
+    with pytest.raises(ValueError):
+        portas_codec.encode({"largura": valor})
+    with pytest.raises(ValueError):
+        portas_codec.encode({"dobradicas_alturas": [100, valor]})
+
+
+def test_legado_roundtrip():
+    assert portas_codec.decode(None, ["largura:800", "altura:nan"]) == {"largura": 800, "altura": "nan"}
+
+
+def test_criar_portas_com_nan_da_400(cliente, pg):
+    corpo = '{"portas": [{"tipo": "giro", "dados": {"largura": NaN, "altura": 2100}}]}'
+    resp = cliente.post("/api/orcamento/orc-1/portas", data=corpo, content_type="application/json")
+    assert resp.status_code == 400
+    assert pg.tabelas["portas"] == []
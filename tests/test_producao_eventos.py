@@ -0,0 +1,112 @@
+import os
+import queue
+
+import pytest
+
+import producao_eventos
+from producao_eventos import Difusor
+
+
+def _orcamento(i, updated_at):
+    return {"id": f"o{i:02d}", "numero_pedido": i, "cliente_nome": "c", "data_criacao": "2024-01-01",
+            "quantidade_total": 0, "valor_total": 0, "situacao": "orcamento", "updated_at": updated_at}
+
+
+class _Gravador(Difusor):
+    def __init__(self, **kw):
+        super().__init__(**kw)
+        self.publicados = []
+
+    def publicar(self, orcamento):
+        self.publicados.append(orcamento["id"])
+        super().publicar(orcamento)
+
+
+def test_poll_nao_perde_linhas_com_o_mesmo_updated_at_na_virada(pg, monkeypatch):
+    monkeypatch.setattr(producao_eventos, "PRODUCAO_POLL_LIMITE", 2)
+    difusor = _Gravador()
+    pg.tabelas["orcamentos"] = [_orcamento(0, "2024-01-01T00:00:00+00:00")]
+    difusor._poll()  # marca o cursor
+
+    pg.tabelas["orcamentos"] += [_orcamento(i, "2024-01-02T00:00:00+00:00") for i in range(1, 4)]
+    pg.tabelas["orcamentos"].append(_orcamento(4, "2024-01-03T00:00:00+00:00"))
+    for _ in range(3):
+        difusor._poll()
+    assert difusor.publicados == ["o01", "o02", "o03", "o04"]
+
+
+def test_retomada_com_last_event_id_pega_empate_de_updated_at(pg):
+    mesmo = "2024-01-02T00:00:00+00:00"
+    pg.tabelas["orcamentos"] = [_orcamento(i, mesmo) for i in range(1, 4)]
+    difusor = Difusor()
+    difusor._poll_pid = os.getpid()  # sem thread de poll no teste
+    stream = difusor.stream(f"{mesmo}|o01")
+    eventos = [next(stream) for _ in range(2)]
+    assert [e.split("\n")[0] for e in eventos] == [f"id: {mesmo}|o02", f"id: {mesmo}|o03"]
+    stream.close()
+
+
+def test_vistos_fica_limitado():
+    difusor = Difusor(vistos_max=100)
+    for i in range(1000):
+        difusor.publicar({"id": i, "updated_at": "x"})
+    assert len(difusor._vistos) == 100
+    assert 999 in difusor._vistos and 0 not in difusor._vistos
+
+
+def test_desconectar_nao_falha_se_a_fila_encher_de_novo():
+    class FilaDisputada(queue.Queue):
+        """Um publicar concorrente enche a fila logo depois de ela ser esvaziada."""
+        def __init__(self):
+            super().__init__(maxsize=1)
+            self.disputas = 1
+
+        def put_nowait(self, item):
+            if item is None and self.disputas:
+                self.disputas -= 1
+                super().put_nowait({"id": "atrasado"})
+            return super().put_nowait(item)
+
+    difusor = Difusor(buffer=1)
+    q = FilaDisputada()
+    difusor._clientes.add(q)
+    difusor._desconectar(q)
+    assert q.get_nowait() is None
+    assert q not in difusor._clientes
+
+
+def test_tela_lenta_e_desconectada_sem_erro():
+    difusor = Difusor(buffer=1)
+    q = queue.Queue(maxsize=1)
+    difusor._clientes.add(q)
+    difusor.publicar({"id": 1, "updated_at": "a"})
+    difusor.publicar({"id": 2, "updated_at": "a"})
+    assert q.get_nowait() is None
+    assert q not in difusor._clientes
+
+
+def test_retomada_vem_em_paginas(pg, monkeypatch):
+    monkeypatch.setattr(producao_eventos, "PRODUCAO_POLL_LIMITE", 2)
+    pg.tabelas["orcamentos"] = [_orcamento(i, f"2024-01-{i:02d}T00:00:00+00:00") for i in range(1, 7)]
+    difusor = Difusor()
+    difusor._poll_pid = os.getpid()
+    stream = difusor.stream("2024-01-01T00:00:00+00:00|o01")
+    eventos = [next(stream) for _ in range(6)]
+    assert [e.split("\n")[0].rsplit("|", 1)[1] for e in eventos[:5]] == ["o02", "o03", "o04", "o05", "o06"]
+    assert eventos[5] == "retry: 3000\n\n"
+    limites = [dict(c[2]).get("limit") for c in pg.chamadas]
+    assert limites == ["2", "2", "2"]
+    stream.close()
+
+
+@pytest.mark.parametrize("last_event_id", [
+    'x")|o01', '2024-01-02T00:00:00+00:00|o01"),id.gt.(', "2024-99-99|o01", "ontem",
+])
+def test_last_event_id_invalido_recomeca_de_agora(pg, last_event_id):
+    pg.tabelas["orcamentos"] = [_orcamento(1, "2024-01-02T00:00:00+00:00")]
+    difusor = Difusor()
+    difusor._poll_pid = os.getpid()
+    stream = difusor.stream(last_event_id)
+    assert next(stream) == "retry: 3000\n\n"
+    assert pg.chamadas == []
+    stream.close()
@@ -0,0 +1,54 @@
+import reprecificacao
+
+
+def _perfil(id, custo, margem, perda, preco):
+    return {"id": id, "nome": f"perfil {id}", "custo": custo, "margem": margem, "perda": perda, "preco": preco}
+
+
+def _upserts(pg):
+    return [c[3] for c in pg.chamadas if c[0] == "POST"]
+
+
+def test_so_grava_linhas_e_campos_que_mudaram(pg):
+    pg.tabelas["perfis"] = [
+        _perfil(1, 10.005, 30, 5, 13.66),   # já está com margem 30: nada muda
+        _perfil(2, 20.0, 20, 0, 24.0),      # margem 20 -> 30
+    ]
+    r = reprecificacao.reprecificar("perfis", ajuste={"margem": 30})
+    assert [a["id"] for a in r["alterados"]] == [2]
+    assert r["alterados"][0]["preco"] == [24.0, 26.0]
+    assert r["alterados"][0]["custo"] == [20.0, 20.0]
+
+    [payload] = _upserts(pg)
+    assert payload == [{**_perfil(2, 20.0, 30, 0, 24.0), "margem": 30.0, "preco": 26.0}]
+    # custo com 3 casas fica como está quando o ajuste não mexe em custo
+    assert pg.tabelas["perfis"][0]["custo"] == 10.005
+
+
+def test_custo_so_e_arredondado_quando_ajustado(pg):
+    pg.tabelas["perfis"] = [_perfil(1, 10.123456, 0, 0, 10.12)]
+    assert reprecificacao.reprecificar("perfis", ajuste={"perda_delta": 0})["alterados"] == []
+    assert _upserts(pg) == []
+
+    r = reprecificacao.reprecificar("perfis", ajuste={"custo_percentual": 10})
+    assert r["alterados"][0]["custo"] == [10.123456, 11.14]
+    assert r["alterados"][0]["preco"] == [10.12, 11.14]
+
+
+def test_simular_nao_grava(pg):
+    pg.tabelas["perfis"] = [_perfil(1, 10, 0, 0, 10)]
+    r = reprecificacao.reprecificar("perfis", ajuste={"custo_percentual": 8}, simular=True)
+    assert r["gravados"] == 0 and len(r["alterados"]) == 1
+    assert _upserts(pg) == []
+    assert pg.tabelas["perfis"][0]["custo"] == 10
+
+
+def test_cli_mostra_linha_sem_preco_gravado(pg, capsys):
+    # sem custo: a margem muda, o preço segue sem valor no banco (0 antes e depois)
+    pg.tabelas["perfis"] = [_perfil(1, None, 30, 5, None), _perfil(2, 10, 0, 0, 10)]
+    reprecificacao.main(["perfis", "--margem", "40", "--simular"])
+    saida = capsys.readouterr()
+    linhas = saida.out.splitlines()
+    assert linhas[0].split() == ["1", "perfil", "1", "R$", "0.00", "->", "R$", "0.00"]
+    assert linhas[1].split() == ["2", "perfil", "2", "R$", "10.00", "->", "R$", "14.00"]
+    assert "2 de 2 alterados (simulação, nada gravado)" in saida.err
@@ -0,0 +1,114 @@
+import time
+
+import pytest
+import requests
+
+import supabase_client as db
+from resiliencia import Politica, CircuitoAberto
+
+
+def _politica(**kw):
+    opcoes = {"timeout": (1, 1), "tentativas": 3, "backoff": 0.01, "falhas_para_abrir": 5, "segundos_aberto": 30}
+    return Politica("teste", **{**opcoes, **kw})
+
+
+def _get(stub, politica):
+    sessao = requests.Session()
+    return politica.executar("GET", lambda timeout: sessao.get(stub.url + "/x", timeout=timeout))
+
+
+# ---------- pelo supabase_client, contra o PostgREST falso ----------
+
+def test_get_repete_503_e_conexao_derrubada(pg):
+    pg.tabelas["perfis"] = [{"id": 1, "nome": "2215"}]
+    pg.falhar(503, "derrubar")
+    assert db.select("perfis") == [{"id": 1, "nome": "2215"}]
+    assert len(pg.chamadas) == 3
+
+
+def test_insert_nao_e_repetido(pg):
+    pg.falhar(503)
+    with pytest.raises(requests.HTTPError):
+        db.insert("perfis", {"nome": "2215"})
+    assert len(pg.chamadas) == 1
+    assert pg.tabelas["perfis"] == []
+
+
+def test_upsert_e_repetido(pg):
+    pg.falhar(502)
+    db.upsert("perfis", [{"id": 1, "nome": "2215"}], on_conflict="id")
+    assert pg.tabelas["perfis"] == [{"id": 1, "nome": "2215"}]
+
+
+@pytest.mark.parametrize("falha", ["truncar", "gzip_invalido"])
+def test_corpo_quebrado_e_repetido(pg, falha):
+    pg.tabelas["perfis"] = [{"id": 1}]
+    pg.falhar(falha)
+    assert db.select("perfis") == [{"id": 1}]
+
+
+# ---------- disjuntor ----------
+
+@pytest.mark.parametrize("falha,erro", [
+    ("truncar", requests.exceptions.ChunkedEncodingError),
+    ("gzip_invalido", requests.exceptions.ContentDecodingError),
+])
+def test_erro_fora_de_connection_timeout_no_meio_aberto_nao_trava_o_disjuntor(graph, falha, erro):
+    politica = _politica(tentativas=1, falhas_para_abrir=1, segundos_aberto=0.05)
+    graph.falhar(503)
+    _get(graph, politica)
+    assert politica.disjuntor.estado == "aberto"
+
+    time.sleep(0.06)
+    graph.falhar(falha)
+    with pytest.raises(erro):
+        _get(graph, politica)  # o teste do meio-aberto falhou: reabre
+    assert politica.disjuntor.estado == "aberto"
+
+    time.sleep(0.06)
+    assert _get(graph, politica).status_code == 200
+    assert politica.disjuntor.estado == "fechado"
+
+
+def test_excecao_local_libera_o_meio_aberto(graph):
+    politica = _politica(tentativas=1, falhas_para_abrir=1, segundos_aberto=0.01)
+    graph.falhar(503)
+    _get(graph, politica)
+    time.sleep(0.02)
+
+    def quebrada(timeout):
+        raise KeyError("bug")
+
+    with pytest.raises(KeyError):
+        politica.executar("GET", quebrada)
+    assert _get(graph, politica).status_code == 200
+
+
+def test_circuito_aberto_falha_sem_ir_a_rede(graph):
+    politica = _politica(tentativas=1, falhas_para_abrir=2)
+    graph.falhar(503, 503)
+    _get(graph, politica)
+    _get(graph, politica)
+    graph.chamadas.clear()
+    with pytest.raises(CircuitoAberto):
+        _get(graph, politica)
+    assert graph.chamadas == []
+
+
+# ---------- prazo total ----------
+
+def test_prazo_total_limita_tentativas_e_esperas(graph):
+    politica = _politica(timeout=(1, 0.3), tentativas=10, backoff=0.05, prazo_total=0.5)
+    graph.falhar(*[("atraso", 1)] * 10)
+    inicio = time.monotonic()
+    with pytest.raises(requests.Timeout):
+        _get(graph, politica)
+    assert time.monotonic() - inicio < 0.8
+    assert len(graph.chamadas) < 10
+
+
+def test_prazo_total_devolve_a_ultima_resposta_transitoria(graph):
+    politica = _politica(tentativas=10, backoff=0.2, prazo_total=0.3)
+    graph.falhar(*[503] * 10)
+    assert _get(graph, politica).status_code == 503
+    assert len(graph.chamadas) <= 2
@@ -0,0 +1,105 @@
+import os
+import time
+import threading
+
+import singleflight as modulo
+import supabase_client as db
+from singleflight import SingleFlight
+
+
+def _em_voo(sf, chave, resultado, desde=0.0):
+    """Dispara uma chamada que fica em voo até liberar.set(); devolve (liberar, saida)."""
+    liberar, comecou, saida = threading.Event(), threading.Event(), {}
+
+    def fn():
+        comecou.set()
+        liberar.wait(5)
+        return resultado
+
+    t = threading.Thread(target=lambda: saida.setdefault("r", sf.executar(chave, fn, desde)))
+    t.start()
+    comecou.wait(5)
+    saida["thread"] = t
+    return liberar, saida
+
+
+def _rodar(sf, chave, fn, desde=0.0):
+    saida = {}
+    t = threading.Thread(target=lambda: saida.setdefault("r", sf.executar(chave, fn, desde)))
+    t.start()
+    return t, saida
+
+
+def test_chamadas_simultaneas_viram_uma():
+    sf = SingleFlight(diretorio=None)
+    liberar, primeira = _em_voo(sf, "k", b"x")
+    chamadas = []
+    t, segunda = _rodar(sf, "k", lambda: chamadas.append(1) or b"y")
+    time.sleep(0.05)
+    liberar.set()
+    primeira["thread"].join(5)
+    t.join(5)
+    assert primeira["r"] == segunda["r"] == b"x"
+    assert chamadas == [] and sf.combinadas == 1
+
+
+def test_leitura_depois_de_escrita_nao_aproveita_chamada_que_saiu_antes():
+    sf = SingleFlight(diretorio=None)
+    liberar, antiga = _em_voo(sf, "k", b"velho")
+    escrita = time.time()
+    assert sf.executar("k", lambda: b"novo", desde=escrita) == b"novo"
+
+    # quem chega depois (sem escrita) ainda combina com a antiga, que segue em voo
+    t, terceira = _rodar(sf, "k", lambda: b"outro")
+    liberar.set()
+    antiga["thread"].join(5)
+    t.join(5)
+    assert antiga["r"] == b"velho"
+    assert terceira["r"] in (b"velho", b"outro")
+    assert sf._em_voo == {}
+
+
+def test_select_depois_de_insert_le_o_proprio_insert(pg):
+    # GET idêntico em voo desde antes do insert, com a resposta antiga
+    chave = f"perfis?{sorted({'select': '*'}.items())}"
+    liberar, antiga = _em_voo(db.singleflight, chave, b"[]")
+    try:
+        db.insert("perfis", {"id": 1, "nome": "2215"})
+        assert db.select("perfis") == [{"id": 1, "nome": "2215"}]
+    finally:
+        liberar.set()
+        antiga["thread"].join(5)
+
+
+# ---------- entre workers ----------
+
+def test_entre_workers_respeita_desde(tmp_path):
+    worker_a, worker_b, worker_c = (SingleFlight(diretorio=str(tmp_path)) for _ in range(3))
+    liberar, a = _em_voo(worker_a, "k", b"velho")
+    escrita = time.time()
+    tb, b = _rodar(worker_b, "k", lambda: b"novo", desde=escrita)
+    tc, c = _rodar(worker_c, "k", lambda: b"nao usado")
+    time.sleep(0.05)
+    liberar.set()
+    for t in (a["thread"], tb, tc):
+        t.join(5)
+    assert a["r"] == b"velho"
+    assert b["r"] == b"novo"
+    assert c["r"] in (b"velho", b"novo")  # combinou com quem estava em voo
+
+
+def test_varredura_apaga_arquivos_parados(tmp_path, monkeypatch):
+    monkeypatch.setattr(modulo, "SINGLEFLIGHT_TTL", 1.0)
+    sf = SingleFlight(diretorio=str(tmp_path))
+    sf.executar("k1", lambda: b"resultado")
+    antigos = sorted(os.listdir(tmp_path))
+    assert antigos  # .lock e .res da k1
+    velho = time.time() - 10
+    for nome in antigos:
+        os.utime(tmp_path / nome, (velho, velho))
+
+    sf._varrido_em = 0.0
+    sf.executar("k2", lambda: b"outro")
+    restantes = os.listdir(tmp_path)
+    assert not set(antigos) & set(restantes)
+    assert len(restantes) == 2  # só os da k2, recentes
@@ -0,0 +1,93 @@
+import importlib
+import time
+
+import pytest
+
+from webhook_dedup import DedupMemoria, DedupSQLite
+
+
+@pytest.fixture(params=["memoria", "sqlite"])
+def criar(request, tmp_path):
+    if request.param == "memoria":
+        return lambda **kw: DedupMemoria(**kw)
+    return lambda **kw: DedupSQLite(str(tmp_path / "dedup.db"), **kw)
+
+
+def test_reentrega_e_duplicada_ate_o_ttl(criar):
+    dedup = criar(ttl=0.2, maximo=100)
+    assert dedup.registrar("wamid.1") is True
+    assert dedup.registrar("wamid.1") is False
+    time.sleep(0.25)
+    assert dedup.registrar("wamid.1") is True  # expirou: a Meta já desistiu, é mensagem nova
+
+
+def test_stats_conta_novas_duplicadas_e_ids(criar):
+    dedup = criar(ttl=60, maximo=100)
+    for msg_id in ("a", "b", "a", "c", "a"):
+        dedup.registrar(msg_id)
+    s = dedup.stats()
+    assert (s["novas"], s["duplicadas"], s["ids"]) == (3, 2, 3)
+
+
+def test_esquecer_libera_o_id_para_a_reentrega(criar):
+    dedup = criar(ttl=60, maximo=100)
+    dedup.registrar("wamid.1")
+    dedup.esquecer("wamid.1")
+    dedup.esquecer("nunca-visto")
+    assert dedup.registrar("wamid.1") is True
+
+
+def test_memoria_descarta_o_menos_recente_acima_do_maximo():
+    dedup = DedupMemoria(ttl=60, maximo=3)
+    for msg_id in ("a", "b", "c"):
+        dedup.registrar(msg_id)
+    dedup.registrar("a")  # reentrega renova "a": "b" passa a ser o mais antigo
+    dedup.registrar("d")
+    assert dedup.stats()["ids"] == 3
+    assert dedup.registrar("a") is False
+    assert dedup.registrar("b") is True
+
+
+def test_sqlite_limpa_excesso_a_cada_mil_novas(tmp_path):
+    dedup = DedupSQLite(str(tmp_path / "dedup.db"), ttl=60, maximo=10)
+    for i in range(999):
+        dedup.registrar(f"id{i}")
+    assert dedup.stats()["ids"] == 999
+    dedup.registrar("id999")
+    assert dedup.stats()["ids"] == 10
+    assert dedup.registrar("id999") is False
+    assert dedup.registrar("id0") is True
+
+
+def test_sqlite_compartilha_ids_entre_instancias(tmp_path):
+    caminho = str(tmp_path / "dedup.db")
+    assert DedupSQLite(caminho).registrar("wamid.1") is True
+    assert DedupSQLite(caminho).registrar("wamid.1") is False
+
+
+def _evento(msg_id):
+    mensagem = {"id": msg_id, "from": "5511999990000", "text": {"body": "oi"}}
+    return {"entry": [{"changes": [{"value": {"messages": [mensagem]}}]}]}
+
+
+def test_webhook_falha_ao_enfileirar_deixa_a_reentrega_passar(monkeypatch, tmp_path):
+    monkeypatch.setenv("WHATSAPP_TOKEN", "teste")
+    monkeypatch.setenv("PHONE_NUMBER_ID", "123")
+    webhook = importlib.import_module("webhook")
+    monkeypatch.setattr(webhook, "dedup", DedupMemoria())
+    enviadas = []
+
+    def enviar(numero, texto):
+        if not enviadas:
+            enviadas.append(None)
+            raise OSError("spool cheio")
+        enviadas.append((numero, texto))
+
+    monkeypatch.setattr(webhook.fila_whatsapp, "enviar", enviar)
+    cliente = webhook.app.test_client()
+
+    assert cliente.post("/webhook", json=_evento("wamid.1")).status_code == 500
+    assert cliente.post("/webhook", json=_evento("wamid.1")).status_code == 200
+    assert cliente.post("/webhook", json=_evento("wamid.1")).status_code == 200
+    assert len(enviadas) == 2  # a falha e a reentrega; a terceira é duplicada
+    assert cliente.post("/webhook", json={"entry": [{"changes": [{"value": {"statuses": []}}]}]}).status_code == 200
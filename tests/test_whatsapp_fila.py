@@ -0,0 +1,59 @@
+import os
+import json
+import time
+
+from whatsapp_fila import FilaWhatsApp
+
+
+def _fila(graph, tmp_path, **kw):
+    return FilaWhatsApp(graph.url, "token", spool_dir=str(tmp_path), backoff=0.01, **kw)
+
+
+def _aguardar(fila, condicao, segundos=5):
+    fim = time.monotonic() + segundos
+    while not condicao() and time.monotonic() < fim:
+        time.sleep(0.01)
+    fila.aguardar()
+
+
+def test_repete_falhas_transitorias_e_entrega_uma_vez(graph, tmp_path):
+    graph.falhar(503, "derrubar", 429)
+    fila = _fila(graph, tmp_path)
+    fila.enviar("5511999990000", "oi")
+    _aguardar(fila, lambda: graph.entregues)
+    assert graph.entregues == [("5511999990000", "oi")]
+    assert len(graph.chamadas) == 4
+    assert [n for n in os.listdir(tmp_path) if n.endswith(".json")] == []
+
+
+def test_mantem_ordem_por_destinatario_mesmo_com_retentativa(graph, tmp_path):
+    graph.falhar(503, 503)
+    fila = _fila(graph, tmp_path, workers=4)
+    for i in range(20):
+        fila.enviar("5511", f"a{i}")
+        fila.enviar("5522", f"b{i}")
+    _aguardar(fila, lambda: len(graph.entregues) == 40)
+    assert [t for n, t in graph.entregues if n == "5511"] == [f"a{i}" for i in range(20)]
+    assert [t for n, t in graph.entregues if n == "5522"] == [f"b{i}" for i in range(20)]
+
+
+def test_recusa_definitiva_vai_para_falhas(graph, tmp_path):
+    graph.falhar(400)
+    fila = _fila(graph, tmp_path)
+    fila.enviar("5511", "numero invalido")
+    _aguardar(fila, lambda: os.listdir(tmp_path / "falhas"))
+    assert graph.entregues == []
+    assert len(graph.chamadas) == 1
+    assert len(os.listdir(tmp_path / "falhas")) == 1
+
+
+def test_iniciar_reenvia_spool_de_processo_morto_sem_nova_mensagem(graph, tmp_path):
+    # pid que não existe e não tem lock: mensagens órfãs, na ordem original
+    for i, texto in enumerate(["primeira", "segunda"]):
+        nome = f"999999-{1000 + i}-x{i}.json"
+        (tmp_path / nome).write_text(json.dumps({"arquivo": nome, "numero": "5511", "texto": texto}))
+    fila = _fila(graph, tmp_path)
+    fila.iniciar()
+    _aguardar(fila, lambda: len(graph.entregues) == 2)
+    assert graph.entregues == [("5511", "primeira"), ("5511", "segunda")]
+    assert [n for n in os.listdir(tmp_path) if n.endswith(".json")] == []
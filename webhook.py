@@ -1,12 +1,22 @@
 from flask import Flask, request, jsonify
-import requests
 import os
+from whatsapp_fila import FilaWhatsApp, SPOOL_DIR
+from webhook_dedup import criar_dedup
 
 app = Flask(__name__)
 
 VERIFY_TOKEN = "meu_token_verificacao"
 WHATSAPP_TOKEN = os.environ["WHATSAPP_TOKEN"]
 PHONE_NUMBER_ID = os.environ["PHONE_NUMBER_ID"]
+GRAPH_URL = f"https://graph.facebook.com/v19.0/{PHONE_NUMBER_ID}/messages"
+
+# Respostas saem por fila em segundo plano (o webhook responde 200 na hora)
+fila_whatsapp = FilaWhatsApp(GRAPH_URL, WHATSAPP_TOKEN, spool_dir=os.path.join(SPOOL_DIR, "webhook"))
+# Reenvia já na subida do worker o que um processo morto deixou no spool
+fila_whatsapp.iniciar()
+
+# Ids de mensagens já respondidas (Meta reentrega quando o 200 atrasa)
+dedup = criar_dedup()
 
 # ===================== VERIFICAÇÃO META =====================
 @app.route("/webhook", methods=["GET"])
@@ -26,31 +36,31 @@ def receive_message():
 
     try:
         msg = data["entry"][0]["changes"][0]["value"]["messages"][0]
+    except (KeyError, IndexError, TypeError):
+        return jsonify(status="ok"), 200  # evento sem mensagem (status de entrega etc.)
+
+    msg_id = msg.get("id")
+    if msg_id and not dedup.registrar(msg_id):
+        return jsonify(status="ok"), 200  # reentrega: já respondida
+    try:
         from_number = msg["from"]
         text = msg["text"]["body"].lower()
 
         resposta = processar_mensagem(text)
 
-        enviar_mensagem(from_number, resposta)
+        fila_whatsapp.enviar(from_number, resposta)
     except Exception as e:
         print("Erro:", e)
+        # não respondida: libera o id e pede a reentrega
+        if msg_id:
+            dedup.esquecer(msg_id)
+        return jsonify(status="erro"), 500
 
     return jsonify(status="ok"), 200
 
-# ===================== ENVIAR MSG =====================
-def enviar_mensagem(numero, texto):
-    url = f"https://graph.facebook.com/v19.0/{PHONE_NUMBER_ID}/messages"
-    headers = {
-        "Authorization": f"Bearer {WHATSAPP_TOKEN}",
-        "Content-Type": "application/json"
-    }
-    payload = {
-        "messaging_product": "whatsapp",
-        "to": numero,
-        "type": "text",
-        "text": {"body": texto}
-    }
-    requests.post(url, headers=headers, json=payload)
+@app.route("/webhook/stats", methods=["GET"])
+def webhook_stats():
+    return jsonify(dedup.stats())
 
 # ===================== LÓGICA INICIAL =====================
 def processar_mensagem(texto):
@@ -0,0 +1,111 @@
+import os
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+
+# =====================
+# CONFIG
+# =====================
+
+# Meta reenvia eventos por até ~24h quando o 200 atrasa
+DEDUP_TTL = float(os.getenv("WEBHOOK_DEDUP_TTL", str(24 * 3600)))
+DEDUP_MAX = int(os.getenv("WEBHOOK_DEDUP_MAX", "50000"))
+# Se definido, usa SQLite nesse caminho (compartilhado entre workers do gunicorn)
+DEDUP_DB = os.getenv("WEBHOOK_DEDUP_DB")
+
+# =====================
+# BACKENDS
+# =====================
+
+class DedupMemoria:
+    """LRU com TTL por processo. Cada worker enxerga só o que ele recebeu."""
+
+    def __init__(self, ttl=DEDUP_TTL, maximo=DEDUP_MAX):
+        self.ttl = ttl
+        self.maximo = maximo
+        self._ids = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def registrar(self, msg_id) -> bool:
+        """True se o id é novo (processar), False se é reentrega."""
+        agora = time.time()
+        with self._lock:
+            visto = self._ids.get(msg_id)
+            if visto is not None and agora - visto < self.ttl:
+                self._ids.move_to_end(msg_id)
+                self.hits += 1
+                return False
+            self._ids[msg_id] = agora
+            self._ids.move_to_end(msg_id)
+            while len(self._ids) > self.maximo:
+                self._ids.popitem(last=False)
+            self.misses += 1
+            return True
+
+    def esquecer(self, msg_id):
+        """Desfaz o registrar(): o processamento falhou e a reentrega deve ser atendida."""
+        with self._lock:
+            self._ids.pop(msg_id, None)
+
+    def stats(self):
+        return {"backend": "memoria", "duplicadas": self.hits, "novas": self.misses, "ids": len(self._ids)}
+
+
+class DedupSQLite:
+    """Mesmo contrato, num arquivo SQLite visto por todos os workers da máquina."""
+
+    def __init__(self, caminho, ttl=DEDUP_TTL, maximo=DEDUP_MAX):
+        self.caminho = caminho
+        self.ttl = ttl
+        self.maximo = maximo
+        self._local = threading.local()
+        with self._conn() as c:
+            c.execute("CREATE TABLE IF NOT EXISTS ids (id TEXT PRIMARY KEY, ts REAL NOT NULL)")
+            c.execute("CREATE INDEX IF NOT EXISTS ids_ts ON ids (ts)")
+            c.execute("CREATE TABLE IF NOT EXISTS contadores (nome TEXT PRIMARY KEY, valor INTEGER NOT NULL)")
+            c.execute("INSERT OR IGNORE INTO contadores VALUES ('duplicadas', 0), ('novas', 0)")
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.caminho, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def registrar(self, msg_id) -> bool:
+        agora = time.time()
+        c = self._conn()
+        c.execute("BEGIN IMMEDIATE")
+        try:
+            c.execute("DELETE FROM ids WHERE id = ? AND ts < ?", (msg_id, agora - self.ttl))
+            novo = c.execute("INSERT OR IGNORE INTO ids VALUES (?, ?)", (msg_id, agora)).rowcount == 1
+            c.execute("UPDATE contadores SET valor = valor + 1 WHERE nome = ?", ("novas" if novo else "duplicadas",))
+            if novo and c.execute("SELECT valor FROM contadores WHERE nome = 'novas'").fetchone()[0] % 1000 == 0:
+                # limpeza ocasional: expirados e excesso acima do máximo
+                c.execute("DELETE FROM ids WHERE ts < ?", (agora - self.ttl,))
+                c.execute(
+                    "DELETE FROM ids WHERE id IN (SELECT id FROM ids ORDER BY ts DESC LIMIT -1 OFFSET ?)",
+                    (self.maximo,)
+                )
+            c.execute("COMMIT")
+        except Exception:
+            c.execute("ROLLBACK")
+            raise
+        return novo
+
+    def esquecer(self, msg_id):
+        self._conn().execute("DELETE FROM ids WHERE id = ?", (msg_id,))
+
+    def stats(self):
+        c = self._conn()
+        contadores = dict(c.execute("SELECT nome, valor FROM contadores").fetchall())
+        total = c.execute("SELECT COUNT(*) FROM ids").fetchone()[0]
+        return {"backend": "sqlite", "duplicadas": contadores["duplicadas"], "novas": contadores["novas"], "ids": total}
+
+
+def criar_dedup(caminho=DEDUP_DB):
+    return DedupSQLite(caminho) if caminho else DedupMemoria()
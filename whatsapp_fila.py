@@ -0,0 +1,201 @@
+import os
+import json
+import time
+import uuid
+import fcntl
+import queue
+import random
+import threading
+import zlib
+import requests
+from metricas import registrar_upstream
+from resiliencia import politica
+
+# =====================
+# CONFIG
+# =====================
+
+SPOOL_DIR = os.getenv("WHATSAPP_SPOOL_DIR", "/tmp/colorglass_whatsapp")
+WORKERS = int(os.getenv("WHATSAPP_WORKERS", "2"))
+MAX_TENTATIVAS = int(os.getenv("WHATSAPP_MAX_TENTATIVAS", "5"))
+BACKOFF_BASE = float(os.getenv("WHATSAPP_BACKOFF", "1"))
+# timeouts e circuit breaker da Graph API (a retentativa é a da fila)
+POLITICA = politica("whatsapp")
+
+# =====================
+# FILA DE ENVIO
+# =====================
+
+class FilaWhatsApp:
+    """
+    Envio assíncrono para a Graph API.
+
+    - o webhook só enfileira e responde 200 na hora;
+    - cada número cai sempre na mesma thread, então a ordem por destinatário é mantida;
+    - falha de rede/5xx/429 tenta de novo com backoff até MAX_TENTATIVAS;
+    - cada mensagem fica num arquivo do spool até ser entregue: se o worker morrer,
+      o próximo processo a subir reenvia o que ficou pendente (iniciar() na carga
+      do módulo, sem esperar a primeira mensagem).
+    """
+
+    def __init__(self, api_url, token, spool_dir=SPOOL_DIR, workers=WORKERS,
+                 max_tentativas=MAX_TENTATIVAS, backoff=BACKOFF_BASE):
+        self.api_url = api_url
+        self.token = token
+        self.spool_dir = spool_dir
+        self.max_tentativas = max_tentativas
+        self.backoff = backoff
+        self._filas = [queue.Queue() for _ in range(max(1, workers))]
+        self._iniciado_pid = None
+        self._lock = threading.Lock()
+        self._lock_file = None
+        self._session = None
+
+    # ---------- API ----------
+
+    def enviar(self, numero, texto):
+        """Enfileira a mensagem e retorna imediatamente."""
+        self.iniciar()
+        item = {
+            "arquivo": f"{os.getpid()}-{time.time_ns()}-{uuid.uuid4().hex}.json",
+            "numero": numero,
+            "texto": texto,
+        }
+        self._gravar(item)
+        self._enfileirar(item)
+
+    def aguardar(self):
+        """Bloqueia até esvaziar a fila (usado em testes e no desligamento)."""
+        for q in self._filas:
+            q.join()
+
+    # ---------- threads ----------
+
+    def iniciar(self):
+        """Sobe as threads e reenvia o spool de processos mortos (uma vez por processo)."""
+        if self._iniciado_pid == os.getpid():
+            return
+        with self._lock:
+            if self._iniciado_pid == os.getpid():
+                return
+            os.makedirs(os.path.join(self.spool_dir, "falhas"), exist_ok=True)
+            self._session = requests.Session()
+            self._travar_processo()
+            for i in range(len(self._filas)):
+                threading.Thread(target=self._worker, args=(i,), daemon=True).start()
+            self._recuperar()
+            self._iniciado_pid = os.getpid()
+
+    def _enfileirar(self, item):
+        shard = zlib.crc32(str(item["numero"]).encode()) % len(self._filas)
+        self._filas[shard].put(item)
+
+    def _worker(self, i):
+        q = self._filas[i]
+        while True:
+            item = q.get()
+            try:
+                self._entregar(item)
+            finally:
+                q.task_done()
+
+    def _entregar(self, item):
+        for tentativa in range(1, self.max_tentativas + 1):
+            t0 = time.perf_counter()
+            status = None
+            try:
+                r = POLITICA.executar("POST", lambda timeout: self._session.post(
+                    self.api_url,
+                    json={
+                        "messaging_product": "whatsapp",
+                        "to": item["numero"],
+                        "type": "text",
+                        "text": {"body": item["texto"]}
+                    },
+                    headers={"Authorization": f"Bearer {self.token}"},
+                    timeout=timeout
+                ))
+                status = r.status_code
+                if r.status_code < 400:
+                    self._remover(item)
+                    return
+                if r.status_code != 429 and r.status_code < 500:
+                    print("WhatsApp recusou mensagem:", r.status_code, r.text)
+                    break
+            except requests.RequestException as e:
+                print("Erro envio WhatsApp:", e)
+            finally:
+                registrar_upstream("whatsapp", time.perf_counter() - t0, status)
+            if tentativa < self.max_tentativas:
+                time.sleep(self.backoff * 2 ** (tentativa - 1) * random.uniform(0.5, 1.5))
+        self._mover_para_falhas(item)
+
+    # ---------- spool ----------
+
+    def _caminho(self, item):
+        return os.path.join(self.spool_dir, item["arquivo"])
+
+    def _gravar(self, item):
+        tmp = self._caminho(item) + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(item, f)
+        os.replace(tmp, self._caminho(item))
+
+    def _remover(self, item):
+        try:
+            os.remove(self._caminho(item))
+        except FileNotFoundError:
+            pass
+
+    def _mover_para_falhas(self, item):
+        try:
+            os.replace(self._caminho(item), os.path.join(self.spool_dir, "falhas", item["arquivo"]))
+        except FileNotFoundError:
+            pass
+
+    def _travar_processo(self):
+        """Lock exclusivo enquanto o processo vive: marca os arquivos dele como 'em uso'."""
+        self._lock_file = open(os.path.join(self.spool_dir, f"{os.getpid()}.lock"), "w")
+        fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+
+    def _dono_morto(self, pid):
+        if pid == str(os.getpid()):
+            # mesmo pid de uma execução anterior: os arquivos são órfãos
+            return True
+        caminho = os.path.join(self.spool_dir, f"{pid}.lock")
+        try:
+            with open(caminho, "a") as f:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return True
+        except (BlockingIOError, OSError):
+            return False
+
+    def _recuperar(self):
+        """Assume mensagens pendentes de processos que morreram, na ordem original."""
+        pendentes = sorted(
+            (n for n in os.listdir(self.spool_dir) if n.endswith(".json")),
+            key=lambda n: int(n.split("-")[1])
+        )
+        vivos = {}
+        for nome in pendentes:
+            pid, resto = nome.split("-", 1)
+            if pid not in vivos:
+                vivos[pid] = not self._dono_morto(pid)
+            if vivos[pid]:
+                continue
+            novo = f"{os.getpid()}-{resto}"
+            try:
+                os.rename(os.path.join(self.spool_dir, nome), os.path.join(self.spool_dir, novo + ".claim"))
+            except FileNotFoundError:
+                continue  # outro worker pegou primeiro
+            with open(os.path.join(self.spool_dir, novo + ".claim")) as f:
+                item = json.load(f)
+            item["arquivo"] = novo
+            os.replace(os.path.join(self.spool_dir, novo + ".claim"), self._caminho(item))
+            self._enfileirar(item)
+        for pid, vivo in vivos.items():
+            if not vivo and pid != str(os.getpid()):
+                try:
+                    os.remove(os.path.join(self.spool_dir, f"{pid}.lock"))
+                except FileNotFoundError:
+                    pass